@@ -0,0 +1,52 @@
+"""
+Bulk columnar export of a league for notebooks and warehouses.
+
+    python src/fantasy_hooplab/export.py --league-id 816907987 --out ~/hooplab-export
+    python src/fantasy_hooplab/export.py --format arrow --refresh
+
+Writes players, stats, z_scores, ratings, teams, team_stats, rosters, h2h and schedule tables under
+<out>/<league_id>/<table>/date=YYYY-MM-DD/, one partition per day (see utils.columnar).
+Uses the last saved league state like the API server, --refresh fetches from ESPN first.
+"""
+import os
+import sys
+import time
+import argparse
+from datetime import date
+from utils import columnar
+from server import AnalysisService, YEAR, CATEGORIES, COUNTING_STATS, ROSTER_SIZE
+
+STAT_KEYS = ["MIN"] + COUNTING_STATS + ["FG%", "FT%"]
+
+
+def export_league(state, root, day=None, fmt="parquet"):
+    """Export one loaded league state (z-scores computed) as the `day` partition, returns {table: rows}."""
+    tables = columnar.build_tables(state["league"], state["team_map"], state["player_map"], STAT_KEYS, CATEGORIES,
+                                   ROSTER_SIZE, state.get("availability"))
+    return columnar.write_tables(root, tables, day or date.today(), fmt)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Export the league state as Parquet / Arrow IPC tables.")
+    parser.add_argument("--league-id", default=os.environ.get("FANTASY_HOOPLAB_LEAGUE_ID", "816907987"))
+    parser.add_argument("--year", type=int, default=YEAR)
+    parser.add_argument("--out", default=os.path.join(os.path.expanduser("~"), ".fantasy_hooplab", "export"))
+    parser.add_argument("--format", choices=list(columnar.FORMATS), default="parquet")
+    parser.add_argument("--date", type=date.fromisoformat, help="partition date, default today")
+    parser.add_argument("--refresh", action="store_true", help="fetch from ESPN instead of the last saved state")
+    args = parser.parse_args(argv)
+
+    service = AnalysisService(args.league_id, args.year)
+    service.load(refresh=args.refresh)
+
+    start = time.perf_counter()
+    root = os.path.join(args.out, str(args.league_id))
+    written = export_league(service.state, root, args.date, args.format)
+    for table, rows in written.items():
+        print(f"{table:>12} {rows:>8} rows")
+    print(f"Exported to {root} in {time.perf_counter() - start:.2f}s", file=sys.stderr)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,270 @@
+"""
+Concurrent-session load test for main.py, fully offline.
+
+    python src/fantasy_hooplab/loadtest.py --sessions 1 2 4 8 --rounds 3
+    python src/fantasy_hooplab/loadtest.py --snapshot-workers 1 2 4 8
+
+Each session is a Streamlit AppTest in its own process, clicking through
+Home (fetch, pick team), Players (filters), Trade (analyze) and Matchup (projections)
+against the synthetic league of utils.synthetic. Live polling is turned off.
+AppTest swaps a process-wide mock Runtime around every run, so two sessions in one process
+could only take turns. Separate processes run truly at once, like a server with one worker per
+session: the N sessions of a level import and get ready, then all start together, and they
+compete for CPU and memory but share no caches.
+
+--snapshot-workers starts N worker processes at once that each read the synthetic league, either by mapping
+the shared snapshot (utils.snapshot.load_snapshot) or by unpickling the saved state like the app's fast start,
+and reports time to ready and memory per worker. PSS splits shared pages between the processes mapping them,
+so it shows what each added worker really costs.
+"""
+import os
+import sys
+import json
+import time
+import argparse
+import tempfile
+import resource
+import subprocess
+import numpy as np
+
+MAIN = os.path.join(os.path.dirname(os.path.abspath(__file__)), "main.py")
+TIMEOUT = 600       # seconds per AppTest run
+OWNERSHIPS = ["Free Agents", "All"]
+PUNTS = [["FT%"], [], ["TO", "FG%"]]
+LEAGUE_ID = "816907987"
+YEAR = 2026
+CATEGORIES = ["FG%", "FT%", "3PM", "REB", "AST", "STL", "BLK", "TO", "PTS"]
+
+
+# helper
+def click(at, label):
+    next(b for b in at.button if b.label == label).click().run()
+
+
+# helper
+def check(at, step):
+    if at.exception:
+        raise RuntimeError(f"{step}: {at.exception[0].value}")
+
+
+def run_session(session, rounds):
+    """Click through the app once, returns [(step, seconds)]."""
+    from streamlit.testing.v1 import AppTest
+
+    timings = []
+
+    def step(name, action):
+        start = time.perf_counter()
+        action()
+        timings.append((name, time.perf_counter() - start))
+        check(at, name)
+
+    at = AppTest.from_file(MAIN, default_timeout=TIMEOUT)
+    step("open", at.run)
+    step("fetch", lambda: click(at, "Fetch League Data"))
+    team_ids = at.selectbox[0].options
+    step("select team", lambda: at.selectbox[0].select_index(session % len(team_ids)).run())
+    step("save team", lambda: click(at, "Save"))
+
+    for r in range(rounds):
+        step("players filter", lambda: at.selectbox(key="ownership_filter").select(OWNERSHIPS[r % len(OWNERSHIPS)]).run())
+        step("players punt", lambda: at.multiselect(key="punt_select").set_value(PUNTS[r % len(PUNTS)]).run())
+        step("trade", lambda: click(at, "🔍 Analyze Trade"))
+        step("matchup", lambda: click(at, "Run Projections"))
+    return timings
+
+
+def worker(session, rounds):
+    """One session process: imports, reports ready, waits for "go" on stdin, then prints its measurements as JSON."""
+    import streamlit.testing.v1  # noqa: F401  (import cost stays out of the measurement)
+
+    print("ready", flush=True)
+    sys.stdin.readline()
+    usage = resource.getrusage(resource.RUSAGE_SELF)
+    cpu_start = usage.ru_utime + usage.ru_stime
+    timings = run_session(session, rounds)
+    usage = resource.getrusage(resource.RUSAGE_SELF)
+    print(json.dumps({
+        "cpu": usage.ru_utime + usage.ru_stime - cpu_start,
+        "peak_mb": usage.ru_maxrss / 1024,      # KB on Linux
+        "timings": timings,
+    }), flush=True)
+
+
+def run_level(sessions, rounds, env):
+    """Start `sessions` session processes, release them at once, returns the combined measurements."""
+    procs = [subprocess.Popen([sys.executable, os.path.abspath(__file__), "--worker", str(session), "--rounds", str(rounds)],
+                              env=env, stdin=subprocess.PIPE, stdout=subprocess.PIPE, stderr=subprocess.PIPE, text=True)
+             for session in range(sessions)]
+    for proc in procs:
+        if proc.stdout.readline().strip() != "ready":
+            raise RuntimeError(proc.communicate()[1])
+
+    start = time.perf_counter()
+    for proc in procs:
+        proc.stdin.write("go\n")
+        proc.stdin.flush()
+    outputs = [proc.communicate() for proc in procs]
+    wall = time.perf_counter() - start
+
+    results = []
+    for proc, (out, err) in zip(procs, outputs):
+        if proc.returncode != 0:
+            raise RuntimeError(err)
+        results.append(json.loads(out.strip().splitlines()[-1]))
+    return {
+        "sessions": sessions,
+        "wall": wall,
+        "cpu": sum(r["cpu"] for r in results),
+        "peak_mb": max(r["peak_mb"] for r in results),
+        "total_mb": sum(r["peak_mb"] for r in results),
+        "timings": [t for r in results for t in r["timings"]],
+    }
+
+
+def pss_mb():
+    # helper
+    """Proportional set size of this process (Linux), None elsewhere."""
+    try:
+        with open("/proc/self/smaps_rollup") as f:
+            for line in f:
+                if line.startswith("Pss:"):
+                    return int(line.split()[1]) / 1024
+    except OSError:
+        return None
+
+
+def snapshot_worker(mode, root):
+    """Read the league once (mode "snapshot" or "pickle"), answer a ranking and print the measurements as JSON."""
+    from utils import appstate, fantasy, snapshot
+
+    start = time.perf_counter()
+    if mode == "snapshot":
+        data, meta = snapshot.load_snapshot(root)
+        rows, values, _ = snapshot.rank_players(data, meta)
+        checksum = float(sum(array.sum() for array in data.values()))       # touch every page
+    else:
+        state, _ = appstate.load_state(LEAGUE_ID, YEAR)
+        rows = fantasy.ranking_with_punting(state["player_map"], CATEGORIES, [])["total"]
+        checksum = float(len(state["player_map"]))
+    ready = time.perf_counter() - start
+    print(json.dumps({"mode": mode, "ready_ms": ready * 1000, "rss_mb": resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024,
+                      "pss_mb": pss_mb(), "rows": len(rows), "checksum": checksum}))
+
+
+def snapshot_bench(worker_counts, env):
+    """Publish one snapshot and saved state of the synthetic league, then start the worker processes."""
+    with tempfile.TemporaryDirectory() as tmp:
+        env = dict(env, FANTASY_HOOPLAB_SNAPSHOT_DIR=os.path.join(tmp, "snapshot"), FANTASY_HOOPLAB_STATE_DIR=os.path.join(tmp, "state"))
+        setup = subprocess.run([sys.executable, os.path.abspath(__file__), "--publish"], env=env, capture_output=True, text=True)
+        if setup.returncode != 0:
+            print(setup.stderr, file=sys.stderr)
+            return None
+
+        rows = []
+        for workers in worker_counts:
+            for mode in ["snapshot", "pickle"]:
+                procs = [subprocess.Popen([sys.executable, os.path.abspath(__file__), "--read", mode],
+                                          env=env, stdout=subprocess.PIPE, text=True) for _ in range(workers)]
+                results = [json.loads(proc.communicate()[0].strip().splitlines()[-1]) for proc in procs]
+                pss = [r["pss_mb"] for r in results if r["pss_mb"] is not None]
+                rows.append({
+                    "workers": workers, "mode": mode,
+                    "ready_ms": np.median([r["ready_ms"] for r in results]),
+                    "rss_mb": np.median([r["rss_mb"] for r in results]),
+                    "pss_mb": np.median(pss) if pss else float("nan"),
+                })
+        return rows
+
+
+def publish():
+    """Load the synthetic league like the API server, which saves its state and publishes the snapshot."""
+    from server import AnalysisService
+    AnalysisService(LEAGUE_ID, YEAR, snapshot_dir=os.environ["FANTASY_HOOPLAB_SNAPSHOT_DIR"]).load(refresh=True)
+
+
+def summarize(result):
+    """One report row per session count."""
+    latencies = np.array([seconds for _, seconds in result["timings"]]) * 1000
+    steps = {}
+    for name, seconds in result["timings"]:
+        steps.setdefault(name, []).append(seconds * 1000)
+    return {
+        "sessions": result["sessions"],
+        "requests": len(latencies),
+        "p50": np.percentile(latencies, 50),
+        "p90": np.percentile(latencies, 90),
+        "p99": np.percentile(latencies, 99),
+        "max": latencies.max(),
+        "rps": len(latencies) / result["wall"],
+        "cpu%": 100 * result["cpu"] / result["wall"],
+        "peak_mb": result["peak_mb"],
+        "total_mb": result["total_mb"],
+        "steps": {name: np.percentile(values, 50) for name, values in steps.items()},
+    }
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Offline concurrent-session load test for the Streamlit app.")
+    parser.add_argument("--sessions", type=int, nargs="+", default=[1, 2, 4, 8])
+    parser.add_argument("--rounds", type=int, default=3, help="Players/Trade/Matchup passes per session")
+    parser.add_argument("--snapshot-workers", type=int, nargs="+", help="measure N processes reading the league instead")
+    parser.add_argument("--json", action="store_true", help="print the raw summaries as JSON")
+    parser.add_argument("--worker", type=int, help=argparse.SUPPRESS)     # session number
+    parser.add_argument("--publish", action="store_true", help=argparse.SUPPRESS)
+    parser.add_argument("--read", choices=["snapshot", "pickle"], help=argparse.SUPPRESS)
+    args = parser.parse_args(argv)
+
+    if args.worker is not None:
+        return worker(args.worker, args.rounds)
+    if args.publish:
+        return publish()
+    if args.read:
+        return snapshot_worker(args.read, os.environ["FANTASY_HOOPLAB_SNAPSHOT_DIR"])
+    if args.snapshot_workers:
+        rows = snapshot_bench(args.snapshot_workers, dict(os.environ, FANTASY_HOOPLAB_SYNTHETIC="1"))
+        if rows is None:
+            return 1
+        if args.json:
+            print(json.dumps(rows, indent=2))
+            return 0
+        print(f"{'workers':>8} {'read':>9} {'ready ms':>9} {'RSS MB':>7} {'PSS MB':>7}   (median per worker)")
+        for row in rows:
+            print(f"{row['workers']:>8} {row['mode']:>9} {row['ready_ms']:>9.1f} {row['rss_mb']:>7.0f} {row['pss_mb']:>7.1f}")
+        return 0
+
+    rows = []
+    for sessions in args.sessions:
+        with tempfile.TemporaryDirectory() as tmp:
+            env = dict(os.environ,
+                       FANTASY_HOOPLAB_SYNTHETIC="1",
+                       FANTASY_HOOPLAB_POLL_INTERVAL="0",
+                       FANTASY_HOOPLAB_STATE_DIR=os.path.join(tmp, "state"),
+                       FANTASY_HOOPLAB_HISTORY_DIR=os.path.join(tmp, "history"))
+            env.pop("FANTASY_HOOPLAB_SNAPSHOT_DIR", None)
+            env.pop("FANTASY_HOOPLAB_DB", None)
+            try:
+                rows.append(summarize(run_level(sessions, args.rounds, env)))
+            except RuntimeError as e:
+                print(e, file=sys.stderr)
+                return 1
+
+    if args.json:
+        print(json.dumps(rows, indent=2))
+        return 0
+
+    print(f"{'sessions':>8} {'reqs':>5} {'p50 ms':>8} {'p90 ms':>8} {'p99 ms':>8} {'max ms':>8} {'req/s':>6} {'cpu%':>6} "
+          f"{'peak MB':>8} {'total MB':>9}")
+    for row in rows:
+        print(f"{row['sessions']:>8} {row['requests']:>5} {row['p50']:>8.0f} {row['p90']:>8.0f} {row['p99']:>8.0f} "
+              f"{row['max']:>8.0f} {row['rps']:>6.1f} {row['cpu%']:>6.0f} {row['peak_mb']:>8.0f} {row['total_mb']:>9.0f}")
+    print()
+    names = list(rows[0]["steps"])
+    print(f"{'sessions':>8} " + " ".join(f"{name[:14]:>14}" for name in names) + "   (p50 ms per step)")
+    for row in rows:
+        print(f"{row['sessions']:>8} " + " ".join(f"{row['steps'].get(name, 0):>14.0f}" for name in names))
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
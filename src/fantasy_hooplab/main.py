@@ -1,9 +1,11 @@
+import os
+import time
 import streamlit as st
 import numpy as np
 import pandas as pd
-import espn_api.basketball as api
-from utils import fantasy, render
+from utils import fantasy, render, snapshot, splits, history, appstate, store, online, archive, columnar, poller
 
+DEFAULT_LEAGUE_ID = 816907987
 YEAR = 2026
 ROSTER_SIZE = 13
 TEAM_COUNT = 10
@@ -14,46 +16,88 @@ ALL_CATEGORIES = ["PTS", "3PM", "REB", "AST", "STL", "BLK", "TO", "FG%", "FT%",
 PERCENTAGE_STATS = ["FG", "FT"]
 NEGATIVE_STATS = ["TO"]
 MASK = np.array([cat in NEGATIVE_STATS for cat in CATEGORIES])
-STATS_TYPES = ["projected", "total", "last_30", "last_15", "last_7"]
 RATINGS = {5: 'S', 4: 'A', 3: 'B', 2: 'C', 1: 'D'}
+STAT_KEYS = ["MIN"] + COUNTING_STATS + ["FG%", "FT%"]
+SNAPSHOT_DIR = os.environ.get("FANTASY_HOOPLAB_SNAPSHOT_DIR")    # shared by worker processes
+STORE_PATH = os.environ.get("FANTASY_HOOPLAB_DB")     # optional SQLite file for scripts
+POLL_INTERVAL = int(os.environ.get("FANTASY_HOOPLAB_POLL_INTERVAL", 60))     # seconds between live scoreboard refreshes, 0 = off
+if archive.MODE == "replay":
+    POLL_INTERVAL = 0       # offline
+REFRESH_AGE = 15 * 60     # seconds before a saved default league is refreshed in the background
+EXPORT_DIR = os.environ.get("FANTASY_HOOPLAB_EXPORT_DIR")     # optional daily Parquet export
+HISTORY_DIR = os.environ.get("FANTASY_HOOPLAB_HISTORY_DIR")     # optional daily history for the Trends section
 
 
 st.set_page_config(page_title="Fantasy HoopLab", layout="wide")
 st.title("🏀 Fantasy HoopLab")
 
-tab1, tab2, tab3, tab4, tab5, tab6, tab7, tab8 = st.tabs(["Home", "Players", "Teams" ,"Standings", "Roster", "Chart", "Trade", "Matchup"])
+tab1, tab2, tab3, tab4, tab5, tab6, tab7, tab8, tab9 = st.tabs(["Home", "Players", "Teams" ,"Standings", "Roster", "Chart", "Trade", "Matchup", "Draft"])
 
 if "league" not in st.session_state:
     st.session_state.league = None
 
+
+def use_state(state, saved_at):
+    """Swap a prebuilt league state into this session."""
+    previous = st.session_state.get("top_players_map")
+    pool = st.session_state.get("z_pool")
+    if "availability" not in state:     # saved before availability was part of the state
+        state["availability"] = fantasy.build_availability(state["league"], state["player_map"])
+    for key, value in state.items():
+        st.session_state[key] = value
+    st.session_state.last_updated = pd.Timestamp.fromtimestamp(saved_at)
+    st.session_state.snapshot_version = st.session_state.last_updated.value
+    st.session_state.saved_at = saved_at
+    st.session_state.setdefault("my_team_id", None)
+    add_blend(state["player_map"])
+    if pool is not None and previous is not None:
+        # refreshed league: move the z-score pool by the players who entered, left or changed
+        fantasy.sync_pool(pool, state["top_players_map"], fantasy.changed_stats(previous, state["top_players_map"]))
+    else:
+        pool = online.RunningStats.from_pool(state["top_players_map"], CATEGORIES)
+    st.session_state.z_pool = pool
+
+
+def add_blend(player_map, pool=None):
+    """(Re)compute the "blended" stat type from this session's blend settings."""
+    stats = splits.blend_stats(player_map, st.session_state.get("blend_weights", splits.BLEND_WEIGHTS), ["MIN"] + COUNTING_STATS,
+                               PERCENTAGE_STATS, st.session_state.get("blend_shrink", splits.SHRINK_GAMES))
+    fantasy.add_stats_type(player_map, "blended", stats, pool)
+
+
+# --- Fast start: serve the last saved default league right away, refresh it from ESPN in the background ---
+if "started" not in st.session_state:
+    st.session_state.started = True
+    saved = appstate.load_state(DEFAULT_LEAGUE_ID, YEAR)
+    if saved:
+        use_state(*saved)
+    if saved is None or time.time() - saved[1] > REFRESH_AGE:
+        appstate.refresh_in_background(DEFAULT_LEAGUE_ID, YEAR, ROSTER_SIZE, TEAM_COUNT)
+elif st.session_state.get("saved_at") and str(st.session_state.league.league_id) == str(DEFAULT_LEAGUE_ID):
+    saved = appstate.load_state(DEFAULT_LEAGUE_ID, YEAR)
+    if saved and saved[1] > st.session_state.saved_at:
+        use_state(*saved)
+
 # 1. HOME
 with tab1:
 
     st.header("Home")
-    league_id = st.text_input("League ID", value=816907987)
+    league_id = st.text_input("League ID", value=DEFAULT_LEAGUE_ID)
     fetch_btn = st.button("Fetch League Data")
 
     # --- Fetch League Data ---
     @st.cache_data(show_spinner="Connecting to ESPN Fantasy League...")
     def load_league_data(league_id, year, roster_size, team_count):
-        league = api.League(league_id=league_id, year=year)
-        team_map, player_map, free_agents_map, top_players_map = fantasy.get_roster(league, roster_size, team_count)
-        return league, team_map, player_map, free_agents_map, top_players_map
+        state = appstate.load_league(league_id, year, roster_size, team_count)
+        return state, appstate.save_state(league_id, year, state)
 
     if fetch_btn:
         for key in st.session_state.keys():
             del st.session_state[key]
+        st.session_state.started = True
         try:
-            league, team_map, player_map, free_agents_map, top_players_map = load_league_data(
-                league_id, YEAR, ROSTER_SIZE, TEAM_COUNT
-            )
-            st.session_state.league = league
-            st.session_state.team_map = team_map
-            st.session_state.player_map = player_map
-            st.session_state.free_agents_map = free_agents_map
-            st.session_state.top_players_map = top_players_map
-            st.session_state.last_updated = pd.Timestamp.now()
-            st.session_state.my_team_id = None
+            state, saved_at = load_league_data(league_id, YEAR, ROSTER_SIZE, TEAM_COUNT)
+            use_state(state, saved_at)
         except:
             st.write("Connection failed.")
             st.session_state.league = None
@@ -61,10 +105,30 @@ with tab1:
         
     if st.session_state.league:
         st.write("Successfully connected to ESPN Fantasy League!")
-        fantasy.compute_players_z_scores(st.session_state.player_map, st.session_state.top_players_map, CATEGORIES, CAT_INDEX, MASK)
+        fantasy.compute_players_z_scores(st.session_state.player_map, st.session_state.top_players_map, CATEGORIES, CAT_INDEX, MASK,
+                                         st.session_state.z_pool)
         fantasy.compute_teams_z_scores(st.session_state.team_map, st.session_state.player_map, CATEGORIES, CAT_INDEX, MASK, 
                                        COUNTING_STATS, PERCENTAGE_STATS, ROSTER_SIZE)
+        if fetch_btn and SNAPSHOT_DIR:
+            data, meta = snapshot.build_snapshot(st.session_state.league, st.session_state.team_map, st.session_state.player_map,
+                                                 STAT_KEYS, CATEGORIES, ROSTER_SIZE)
+            version = snapshot.save_snapshot(SNAPSHOT_DIR, data, meta)
+            st.session_state.shared_snapshot = (SNAPSHOT_DIR, version, st.session_state.snapshot_version)
+        if fetch_btn and STORE_PATH:
+            conn = store.connect(STORE_PATH)
+            store.populate(conn, st.session_state.team_map, st.session_state.player_map)
+            conn.close()
+        if fetch_btn and EXPORT_DIR:
+            tables = columnar.build_tables(st.session_state.league, st.session_state.team_map, st.session_state.player_map,
+                                           STAT_KEYS, CATEGORIES, ROSTER_SIZE, st.session_state.availability)
+            columnar.write_tables(os.path.join(EXPORT_DIR, str(league_id)), tables, st.session_state.last_updated.date())
+        if fetch_btn and HISTORY_DIR:
+            history.append_snapshot(os.path.join(HISTORY_DIR, str(league_id)), st.session_state.last_updated.date(),
+                                    st.session_state.player_map, st.session_state.team_map, CATEGORIES)
         st.caption(f"Last updated: {st.session_state.last_updated.strftime('%Y-%m-%d %H:%M:%S')}")
+        failed = appstate.refresh_error(st.session_state.league.league_id, YEAR)
+        if failed and failed[0] > st.session_state.saved_at:
+            st.caption(f"Background refresh failed, showing the saved league ({failed[1]}).")
         st.write('')
 
         team_names = {t.team_id: t.name for t in st.session_state.team_map.values()}
@@ -72,9 +136,61 @@ with tab1:
         my_team_id_btn = st.button("Save")
         if my_team_id_btn:
             st.session_state.my_team_id = my_team_id
+
+        # --- Custom stats split (adds the "custom" stat type) ---
+        with st.expander("Custom Stats Split"):
+            league = st.session_state.league
+            split_mode = st.radio("Window:", ["Last N days", "Since date"], key="split_mode", horizontal=True)
+            if split_mode == "Last N days":
+                n_days = st.number_input("Days", min_value=1, max_value=120, value=10, key="split_days")
+                end = league.scoringPeriodId - 1
+                start = end - n_days + 1
+            else:
+                since = st.date_input("Since", key="split_since")
+                periods = splits.scoring_periods_by_date(st.session_state.player_map)
+                start = min((day for date, day in periods.items() if date >= since), default=league.scoringPeriodId)
+                end = league.scoringPeriodId - 1
+
+            if st.button("Build Split"):
+                player_ids = list(st.session_state.player_map.keys())
+                if "daily_cube" not in st.session_state:
+                    with st.spinner("Loading game logs..."):
+                        logs = splits.fetch_game_logs(league, player_ids)
+                        st.session_state.daily_cube = splits.build_cube(logs, player_ids, league.firstScoringPeriod,
+                                                                        league.finalScoringPeriod, ["MIN"] + COUNTING_STATS)
+                stats = splits.window_stats(st.session_state.daily_cube, player_ids, league.firstScoringPeriod,
+                                            start, end, ["MIN"] + COUNTING_STATS, PERCENTAGE_STATS)
+                fantasy.add_stats_type(st.session_state.player_map, "custom", stats, st.session_state.z_pool)
+                st.session_state.custom_split = (start, end)
+                st.session_state.snapshot_version += 1      # cached tables and charts hold the old split
+                st.rerun()
+
+        # --- Blended stat type (weighted splits) ---
+        with st.expander("Blended Stats"):
+            current = st.session_state.get("blend_weights", splits.BLEND_WEIGHTS)
+            columns = st.columns(len(splits.BLEND_WEIGHTS))
+            weights = {}
+            for column, split in zip(columns, splits.BLEND_WEIGHTS):
+                with column:
+                    weights[split] = st.number_input(split, min_value=0.0, max_value=1.0, step=0.05,
+                                                     value=float(current.get(split, 0)), key=f"blend_{split}")
+            shrink = st.number_input("Shrink toward projections (games)", min_value=0, max_value=82,
+                                     value=st.session_state.get("blend_shrink", splits.SHRINK_GAMES), key="blend_shrink_games",
+                                     help="Splits with few games played count less, 0 = off")
+            if st.button("Apply Blend"):
+                st.session_state.blend_weights = weights
+                st.session_state.blend_shrink = shrink
+                add_blend(st.session_state.player_map, st.session_state.z_pool)
+                st.session_state.snapshot_version += 1      # cached tables and charts hold the old blend
+                st.rerun()
     else:
         st.write("Please make sure your league is set to public and league ID is correct.")
 
+# Live scoreboard: one poller per league for the whole process, each run keeps it alive
+st.session_state.poller = None
+if st.session_state.league and POLL_INTERVAL > 0:
+    st.session_state.poller = poller.shared_poller(st.session_state.league, POLL_INTERVAL)
+
         
 
 # 2. Players
@@ -84,6 +200,12 @@ with tab2:
         team_map = st.session_state.team_map
         player_map = st.session_state.player_map
         render.show_players(player_map, team_map)
+        render.show_sql_query(player_map, team_map, st.session_state.league)
+        st.write("")
+        if HISTORY_DIR:
+            since = (pd.Timestamp.now() - pd.Timedelta(days=31)).date()    # longest trend window
+            render.show_trends(history.load_history(os.path.join(HISTORY_DIR, str(league_id)), start=since), player_map)
+        render.show_seasons(league_id, YEAR, CATEGORIES, MASK, STAT_KEYS, ROSTER_SIZE, TEAM_COUNT)
     else:
         st.write("Please return to Home Page and connect to your league.")
         
@@ -107,6 +229,8 @@ with tab4:
             team_map = st.session_state.team_map
             my_team_id = st.session_state.my_team_id
             render.show_standings(team_map, my_team_id)
+            st.write("")
+            render.show_flip_thresholds(team_map, my_team_id, CATEGORIES, MASK)
         else:
             st.write("Please return to Home Page and select your team.")
     else:
@@ -134,9 +258,12 @@ with tab6:
     if st.session_state.league:
         player_map = st.session_state.player_map
         rankings = fantasy.ranking_with_punting(player_map, CATEGORIES, [])
-        stype = st.selectbox("Select Stats Type", options=STATS_TYPES, index=STATS_TYPES.index("total"))
+        stypes = fantasy.get_stats_types(player_map)
+        stype = st.selectbox("Select Stats Type", options=stypes, index=stypes.index("total"))
         players = {p['player_id'] : player_map.get(p['player_id']) for p in rankings[stype]}
-        render.show_radar_charts(players, RATINGS)
+        render.show_radar_charts(players, RATINGS, stype)
+        st.write("")
+        render.show_comparison_charts(players, st.session_state.team_map, stype)
     else:
         st.write("Please return to Home Page and connect to your league.")
 
@@ -169,9 +296,26 @@ with tab8:
             player_map = st.session_state.player_map
             free_agents_map = st.session_state.free_agents_map
             my_team_id = st.session_state.my_team_id
-            render.show_matchup(team_map, player_map, free_agents_map, my_team_id, league, COUNTING_STATS, PERCENTAGE_STATS, ALL_CATEGORIES)
+            render.show_matchup(team_map, player_map, free_agents_map, my_team_id, league, COUNTING_STATS, PERCENTAGE_STATS, ALL_CATEGORIES,
+                                NEGATIVE_STATS, st.session_state.get("lineup_slots"))
         else:
             st.write("Please return to Home Page and select your team.")
     else:
         st.write("Please return to Home Page and connect to your league.")
 
+
+# 9. Draft
+with tab9:
+    st.header("Draft")
+    if st.session_state.league:
+        render.show_draft_assistant(st.session_state.player_map, CATEGORIES, TEAM_COUNT, ROSTER_SIZE)
+        st.write("")
+        # draft workers map the shared snapshot while it still matches this session's stats
+        shared = st.session_state.get("shared_snapshot")
+        source = None
+        if shared and shared[2] == st.session_state.snapshot_version and os.path.isdir(os.path.join(shared[0], shared[1])):
+            source = shared[:2]
+        render.show_draft_simulator(st.session_state.player_map, CATEGORIES, MASK, COUNTING_STATS, TEAM_COUNT, ROSTER_SIZE,
+                                    source)
+    else:
+        st.write("Please return to Home Page and connect to your league.")
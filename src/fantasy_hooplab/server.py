@@ -0,0 +1,446 @@
+"""
+Headless JSON API over a warm, in-memory league.
+
+    python src/fantasy_hooplab/server.py --league-id 816907987 --port 8765
+
+GET  /health
+GET  /rankings?stype=total&punt=FT%,TO&limit=50&owner=all|fa|<team_id>
+GET  /standings?stype=total
+GET  /teams?stype=total
+GET  /matchup?team=<id>&opponent=<id>&week=<n>&optimize=1&stype=total
+POST /trade     {"team": <id>, "moves": {"<player_id>": <team_id or 0 to drop>}}
+POST /refresh   reload the league from ESPN
+
+Responses are cached per (endpoint, query, league version). Cache hits never take
+the analysis lock, misses are computed one at a time since trade analysis edits rosters.
+
+With --snapshot-dir (or FANTASY_HOOPLAB_SNAPSHOT_DIR) every load publishes the league as a
+memory-mapped snapshot (utils.snapshot) and /rankings is answered from it. A server started
+while a snapshot of its league exists maps it in milliseconds and serves /rankings right away,
+loading the full league in the background.
+"""
+import os
+import sys
+import json
+import copy
+import time
+import argparse
+import threading
+from collections import OrderedDict
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import urlparse, parse_qs
+import numpy as np
+from utils import fantasy, appstate, lineup, splits, online, snapshot
+
+YEAR = 2026
+ROSTER_SIZE = 13
+TEAM_COUNT = 10
+CATEGORIES = ["FG%", "FT%", "3PM", "REB", "AST", "STL", "BLK", "TO", "PTS"]
+CAT_INDEX = np.arange(len(CATEGORIES))
+COUNTING_STATS = ["PTS", "3PM", "REB", "AST", "STL", "BLK", "TO", "FGM", "FGA", "FTM", "FTA"]
+ALL_CATEGORIES = ["PTS", "3PM", "REB", "AST", "STL", "BLK", "TO", "FG%", "FT%", "FGM", "FGA", "FTM", "FTA"]
+PERCENTAGE_STATS = ["FG", "FT"]
+NEGATIVE_STATS = ["TO"]
+MASK = np.array([cat in NEGATIVE_STATS for cat in CATEGORIES])
+STAT_KEYS = ["MIN"] + COUNTING_STATS + ["FG%", "FT%"]
+CACHE_SIZE = 256
+SNAPSHOT_ROUTES = ["/rankings"]     # answered from the mapped snapshot, also while the league state loads
+
+
+class ApiError(Exception):
+    def __init__(self, status, message):
+        super().__init__(message)
+        self.status = status
+
+
+class AnalysisService:
+    """Holds one league state and answers analysis queries as plain dicts."""
+    def __init__(self, league_id, year=YEAR, cache_size=CACHE_SIZE, snapshot_dir=None):
+        self.league_id = league_id
+        self.year = year
+        self.cache_size = cache_size
+        self.cache = OrderedDict()
+        self.cache_lock = threading.Lock()
+        self.lock = threading.Lock()        # analysis mutates team rosters and stats
+        self.load_lock = threading.Lock()   # one load at a time, requests keep using the old state meanwhile
+        self.hits = 0
+        self.misses = 0
+        self.state = None
+        self.version = None
+        self.pool = None            # online.RunningStats of the z-score reference pool, kept across reloads
+        self.snapshot_dir = snapshot_dir
+        self.snapshot = None        # (arrays, meta) memory-mapped from snapshot_dir
+
+
+    def load(self, refresh=False):
+        """
+        Use the last saved state unless refresh is set or nothing is saved.
+        The new state and pool are built off to the side and swapped in together under the analysis lock.
+        """
+        with self.load_lock:
+            return self._load(refresh)
+
+
+    def _load(self, refresh):
+        saved = None if refresh else appstate.load_state(self.league_id, self.year)
+        if saved is None:
+            state = appstate.load_league(self.league_id, self.year, ROSTER_SIZE, TEAM_COUNT)
+            saved = state, appstate.save_state(self.league_id, self.year, state)
+
+        state, saved_at = saved
+        if "availability" not in state:     # saved before availability was part of the state
+            state["availability"] = fantasy.build_availability(state["league"], state["player_map"])
+        blend = splits.blend_stats(state["player_map"], splits.BLEND_WEIGHTS, ["MIN"] + COUNTING_STATS, PERCENTAGE_STATS)
+        fantasy.add_stats_type(state["player_map"], "blended", blend)
+        if self.pool is None:
+            pool = online.RunningStats.from_pool(state["top_players_map"], CATEGORIES)
+        else:
+            pool = copy.deepcopy(self.pool)
+            fantasy.sync_pool(pool, state["top_players_map"],
+                              fantasy.changed_stats(self.state["top_players_map"], state["top_players_map"]))
+        fantasy.compute_players_z_scores(state["player_map"], state["top_players_map"], CATEGORIES, CAT_INDEX, MASK, pool)
+        fantasy.compute_teams_z_scores(state["team_map"], state["player_map"], CATEGORIES, CAT_INDEX, MASK,
+                                       COUNTING_STATS, PERCENTAGE_STATS, ROSTER_SIZE)
+        if self.snapshot_dir:
+            data, meta = snapshot.build_snapshot(state["league"], state["team_map"], state["player_map"], STAT_KEYS, CATEGORIES,
+                                                 ROSTER_SIZE)
+            snapshot.save_snapshot(self.snapshot_dir, data, meta)
+        with self.lock:
+            self.state = state
+            self.pool = pool
+            self.version = saved_at
+        if self.snapshot_dir:
+            self.open_snapshot()
+        with self.cache_lock:
+            self.cache.clear()
+        return {"version": self.version}
+
+
+    def open_snapshot(self):
+        """Map the current snapshot in snapshot_dir if it holds this league, returns True if it does."""
+        try:
+            data, meta = snapshot.load_snapshot(self.snapshot_dir)
+        except OSError:
+            return False
+        if str(meta["league_id"]) != str(self.league_id) or meta["year"] != self.year:
+            return False
+        with self.lock:
+            self.snapshot = data, meta
+            if self.state is None:
+                self.version = meta["version"]
+        return True
+
+
+    def handle(self, route, query, body=None):
+        """Cached dispatch, returns the JSON encoded response."""
+        if route == "/health":
+            return json.dumps(self.health(query, body)).encode()
+
+        key = (route, json.dumps(query, sort_keys=True), json.dumps(body, sort_keys=True), self.version)
+        with self.cache_lock:
+            if key in self.cache:
+                self.cache.move_to_end(key)
+                self.hits += 1
+                return self.cache[key]
+
+        handler = ROUTES.get(route)
+        if handler is None:
+            raise ApiError(404, f"unknown endpoint {route}")
+        if self.state is None and not (self.snapshot is not None and route in SNAPSHOT_ROUTES):
+            raise ApiError(503, "league not loaded")
+
+        with self.lock:
+            payload = json.dumps(handler(self, query, body or {}), default=to_json).encode()
+
+        with self.cache_lock:
+            self.misses += 1
+            self.cache[key] = payload
+            if len(self.cache) > self.cache_size:
+                self.cache.popitem(last=False)
+        return payload
+
+
+    # --- endpoints ---
+    def health(self, query, body):
+        return {"league_id": self.league_id, "version": self.version, "loaded": self.state is not None,
+                "snapshot": self.snapshot[1]["version"] if self.snapshot else None,
+                "cache": {"hits": self.hits, "misses": self.misses}}
+
+
+    def rankings(self, query, body):
+        punt = [cat for cat in query.get("punt", "").split(",") if cat]
+        owner = query.get("owner", "all")
+        limit = int(query.get("limit", 50))
+        if self.snapshot is not None:
+            return self.snapshot_rankings(query, punt, owner, limit)
+
+        stype = get_stype(query, fantasy.get_stats_types(self.state["player_map"]))
+        player_map = self.state["player_map"]
+
+        rows = []
+        for row in fantasy.ranking_with_punting(player_map, CATEGORIES, punt)[stype]:
+            player = player_map[row["player_id"]]
+            team_id = player.on_team_id or 0
+            if (owner == "fa" and team_id) or (owner not in ("all", "fa") and str(team_id) != owner):
+                continue
+            rows.append({
+                "rank": row["rank"], "player_id": row["player_id"], "name": row["name"], "position": player.position,
+                "team_id": team_id, "value": row["punted_value"], "z": player.stats_z.get(stype, {}),
+            })
+            if len(rows) >= limit:
+                break
+        return {"stype": stype, "punt": punt, "players": rows}
+
+
+    def snapshot_rankings(self, query, punt, owner, limit):
+        # helper
+        """rankings() from the mapped snapshot arrays, no league objects needed."""
+        data, meta = self.snapshot
+        stype = get_stype(query, meta["stats_types"])
+        rows, values, z = snapshot.rank_players(data, meta, punt, stype)
+        rank = np.empty(len(rows), dtype=int)
+        rank[rows] = np.arange(1, len(rows) + 1)
+        on_team = data["on_team_id"]
+        if owner == "fa":
+            rows = rows[on_team[rows] == 0]
+        elif owner != "all":
+            rows = rows[on_team[rows] == int(owner)]
+        players = []
+        for row in rows[:limit].tolist():
+            name, position, _ = meta["players"][row]
+            players.append({
+                "rank": int(rank[row]), "player_id": int(data["player_id"][row]),
+                "name": name, "position": position, "team_id": int(on_team[row]), "value": float(values[row]),
+                "z": dict(zip(meta["categories"], z[row].tolist())),
+            })
+        return {"stype": stype, "punt": punt, "players": players}
+
+
+    def standings(self, query, body):
+        stype = get_stype(query, fantasy.get_stats_types(self.state["player_map"]))
+        teams = []
+        for team in self.state["team_map"].values():
+            most = team.h2h_most.get(stype, {})
+            each = team.h2h_each.get(stype, {})
+            teams.append({
+                "team_id": team.team_id, "name": team.name,
+                "h2h_most": {"record": most.get("result"), "win%": most.get("win%", 0)},
+                "h2h_each": {"record": each.get("result"), "win%": each.get("win%", 0)},
+                "vs": {opp_id: matchup.get("score") for opp_id, matchup in most.items() if isinstance(opp_id, int)},
+            })
+        teams.sort(key=lambda t: t["h2h_most"]["win%"], reverse=True)
+        return {"stype": stype, "teams": teams}
+
+
+    def teams(self, query, body):
+        stype = get_stype(query, fantasy.get_stats_types(self.state["player_map"]))
+        return {"stype": stype, "teams": [
+            {"team_id": team.team_id, "name": team.name, "abbrev": team.team_abbrev, "roster": team.roster,
+             "stats": team.stats.get(stype, {}), "z": team.stats_z.get(stype, {})}
+            for team in self.state["team_map"].values()
+        ]}
+
+
+    def trade(self, query, body):
+        team_map = self.state["team_map"]
+        player_map = self.state["player_map"]
+        team_id = body.get("team")
+        if team_id not in team_map:
+            raise ApiError(400, "body needs 'team': a team_id of the league")
+        try:
+            moves = {int(pid): int(dest) for pid, dest in body.get("moves", {}).items()}
+        except (TypeError, ValueError):
+            raise ApiError(400, "'moves' must map player_id to a team_id (0 drops)")
+        unknown = [pid for pid in moves if pid not in player_map]
+        if unknown:
+            raise ApiError(400, f"unknown players {unknown}")
+
+        result = {"plus": [pid for pid, dest in moves.items() if dest == team_id],
+                  "minus": [pid for pid, dest in moves.items() if player_map[pid].on_team_id == team_id and dest != team_id]}
+        before = team_summary(team_map[team_id])
+        try:
+            plus, minus = fantasy.analyze_transaction(result, moves, player_map, team_map, COUNTING_STATS, PERCENTAGE_STATS,
+                                                      CATEGORIES, CAT_INDEX, MASK, ROSTER_SIZE)
+            after = team_summary(team_map[team_id])
+        finally:
+            fantasy.reset_roster(team_map, player_map, CATEGORIES, CAT_INDEX, MASK, COUNTING_STATS, PERCENTAGE_STATS, ROSTER_SIZE)
+        return {"team": team_id, "plus": result["plus"], "minus": result["minus"], "before": before, "after": after,
+                "totals": {"plus": {stype: plus[stype]["total"] for stype in fantasy.get_stats_types(player_map)},
+                           "minus": {stype: minus[stype]["total"] for stype in fantasy.get_stats_types(player_map)}}}
+
+
+    def matchup(self, query, body):
+        league = self.state["league"]
+        team_map = self.state["team_map"]
+        player_map = self.state["player_map"]
+        matchup_map = fantasy.build_matchup_scoring_period(league)
+        week = int(query.get("week", league.currentMatchupPeriod))
+        if str(week) not in matchup_map:
+            raise ApiError(400, f"unknown week {week}")
+
+        team_id = int(query.get("team", 0))
+        if team_id not in team_map:
+            raise ApiError(400, "query needs team=<team_id>")
+        if "opponent" in query:
+            opponent_id = int(query["opponent"])
+        else:
+            schedule = team_map[team_id].schedule
+            if week > len(schedule):
+                raise ApiError(400, f"team {team_id} has no matchup in week {week}, pass opponent=<team_id>")
+            scheduled = schedule[week - 1]
+            opponent_id = scheduled.away_team.team_id if scheduled.home_team.team_id == team_id else scheduled.home_team.team_id
+        if opponent_id not in team_map:
+            raise ApiError(400, f"unknown opponent {opponent_id}")
+
+        box_scores = {team_id: {}, opponent_id: {}}
+        if week <= league.currentMatchupPeriod:
+            for tid in box_scores:
+                box_scores[tid] = fantasy.get_box_score(tid, week, team_map, ALL_CATEGORIES)
+
+        scoring_period = matchup_map[str(week)]
+        availability = self.state.get("availability")
+        games = {tid: fantasy.count_games(team_map[tid].roster, player_map, scoring_period, league.scoringPeriodId, availability)
+                 for tid in box_scores}
+        lineup_slots = self.state.get("lineup_slots")
+        stype = get_stype(query, fantasy.get_stats_types(player_map))
+        if query.get("optimize") == "1" and lineup_slots:
+            games = {tid: lineup.optimize_week(g, player_map, lineup_slots, stype) for tid, g in games.items()}
+
+        result, team_projections, opponent_projections = fantasy.analyze_matchup(
+            games[team_id], games[opponent_id], box_scores[team_id], box_scores[opponent_id],
+            ALL_CATEGORIES, COUNTING_STATS, PERCENTAGE_STATS, player_map, availability)
+        return {"week": week, "team": team_id, "opponent": opponent_id, "stype": stype, "difference": result,
+                "team_projection": team_projections, "opponent_projection": opponent_projections,
+                "games": {tid: sum(len(days) for days in g.values()) for tid, g in games.items()}}
+
+
+ROUTES = {
+    "/health": AnalysisService.health,
+    "/rankings": AnalysisService.rankings,
+    "/standings": AnalysisService.standings,
+    "/teams": AnalysisService.teams,
+    "/trade": AnalysisService.trade,
+    "/matchup": AnalysisService.matchup,
+}
+
+
+# helper
+def get_stype(query, stypes):
+    stype = query.get("stype", "total")
+    if stype not in stypes:
+        raise ApiError(400, f"stype must be one of {stypes}")
+    return stype
+
+
+# helper
+def team_summary(team):
+    return {stype: {"z": dict(team.stats_z.get(stype, {})), "win%": team.h2h_most.get(stype, {}).get("win%", 0)}
+            for stype in team.stats_z}
+
+
+# helper
+def to_json(value):
+    if isinstance(value, np.generic):
+        return value.item()
+    if isinstance(value, np.ndarray):
+        return value.tolist()
+    if hasattr(value, "isoformat"):
+        return value.isoformat()
+    raise TypeError(f"{type(value).__name__} is not JSON serializable")
+
+
+class Handler(BaseHTTPRequestHandler):
+    service = None
+    protocol_version = "HTTP/1.1"
+
+
+    def do_GET(self):
+        url = urlparse(self.path)
+        self.respond(lambda: self.service.handle(url.path, {k: v[-1] for k, v in parse_qs(url.query).items()}))
+
+
+    def do_POST(self):
+        url = urlparse(self.path)
+        length = int(self.headers.get("Content-Length", 0))
+        try:
+            body = json.loads(self.rfile.read(length) or b"{}")
+        except ValueError:
+            return self.send_json(400, {"error": "invalid JSON body"})
+
+        if url.path == "/refresh":
+            self.respond(lambda: json.dumps(self.service.load(refresh=True)).encode())
+        else:
+            self.respond(lambda: self.service.handle(url.path, {k: v[-1] for k, v in parse_qs(url.query).items()}, body))
+
+
+    def respond(self, compute):
+        try:
+            payload = compute()
+        except ApiError as e:
+            return self.send_json(e.status, {"error": str(e)})
+        except Exception as e:
+            self.log_error("analysis failed: %r", e)
+            return self.send_json(500, {"error": "analysis failed"})
+        self.send_payload(200, payload)
+
+
+    def send_json(self, status, data):
+        self.send_payload(status, json.dumps(data).encode())
+
+
+    def send_payload(self, status, payload):
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(payload)))
+        self.end_headers()
+        self.wfile.write(payload)
+
+
+    def log_message(self, format, *args):
+        if self.server.verbose:
+            super().log_message(format, *args)
+
+
+def make_server(service, host="127.0.0.1", port=8765, verbose=False):
+    """ThreadingHTTPServer bound to a loaded AnalysisService (port 0 picks a free port)."""
+    handler = type("BoundHandler", (Handler,), {"service": service})
+    server = ThreadingHTTPServer((host, port), handler)
+    server.daemon_threads = True
+    server.verbose = verbose
+    return server
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Serve Fantasy HoopLab analysis as JSON.")
+    parser.add_argument("--league-id", default=os.environ.get("FANTASY_HOOPLAB_LEAGUE_ID", "816907987"))
+    parser.add_argument("--year", type=int, default=YEAR)
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8765)
+    parser.add_argument("--refresh", action="store_true", help="fetch from ESPN instead of the last saved state")
+    parser.add_argument("--snapshot-dir", default=os.environ.get("FANTASY_HOOPLAB_SNAPSHOT_DIR"),
+                        help="shared memory-mapped league snapshot, published on every load")
+    parser.add_argument("--verbose", action="store_true")
+    args = parser.parse_args(argv)
+
+    service = AnalysisService(args.league_id, args.year, snapshot_dir=args.snapshot_dir)
+    start = time.perf_counter()
+    if args.snapshot_dir and not args.refresh and service.open_snapshot():
+        print(f"Snapshot {service.version} mapped in {(time.perf_counter() - start) * 1000:.0f}ms, "
+              f"loading the league in the background", file=sys.stderr)
+        threading.Thread(target=service.load, daemon=True).start()
+    else:
+        service.load(refresh=args.refresh)
+        print(f"League {args.league_id} loaded in {time.perf_counter() - start:.1f}s", file=sys.stderr)
+
+    server = make_server(service, args.host, args.port, args.verbose)
+    print(f"Serving on http://{args.host}:{server.server_port}", file=sys.stderr)
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+
+
+if __name__ == "__main__":
+    main()
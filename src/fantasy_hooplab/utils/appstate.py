@@ -0,0 +1,108 @@
+import os
+import time
+import pickle
+import logging
+import threading
+from utils import fantasy, archive
+
+logger = logging.getLogger(__name__)
+
+STATE_DIR = os.environ.get("FANTASY_HOOPLAB_STATE_DIR", os.path.join(os.path.expanduser("~"), ".fantasy_hooplab", "state"))
+SYNTHETIC = os.environ.get("FANTASY_HOOPLAB_SYNTHETIC") == "1"     # offline league from utils.synthetic
+
+_refreshed = {}         # (league_id, year) -> (saved_at, pickled (state, saved_at))
+_refreshing = set()
+_refresh_errors = {}    # (league_id, year) -> (failed_at, message) of the last failed background refresh
+_lock = threading.Lock()
+
+
+def load_league(league_id, year, roster_size, team_count):
+    """
+    Fetch the league from ESPN (or the synthetic league, or the response archive) and build the app state:
+    {league, team_map, player_map, free_agents_map, top_players_map, lineup_slots, availability}.
+    espn_api is imported here so app startup does not pay for it.
+    """
+    if SYNTHETIC:
+        from utils import synthetic
+        league = synthetic.League(league_id=int(league_id), year=year, team_count=team_count, roster_size=roster_size,
+                                  seed=abs(year - 2026))
+    elif archive.MODE:
+        league = archive.open_league(league_id, year)
+    else:
+        import espn_api.basketball as api
+        league = api.League(league_id=league_id, year=year)
+    team_map, player_map, free_agents_map, top_players_map = fantasy.get_roster(league, roster_size, team_count)
+    return {
+        "league": league,
+        "team_map": team_map,
+        "player_map": player_map,
+        "free_agents_map": free_agents_map,
+        "top_players_map": top_players_map,
+        "lineup_slots": fantasy.get_lineup_slots(league),
+        "availability": fantasy.build_availability(league, player_map),
+    }
+
+
+def state_path(league_id, year):
+    return os.path.join(STATE_DIR, f"{league_id}_{year}.pkl")
+
+
+def save_state(league_id, year, state):
+    """Persist a prebuilt app state (written to a temp file then renamed). Returns the save time."""
+    os.makedirs(STATE_DIR, exist_ok=True)
+    saved_at = time.time()
+    data = pickle.dumps((state, saved_at), protocol=pickle.HIGHEST_PROTOCOL)
+
+    tmp = f"{state_path(league_id, year)}.{os.getpid()}.{threading.get_ident()}"
+    with open(tmp, "wb") as f:
+        f.write(data)
+    os.replace(tmp, state_path(league_id, year))
+
+    with _lock:
+        _refreshed[(str(league_id), year)] = (saved_at, data)
+    return saved_at
+
+
+def load_state(league_id, year):
+    """Most recent saved state as (state, saved_at), or None. Every call returns fresh objects."""
+    with _lock:
+        entry = _refreshed.get((str(league_id), year))
+    if entry:
+        return pickle.loads(entry[1])
+
+    try:
+        with open(state_path(league_id, year), "rb") as f:
+            return pickle.load(f)
+    except (OSError, pickle.UnpicklingError, EOFError, AttributeError, ImportError):
+        return None
+
+
+def refresh_in_background(league_id, year, roster_size, team_count):
+    """Refresh a league from ESPN on a daemon thread, at most one per league. load_state() returns it once saved."""
+    key = (str(league_id), year)
+    with _lock:
+        if key in _refreshing:
+            return
+        _refreshing.add(key)
+
+    def refresh():
+        try:
+            save_state(league_id, year, load_league(league_id, year, roster_size, team_count))
+            with _lock:
+                _refresh_errors.pop(key, None)
+        except Exception as e:
+            # keep serving the saved state, the app shows refresh_error()
+            logger.exception("background refresh of league %s (%s) failed", league_id, year)
+            with _lock:
+                _refresh_errors[key] = (time.time(), f"{type(e).__name__}: {e}")
+        finally:
+            with _lock:
+                _refreshing.discard(key)
+
+    threading.Thread(target=refresh, daemon=True).start()
+
+
+def refresh_error(league_id, year):
+    """(failed_at, message) of the last background refresh if it failed, None otherwise."""
+    with _lock:
+        return _refresh_errors.get((str(league_id), year))
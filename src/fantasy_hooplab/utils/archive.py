@@ -0,0 +1,83 @@
+"""
+Recorded ESPN responses. Every league_get / get / news_get call of a league's espn_request
+(settings, rosters, free agents, kona_player_info, schedules, box scores, player cards, news)
+is stored as gzipped JSON keyed by a hash of the request, then replayed without network.
+
+    FANTASY_HOOPLAB_ARCHIVE=record   fetch live and save every response
+    FANTASY_HOOPLAB_ARCHIVE=replay   answer from the saved responses only
+"""
+import os
+import re
+import gzip
+import json
+import hashlib
+import threading
+
+ARCHIVE_DIR = os.environ.get("FANTASY_HOOPLAB_ARCHIVE_DIR", os.path.join(os.path.expanduser("~"), ".fantasy_hooplab", "archive"))
+MODE = os.environ.get("FANTASY_HOOPLAB_ARCHIVE", "")       # "", "record" or "replay"
+METHODS = ["league_get", "get", "news_get"]
+
+
+def request_key(method, params=None, headers=None, extend=""):
+    """
+    Hash of one request. The endpoint host is left out (espn_api may switch a league to its history endpoint),
+    the league and year are in the archive directory instead.
+    """
+    payload = {"method": method, "extend": extend, "params": params or {}, "headers": headers or {}}
+    return hashlib.sha1(json.dumps(payload, sort_keys=True, default=str).encode()).hexdigest()
+
+
+def response_path(directory, method, params=None, headers=None, extend=""):
+    # helper
+    view = (params or {}).get("view") or extend or "root"
+    view = "+".join(view) if isinstance(view, (list, tuple)) else str(view)
+    view = re.sub(r"[^A-Za-z0-9]+", "_", view).strip("_")[:40]
+    return os.path.join(directory, f"{method}_{view}_{request_key(method, params, headers, extend)[:16]}.json.gz")
+
+
+class ArchivedCall:
+    """Stands in for one EspnFantasyRequests method. Plain attributes only, so leagues using it still pickle."""
+    def __init__(self, request, method, directory, mode):
+        self.request = request
+        self.method = method
+        self.directory = directory
+        self.mode = mode
+
+
+    def __call__(self, params=None, headers=None, extend=""):
+        path = response_path(self.directory, self.method, params, headers, extend)
+        if self.mode == "replay":
+            try:
+                with gzip.open(path, "rt") as f:
+                    return json.load(f)
+            except FileNotFoundError:
+                raise FileNotFoundError(f"no recorded ESPN response for {self.method} {params} {extend!r} in {self.directory}") from None
+
+        response = getattr(type(self.request), self.method)(self.request, params=params, headers=headers, extend=extend)
+        os.makedirs(self.directory, exist_ok=True)
+        tmp = f"{path}.{os.getpid()}.{threading.get_ident()}"
+        with gzip.open(tmp, "wt") as f:
+            json.dump(response, f)
+        os.replace(tmp, path)
+        return response
+
+
+def league_dir(league_id, year, root=ARCHIVE_DIR):
+    return os.path.join(root, f"{league_id}_{year}")
+
+
+def attach(request, directory, mode):
+    """Route the request object's ESPN calls through the archive, returns it."""
+    for method in METHODS:
+        setattr(request, method, ArchivedCall(request, method, directory, mode))
+    return request
+
+
+def open_league(league_id, year, mode=MODE, root=ARCHIVE_DIR):
+    """espn_api League whose requests are recorded or replayed from root/<league_id>_<year>."""
+    import espn_api.basketball as api
+
+    league = api.League(league_id=league_id, year=year, fetch_league=False)
+    attach(league.espn_request, league_dir(league_id, year, root), mode)
+    league.fetch_league()
+    return league
@@ -0,0 +1,105 @@
+import numpy as np
+from utils.player import get_stats_types
+
+CACHE_SIZE = 8
+STATUS_AVAILABILITY = {"OUT": 0.0, "INJURY_RESERVE": 0.0, "SUSPENSION": 0.0, "DAY_TO_DAY": 0.5}    # chance to play
+UNKNOWN_RETURN_DAYS = {"DAY_TO_DAY": 2}     # days a status holds without a return date, default 7
+
+_tensor_cache = {}
+
+
+def player_index(player_ids):
+    """Returns {player_id: row} for an ordered list of player ids."""
+    return {player_id: row for row, player_id in enumerate(player_ids)}
+
+
+def stats_tensor(player_map, stat_keys, stypes=None):
+    """
+    Returns (player_ids, tensor) where tensor[player, stype, stat] holds per-game averages.
+    stypes defaults to get_stats_types(player_map).
+    """
+    stypes = get_stats_types(player_map) if stypes is None else stypes
+    player_ids = list(player_map.keys())
+    tensor = np.array([
+        [[player.stats.get(stype, {}).get(key, 0) for key in stat_keys] for stype in stypes]
+        for player in player_map.values()
+    ], dtype=float).reshape(len(player_ids), len(stypes), len(stat_keys))
+    return player_ids, tensor
+
+
+def cached_stats_tensor(player_map, stat_keys):
+    """
+    stats_tensor() memoized per player_map object (stats only change on fetch).
+    The entry holds a reference to player_map so its id can't be reused while cached.
+    """
+    key = (id(player_map), tuple(stat_keys), tuple(get_stats_types(player_map)))
+    entry = _tensor_cache.get(key)
+    if entry is None or entry[0] is not player_map or len(entry[1]) != len(player_map):
+        if len(_tensor_cache) >= CACHE_SIZE:
+            _tensor_cache.pop(next(iter(_tensor_cache)))
+        entry = (player_map, *stats_tensor(player_map, stat_keys))
+        _tensor_cache[key] = entry
+    return entry[1], entry[2]
+
+
+def clear_cache():
+    """Drop memoized tensors, call after mutating player stats in place."""
+    _tensor_cache.clear()
+
+
+def z_tensor(player_map, categories):
+    """Returns tensor[player, stype, category] of z-scores, with the total score as the last column."""
+    keys = list(categories) + ["score"]
+    stypes = get_stats_types(player_map)
+    tensor = np.array([
+        [[player.stats_z.get(stype, {}).get(key, 0) for key in keys] for stype in stypes]
+        for player in player_map.values()
+    ], dtype=float).reshape(len(player_map), len(stypes), len(keys))
+    return tensor
+
+
+def games_matrix(player_map, first_day, last_day):
+    """Returns games[player, day] = 1 if the player's pro team plays on scoring period first_day + day."""
+    games = np.zeros((len(player_map), last_day - first_day + 1), dtype=np.uint8)
+    for row, player in enumerate(player_map.values()):
+        days = [int(day) - first_day for day in player.schedule if first_day <= int(day) <= last_day]
+        games[row, days] = 1
+    return games
+
+
+def availability_matrix(player_map, first_day, last_day, today):
+    """
+    Returns avail[player, day] = chance the player can play on scoring period first_day + day, from injury status
+    and expected return date: the status' chance applies to games before the return date, or for a few days
+    from today when there is none. Healthy players are 1 everywhere.
+    """
+    avail = np.ones((len(player_map), last_day - first_day + 1))
+    start = max(today, first_day) - first_day
+    for row, player in enumerate(player_map.values()):
+        chance = STATUS_AVAILABILITY.get(player.injury_status)
+        if chance is None:
+            continue
+        if player.expected_return_date:
+            days = [int(day) - first_day for day, game in player.schedule.items()
+                    if first_day <= int(day) <= last_day and game["date"].date() < player.expected_return_date]
+            avail[row, days] = chance
+        else:
+            avail[row, start:start + UNKNOWN_RETURN_DAYS.get(player.injury_status, 7)] = chance
+    return avail
+
+
+def roster_matrix(team_map, index, roster_size):
+    """
+    Returns weights[team, player] for team aggregation.
+    A player counts 1 for the team rostering him, IR players count 0 while the roster is over roster_size.
+    """
+    weights = np.zeros((len(team_map), len(index)), dtype=float)
+    for row, team in enumerate(team_map.values()):
+        over = len(team.roster) > roster_size
+        for player_id in team.roster:
+            if player_id not in index:
+                continue
+            if over and player_id in team.injury_reserved:
+                continue    # skip IR
+            weights[row, index[player_id]] = 1
+    return weights
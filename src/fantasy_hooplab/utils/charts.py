@@ -0,0 +1,140 @@
+import copy
+from collections import OrderedDict
+import numpy as np
+
+CACHE_SIZE = 32
+POSITION_COLORS = {
+    'PG': {'line': '#EF5350', 'fill': 'rgba(239, 83, 80, 0.3)'},      # Red
+    'SG': {'line': '#FFA726', 'fill': 'rgba(255, 167, 38, 0.3)'},     # Orange
+    'SF': {'line': '#66BB6A', 'fill': 'rgba(102, 187, 106, 0.3)'},    # Green
+    'PF': {'line': '#1f77b4', 'fill': 'rgba(31, 119, 180, 0.3)'},     # Blue
+    'C': {'line': '#AB47BC', 'fill': 'rgba(171, 71, 188, 0.3)'},      # Purple
+}
+PALETTE = ["#1f77b4", "#ff7f0e", "#2ca02c", "#d62728", "#9467bd", "#8c564b",
+           "#e377c2", "#7f7f7f", "#bcbd22", "#17becf", "#EF5350", "#66BB6A"]
+
+_figure_cache = OrderedDict()
+
+
+def get_position_color(position):
+    """Returns line_color and fillcolor based on position"""
+    return POSITION_COLORS.get(position, POSITION_COLORS['PF'])  # Default to blue if position not found
+
+
+def cached_figure(key, build):
+    """
+    Figure specs are plain dicts (st.plotly_chart takes them as is), memoized by key.
+    key should hold the entity set, stat type and version; the cache is process-wide, so the version must also
+    tell apart sessions whose stat types differ (render.chart_version).
+    Callers get a copy: plotly pops keys off the dict while building the figure.
+    """
+    fig = _figure_cache.get(key)
+    if fig is None:
+        fig = build()
+        _figure_cache[key] = fig
+        if len(_figure_cache) > CACHE_SIZE:
+            _figure_cache.popitem(last=False)
+    else:
+        _figure_cache.move_to_end(key)
+    return copy.deepcopy(fig)
+
+
+def clear_cache():
+    _figure_cache.clear()
+
+
+# helper
+def radar_trace(name, values, categories, line, fill, hover=None):
+    """One closed polar trace, values are on the 0-5 rating scale."""
+    trace = {
+        "type": "scatterpolar",
+        "name": name,
+        "r": list(values) + [values[0]],
+        "theta": list(categories) + [categories[0]],
+        "fill": "toself",
+        "line": {"color": line, "width": 2},
+        "fillcolor": fill,
+    }
+    if hover is not None:
+        trace["customdata"] = list(hover) + [hover[0]]
+        trace["hovertemplate"] = "%{theta}: %{customdata:.2f}<extra>" + name + "</extra>"
+    return trace
+
+
+# helper
+def radar_figure(traces, title, showlegend=False, height=400):
+    return {
+        "data": traces,
+        "layout": {
+            "polar": {
+                "radialaxis": {"visible": True, "range": [0, 5], "tickmode": "array", "tickvals": [1, 2, 3, 4, 5],
+                               "showticklabels": False, "gridcolor": "#444444", "tickfont": {"color": "#CCCCCC"}},
+                "angularaxis": {"direction": "clockwise", "gridcolor": "#444444", "tickfont": {"color": "#CCCCCC"}},
+                "bgcolor": "#1E1E1E",
+            },
+            "showlegend": showlegend,
+            "legend": {"font": {"color": "#CCCCCC"}},
+            "height": height,
+            "margin": {"l": 80, "r": 80, "t": 80, "b": 80},
+            "title": {"text": title, "x": 0.5, "xanchor": "center", "font": {"color": "#CCCCCC"}},
+            "paper_bgcolor": "#0E1117",
+            "plot_bgcolor": "#0E1117",
+        },
+    }
+
+
+# helper
+def fade(color, alpha=0.15):
+    color = color.lstrip("#")
+    r, g, b = (int(color[i:i + 2], 16) for i in (0, 2, 4))
+    return f"rgba({r}, {g}, {b}, {alpha})"
+
+
+def create_radar(player_name, stats, position, categories):
+    """Single player rating radar (categories clockwise from 12 o'clock)."""
+    colors = get_position_color(position)
+    values = [stats.get(cat, 0) for cat in categories]
+    return radar_figure([radar_trace(player_name, values, categories, colors['line'], colors['fill'])],
+                        f"{player_name} ({position})")
+
+
+def team_profiles(team_map, categories, stype="total"):
+    """
+    Returns (names, z, scaled) with z[team, category] the team z-scores and scaled mapped onto the
+    0-5 rating axis per category (2.5 = league average, 0/5 = furthest team below/above).
+    """
+    names = [team.name for team in team_map.values()]
+    z = np.array([[team.stats_z.get(stype, {}).get(cat, 0) for cat in categories] for team in team_map.values()],
+                 dtype=float).reshape(len(names), len(categories))
+    spread = np.abs(z).max(axis=0)
+    scaled = 2.5 + 2.5 * np.divide(z, spread, out=np.zeros_like(z), where=spread > 0)
+    return names, z, scaled
+
+
+def teams_radar(team_map, categories, stype="total", version=None):
+    """All teams overlaid in one figure, click legend entries to isolate teams."""
+    key = ("teams", tuple(team_map.keys()), tuple(categories), stype, version)
+
+    def build():
+        names, z, scaled = team_profiles(team_map, categories, stype)
+        traces = [
+            radar_trace(name, scaled[row].tolist(), categories, PALETTE[row % len(PALETTE)],
+                        fade(PALETTE[row % len(PALETTE)]), z[row].tolist())
+            for row, name in enumerate(names)
+        ]
+        return radar_figure(traces, f"Team Profiles ({stype}, z-score)", showlegend=True, height=550)
+    return cached_figure(key, build)
+
+
+def players_radar(players, categories, stype="total", version=None):
+    """Selected players' ratings overlaid in one figure."""
+    key = ("players", tuple(p.player_id for p in players), tuple(categories), stype, version)
+
+    def build():
+        traces = [
+            radar_trace(p.name, [p.ratings.get(stype, {}).get(cat, 0) for cat in categories], categories,
+                        PALETTE[row % len(PALETTE)], fade(PALETTE[row % len(PALETTE)]))
+            for row, p in enumerate(players)
+        ]
+        return radar_figure(traces, f"Player Comparison ({stype})", showlegend=True, height=500)
+    return cached_figure(key, build)
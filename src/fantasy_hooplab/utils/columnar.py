@@ -0,0 +1,141 @@
+"""
+Columnar export of the league state for notebooks and warehouses.
+Tables are built straight from the league arrays (one column per array slice, no per-row objects)
+and written as Parquet or Arrow IPC files partitioned by snapshot date:
+
+    <root>/<table>/date=YYYY-MM-DD/part-0.parquet
+
+Exporting another day adds a partition, exporting the same day again replaces it.
+pyarrow is imported on first use.
+"""
+import os
+import threading
+import numpy as np
+from utils import arrays, snapshot
+from utils.player import RATING_CATS
+
+FORMATS = {"parquet": "parquet", "arrow": "arrow"}     # format -> file extension
+TABLES = ["players", "stats", "z_scores", "ratings", "teams", "team_stats", "rosters", "h2h", "schedule"]
+
+
+def wide(id_name, ids, stypes, tensor, keys):
+    # helper
+    """tensor[entity, stype, key] -> columns with one row per (entity, stype)."""
+    n, s = len(ids), len(stypes)
+    columns = {id_name: np.repeat(np.asarray(ids, dtype=np.int64), s), "stype": np.tile(np.array(stypes, dtype=object), n)}
+    columns.update({key: tensor[:, :, k].ravel() for k, key in enumerate(keys)})
+    return columns
+
+
+def build_tables(league, team_map, player_map, stat_keys, categories, roster_size, availability=None):
+    """Returns {table: {column: array}} for every table in TABLES."""
+    data, meta = snapshot.build_snapshot(league, team_map, player_map, stat_keys, categories, roster_size)
+    stypes = meta["stats_types"]
+    player_ids = data["player_id"]
+    team_ids = data["team_id"]
+    z_keys = meta["categories"]            # categories + "score"
+    players = list(player_map.values())
+    teams = list(team_map.values())
+
+    ratings = np.array([[[p.ratings.get(stype, {}).get(cat, 0) for cat in RATING_CATS] for stype in stypes] for p in players],
+                       dtype=np.int8).reshape(len(players), len(stypes), len(RATING_CATS))
+
+    # team aggregates and H2H from the team z-scores, the same comparisons as Team.h2h
+    _, team_stats = arrays.stats_tensor(team_map, stat_keys)
+    team_z = arrays.z_tensor(team_map, categories)
+    diff = team_z[:, None, :, :-1] - team_z[None, :, :, :-1]            # team x opponent x stype x cat
+    wins, losses = (diff > 0).sum(axis=3), (diff < 0).sum(axis=3)
+    pairs = ~np.eye(len(teams), dtype=bool)
+    t, o = np.nonzero(pairs)
+
+    team_columns = wide("team_id", team_ids, stypes, team_stats, stat_keys)
+    team_columns.update({f"z_{key}": team_z[:, :, k].ravel() for k, key in enumerate(z_keys)})
+
+    roster_sizes = [len(team.roster) for team in teams]
+    roster_ids = np.array([pid for team in teams for pid in team.roster], dtype=np.int64)
+    reserved = np.array([pid in team.injury_reserved for team in teams for pid in team.roster], dtype=bool)
+
+    rows, days = np.nonzero(data["games"])
+    schedule = {
+        "player_id": player_ids[rows],
+        "scoring_period": (days + meta["first_day"]).astype(np.int64),
+    }
+    if availability is not None:
+        index = np.array([availability["index"].get(pid, -1) for pid in player_ids.tolist()])
+        chance = availability["chance"][index[rows], days + meta["first_day"] - availability["first_day"]]
+        schedule["chance"] = np.where(index[rows] >= 0, chance, 1.0)
+
+    return {
+        "players": {
+            "player_id": player_ids,
+            "name": [p.name for p in players],
+            "position": [p.position for p in players],
+            "pro_team": [p.pro_team for p in players],
+            "on_team_id": data["on_team_id"],
+            "status": [p.status for p in players],
+            "injury_status": [p.injury_status for p in players],
+            "percent_owned": data["percent_owned"],
+            "avg_draft_pos": data["avg_draft_pos"],
+        },
+        "stats": wide("player_id", player_ids, stypes, data["stats"], stat_keys),
+        "z_scores": wide("player_id", player_ids, stypes, data["stats_z"], z_keys),
+        "ratings": wide("player_id", player_ids, stypes, ratings, RATING_CATS),
+        "teams": {
+            "team_id": team_ids,
+            "name": [team.name for team in teams],
+            "abbrev": [team.team_abbrev for team in teams],
+        },
+        "team_stats": team_columns,
+        "rosters": {
+            "team_id": np.repeat(team_ids, roster_sizes),
+            "player_id": roster_ids,
+            "injured_reserve": reserved,
+        },
+        "h2h": {
+            "team_id": np.repeat(team_ids[t], len(stypes)),
+            "opponent_id": np.repeat(team_ids[o], len(stypes)),
+            "stype": np.tile(np.array(stypes, dtype=object), len(t)),
+            "wins": wins[t, o].ravel(),
+            "losses": losses[t, o].ravel(),
+            "ties": len(categories) - wins[t, o].ravel() - losses[t, o].ravel(),
+        },
+        "schedule": schedule,
+    }
+
+
+def partition_path(root, table, date, fmt="parquet"):
+    return os.path.join(root, table, f"date={date.isoformat()}", f"part-0.{FORMATS[fmt]}")
+
+
+def write_tables(root, tables, date, fmt="parquet"):
+    """Write one date partition per table (temp file then rename), returns {table: rows}."""
+    import pyarrow as pa
+    import pyarrow.feather as feather
+    import pyarrow.parquet as pq
+
+    if fmt not in FORMATS:
+        raise ValueError(f"format must be one of {list(FORMATS)}")
+    written = {}
+    for name, columns in tables.items():
+        table = pa.table(columns)
+        path = partition_path(root, name, date, fmt)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        tmp = os.path.join(os.path.dirname(path), f".{os.path.basename(path)}.{os.getpid()}.{threading.get_ident()}")   # hidden from readers
+        if fmt == "parquet":
+            pq.write_table(table, tmp, compression="zstd")
+        else:
+            feather.write_feather(table, tmp, compression="zstd")
+        os.replace(tmp, path)
+        written[name] = table.num_rows
+    return written
+
+
+def read_table(root, table, fmt="parquet"):
+    """All date partitions of one table as a pyarrow Table, with the partition date as a column."""
+    import pyarrow.dataset as ds
+
+    base = os.path.join(root, table)
+    files = [os.path.join(base, part, file) for part in sorted(os.listdir(base)) if part.startswith("date=")
+             for file in os.listdir(os.path.join(base, part)) if file.endswith(f".{FORMATS[fmt]}") and not file.startswith(".")]
+    dataset = ds.dataset(files, format="ipc" if fmt == "arrow" else fmt, partitioning="hive", partition_base_dir=base)
+    return dataset.to_table()
@@ -0,0 +1,303 @@
+import os
+from concurrent.futures import ProcessPoolExecutor
+import numpy as np
+from utils import arrays, fantasy, snapshot
+from utils.player import get_stats_types
+
+ADP_NOISE = 0.15        # opponents' pick spread, as a share of ADP
+STRATEGIES = {
+    "ADP": None,                # I draft like everyone else
+    "Best available": [],       # highest z-value, no punt
+    "Punt FT%": ["FT%"],
+    "Punt FG%": ["FG%"],
+    "Punt TO": ["TO"],
+}
+
+
+def draft_pool(player_map, categories, stat_keys, team_count, roster_size, stype="total", depth=2):
+    """
+    Draftable players as arrays: the depth * team_count * roster_size best by ADP, plus as many by z-score.
+    Players without an ADP go after the last one with an ADP, ordered by z-score.
+    Returns {"player_ids", "adp", "z" [P, C], "stats" [P, stat]} with stats the stype per-game averages.
+    """
+    player_ids, tensor = arrays.cached_stats_tensor(player_map, stat_keys)
+    stats = tensor[:, get_stats_types(player_map).index(stype), :]
+    z = np.array([[player_map[pid].stats_z.get(stype, {}).get(cat, 0) for cat in categories] for pid in player_ids],
+                 dtype=float).reshape(len(player_ids), len(categories))
+    adp = np.array([player_map[pid].avg_draft_pos or 0 for pid in player_ids], dtype=float)
+    return select_pool(player_ids, adp, z, stats, team_count, roster_size, depth)
+
+
+def snapshot_pool(data, meta, categories, stat_keys, team_count, roster_size, stype="total", depth=2):
+    """draft_pool() from the arrays of a league snapshot (utils.snapshot) instead of the player objects."""
+    s = meta["stats_types"].index(stype)
+    stats = data["stats"][:, s, [meta["stat_keys"].index(key) for key in stat_keys]]
+    z = data["stats_z"][:, s, [meta["categories"].index(cat) for cat in categories]]
+    return select_pool(data["player_id"].tolist(), data["avg_draft_pos"], z, stats, team_count, roster_size, depth)
+
+
+def select_pool(player_ids, adp, z, stats, team_count, roster_size, depth):
+    # helper
+    adp = np.array(adp, dtype=float)
+    score = z.sum(axis=1)
+    missing = adp <= 0
+    by_score = np.argsort(-score)
+    score_rank = np.empty(len(player_ids), dtype=int)
+    score_rank[by_score] = np.arange(len(player_ids))
+    adp[missing] = adp.max(initial=0) + 1 + score_rank[missing]
+
+    size = depth * team_count * roster_size
+    keep = np.zeros(len(player_ids), dtype=bool)
+    keep[np.argsort(adp)[:size]] = True
+    keep[by_score[:size]] = True
+    keep = np.flatnonzero(keep)
+    return {
+        "player_ids": [player_ids[i] for i in keep],
+        "adp": adp[keep],
+        "z": z[keep],
+        "stats": stats[keep],
+    }
+
+
+def run_drafts(pool, slot, punting, drafts, team_count, roster_size, categories, mask, stat_keys,
+               noise=ADP_NOISE, seed=None):
+    """
+    `drafts` snake drafts at once, rosters[draft, team, round] as pool rows.
+    Opponents take the lowest noisy ADP, I (team `slot`) take the highest z-value without the punting categories
+    (punting None: noisy ADP as well). Positions are not enforced.
+    Returns {"strength", "cat_win_pct", "matchup_win_pct"}, one value per draft for my team.
+    """
+    rng = np.random.default_rng(seed)
+    n = len(pool["adp"])
+    if n < team_count * roster_size:
+        raise ValueError(f"{n} draftable players for {team_count * roster_size} roster spots")
+
+    adp = pool["adp"]
+    noisy = adp + rng.standard_normal((drafts, n)) * (1 + noise * adp)
+    mine = None
+    if punting is not None:
+        value = pool["z"][:, [cat not in punting for cat in categories]].sum(axis=1)
+        mine = np.broadcast_to(value, (drafts, n)).copy()
+
+    rows = np.arange(drafts)
+    rosters = np.empty((drafts, team_count, roster_size), dtype=int)
+    for rnd in range(roster_size):
+        order = range(team_count) if rnd % 2 == 0 else range(team_count - 1, -1, -1)
+        for team in order:
+            if team == slot and mine is not None:
+                pick = mine.argmax(axis=1)
+            else:
+                pick = noisy.argmin(axis=1)
+            rosters[:, team, rnd] = pick
+            noisy[rows, pick] = np.inf
+            if mine is not None:
+                mine[rows, pick] = -np.inf
+
+    return evaluate(pool["stats"][rosters].sum(axis=2), slot, categories, mask, stat_keys)
+
+
+_snapshot_pools = {}        # per worker process: (root, version, ...) -> pool built from the mapped snapshot
+
+
+def run_snapshot_drafts(source, *args):
+    """run_drafts() in a worker that maps the snapshot itself, source = (root, version, categories, stat_keys, ...)."""
+    pool = _snapshot_pools.get(source)
+    if pool is None:
+        root, version, categories, stat_keys, team_count, roster_size, stype = source
+        data, meta = snapshot.load_snapshot(root, version)
+        pool = snapshot_pool(data, meta, list(categories), list(stat_keys), team_count, roster_size, stype)
+        _snapshot_pools.clear()
+        _snapshot_pools[source] = pool
+    return run_drafts(pool, *args)
+
+
+def evaluate(totals, slot, categories, mask, stat_keys):
+    # helper
+    """totals[draft, team, stat] -> my team's z-score sum and H2H win% against the other teams of each draft."""
+    sign = np.where(mask, -1.0, 1.0)
+    values = fantasy.category_values(totals, stat_keys, categories)       # drafts x teams x cats
+    std = values.std(axis=1, keepdims=True)
+    z = sign * (values - values.mean(axis=1, keepdims=True)) / np.where(std == 0, 1, std)
+
+    diff = sign * (values[:, slot, None, :] - values)                   # drafts x teams x cats
+    others = np.arange(values.shape[1]) != slot
+    diff = diff[:, others, :]
+    wins = (diff > 0).sum(axis=2)
+    losses = (diff < 0).sum(axis=2)
+    return {
+        "strength": z[:, slot, :].sum(axis=1),
+        "cat_win_pct": ((diff > 0) + 0.5 * (diff == 0)).mean(axis=(1, 2)),
+        "matchup_win_pct": ((wins > losses) + 0.5 * (wins == losses)).mean(axis=1),
+    }
+
+
+def simulate(player_map, categories, mask, counting_stats, team_count, roster_size, drafts=10000,
+             strategies=None, slots=None, stype="total", noise=ADP_NOISE, seed=0, workers=None, snapshot_source=None):
+    """
+    Mock draft study: the drafts are split evenly over every (draft slot, strategy) cell and the cells run
+    on a process pool (workers=1 runs them here). Slots are 0-based.
+    snapshot_source: (root, version) of a league snapshot holding stype, workers then map it and build
+    the pool themselves instead of receiving it pickled.
+    Returns one row per cell with the mean and spread of my roster strength and H2H win%.
+    """
+    strategies = STRATEGIES if strategies is None else strategies
+    slots = list(range(team_count)) if slots is None else list(slots)
+    stat_keys = list(counting_stats)
+    if snapshot_source is not None:
+        pool = (*snapshot_source, tuple(categories), tuple(stat_keys), team_count, roster_size, stype)
+        run = run_snapshot_drafts
+    else:
+        pool = draft_pool(player_map, categories, stat_keys, team_count, roster_size, stype)
+        run = run_drafts
+
+    cells = [(slot, name) for slot in slots for name in strategies]
+    per_cell = max(1, drafts // len(cells))
+    seeds = np.random.SeedSequence(seed).spawn(len(cells))
+    args = [(pool, slot, strategies[name], per_cell, team_count, roster_size, categories, mask, stat_keys, noise, s)
+            for (slot, name), s in zip(cells, seeds)]
+
+    workers = workers or min(len(cells), os.cpu_count() or 1)
+    if workers == 1:
+        results = [run(*a) for a in args]
+    else:
+        with ProcessPoolExecutor(max_workers=workers) as executor:
+            results = list(executor.map(run, *zip(*args)))
+
+    rows = []
+    for (slot, name), result in zip(cells, results):
+        rows.append({
+            "slot": slot + 1,
+            "strategy": name,
+            "drafts": per_cell,
+            "strength": float(result["strength"].mean()),
+            "strength_sd": float(result["strength"].std()),
+            "cat_win_pct": float(result["cat_win_pct"].mean()),
+            "matchup_win_pct": float(result["matchup_win_pct"].mean()),
+        })
+    return rows
+
+
+class DraftBoard:
+    """
+    Live draft state: who is still available, my running category z totals and the category weights they imply.
+    Every category list is sorted once up front, pick() and undo() then cost O(categories) and best_available()
+    runs Fagin's threshold algorithm down those lists, so neither depends on the pool size.
+    """
+    NEED_GAIN = 0.5         # weight gained per z-score a category trails my others by, per pick
+    MIN_WEIGHT = 0.25       # categories I lead still count a little
+    BLOCK = 16              # list depth read per threshold algorithm round
+
+    def __init__(self, player_ids, z, categories, team_count, roster_size, punting=()):
+        self.player_ids = list(player_ids)
+        self.row = arrays.player_index(self.player_ids)
+        self.categories = list(categories)
+        self.z = np.asarray(z, dtype=float).reshape(len(self.player_ids), len(self.categories))
+        self.punted = np.array([cat in punting for cat in self.categories])
+
+        self.order = np.argsort(-self.z, axis=0).T                  # order[c] = rows by z in category c, best first
+        self.rank = np.empty_like(self.order)                       # rank[c, row] = position of row in order[c]
+        for c in range(len(self.categories)):
+            self.rank[c, self.order[c]] = np.arange(len(self.player_ids))
+        self.head = np.zeros(len(self.categories), dtype=int)       # first available position per list
+
+        # what an average drafted player adds per category
+        drafted = np.argsort(-self.z.sum(axis=1))[:team_count * roster_size]
+        self.benchmark = self.z[drafted].mean(axis=0) if len(drafted) else np.zeros(len(self.categories))
+
+        self.available = np.ones(len(self.player_ids), dtype=bool)
+        self.mine = np.zeros(len(self.categories))                  # my team's z totals
+        self.my_picks = []
+        self.picks = []                                             # [(player_id, mine)] in draft order
+
+
+    @classmethod
+    def from_player_map(cls, player_map, categories, team_count, roster_size, stype="total", punting=()):
+        z = [[player.stats_z.get(stype, {}).get(cat, 0) for cat in categories] for player in player_map.values()]
+        return cls(player_map.keys(), z, categories, team_count, roster_size, punting)
+
+
+    def pick(self, player_id, mine=False):
+        """Someone drafted player_id, mine=True if it was me."""
+        row = self.row[player_id]
+        if not self.available[row]:
+            raise ValueError(f"player {player_id} was already drafted")
+        self.available[row] = False
+        self.picks.append((player_id, mine))
+        if mine:
+            self.mine += self.z[row]
+            self.my_picks.append(player_id)
+        for c in range(len(self.categories)):
+            if self.head[c] == self.rank[c, row]:
+                self.advance(c)
+
+
+    def undo(self):
+        """Take back the last pick."""
+        if not self.picks:
+            return None
+        player_id, mine = self.picks.pop()
+        row = self.row[player_id]
+        self.available[row] = True
+        if mine:
+            self.mine -= self.z[row]
+            self.my_picks.pop()
+        self.head = np.minimum(self.head, self.rank[:, row])
+        return player_id
+
+
+    def advance(self, c):
+        # helper
+        """Move list c's head past drafted players, amortized O(1) per pick."""
+        order = self.order[c]
+        while self.head[c] < len(order) and not self.available[order[self.head[c]]]:
+            self.head[c] += 1
+
+
+    def weights(self):
+        """
+        Category weights from my needs: above 1 where I trail the benchmark by more than in my other
+        categories, below 1 where I'm furthest ahead, 0 for punted categories.
+        """
+        if not self.my_picks:
+            return np.where(self.punted, 0.0, 1.0)
+        gap = self.benchmark - self.mine / len(self.my_picks)      # per pick
+        gap = gap - gap[~self.punted].mean() if (~self.punted).any() else gap
+        weights = np.maximum(self.MIN_WEIGHT, 1 + self.NEED_GAIN * gap)
+        weights[self.punted] = 0
+        return weights
+
+
+    def best_available(self, k=20, weights=None):
+        """
+        Top k available players by weighted z-score sum, as [(player_id, value)] best first.
+        Threshold algorithm: read the category lists top down in blocks, stop once the k-th best
+        value seen beats the best value any unread player could still have.
+        """
+        weights = self.weights() if weights is None else np.asarray(weights, dtype=float)
+        n = len(self.player_ids)
+        active = np.flatnonzero(weights > 0)
+        if len(active) == 0:
+            active = np.arange(len(self.categories))
+        seen = np.zeros(0, dtype=int)
+        values = np.zeros(0)
+        depth = 0
+        lists = np.arange(len(active))
+
+        while True:
+            positions = self.head[active][:, None] + depth + np.arange(self.BLOCK)[None, :]   # lists x block
+            positions = np.minimum(positions, n - 1)
+            rows = np.unique(self.order[active[:, None], positions])
+            rows = rows[self.available[rows] & ~np.isin(rows, seen)]
+            seen = np.concatenate([seen, rows])
+            values = np.concatenate([values, self.z[rows] @ weights])
+
+            last = positions[:, -1]
+            threshold = (self.z[self.order[active, last], active] * weights[active]).sum()
+            depth += self.BLOCK
+            if len(values) >= k and np.sort(values)[-k] >= threshold:
+                break
+            if (self.head[active] + depth >= n).all():
+                break
+
+        top = np.argsort(-values)[:k]
+        return [(self.player_ids[seen[i]], float(values[i])) for i in top]
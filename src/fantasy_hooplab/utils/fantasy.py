@@ -1,13 +1,11 @@
-from utils.player import Player
+from utils.player import Player, RATING_CATS, get_stats_types
 from utils.team import Team
+from utils import arrays, scenario
 import numpy as np
 import json
 # from datetime import datetime, timedelta
 
 
-STATS_TYPES = ["projected", "total", "last_30", "last_15", "last_7"]
-
-
 def get_roster(league, roster_size, team_count):
     """Returns:
     team_map = {team_id: Team()}
@@ -59,15 +57,42 @@ def get_roster(league, roster_size, team_count):
     return team_map, player_map, free_agents_map, top_players_map
 
 
+def get_lineup_slots(league):
+    """Returns {slot: count} of the league's lineup slots (e.g. {'PG': 1, 'UT': 3, 'BE': 3, 'IR': 1})."""
+    from espn_api.basketball.constant import POSITION_MAP
+
+    data = league.espn_request.league_get(params={"view": "mSettings"})
+    counts = data.get("settings", {}).get("rosterSettings", {}).get("lineupSlotCounts", {})
+    return {POSITION_MAP[int(slot)]: count for slot, count in counts.items() if count and int(slot) in POSITION_MAP}
+
+
+def add_stats_type(player_map, stype, stats, pool=None):
+    """
+    Register an extra stat type (custom split, blend, ...) next to the ESPN splits, on this player_map only
+    (get_stats_types(player_map) lists it, other sessions and leagues don't see it).
+    stats = {player_id: {stat: per-game value}}, players missing from it get empty stats.
+    Z-scores, team aggregates and H2H pick it up on the next compute_*_z_scores call.
+    pool: optional online.RunningStats of the z-score reference pool, rebuilt for this stat type.
+    """
+    for player_id, player in player_map.items():
+        player.stats[stype] = stats.get(player_id, {})
+        player.ratings[stype] = {cat: player.rate_category(player.stats[stype].get(cat, 0), cat) for cat in RATING_CATS}
+
+    arrays.clear_cache()
+    if pool is not None:
+        pool.track(stype, player_map)
+
+
 def get_mean_std(obj_map, categories, cat_index):
     # helper
     """Compute mean and std using NumPy (fast and stable)."""
-    mean_dict = {stype: {} for stype in STATS_TYPES}
-    std_dict = {stype: {} for stype in STATS_TYPES}
+    stypes = get_stats_types(obj_map)
+    mean_dict = {stype: {} for stype in stypes}
+    std_dict = {stype: {} for stype in stypes}
 
-    for stype in STATS_TYPES:
+    for stype in stypes:
         values = np.array([
-            [obj.stats[stype].get(cat, 0) for cat in categories]
+            [obj.stats.get(stype, {}).get(cat, 0) for cat in categories]
             for obj in obj_map.values()
         ], dtype=float)
 
@@ -86,14 +111,14 @@ def get_mean_std(obj_map, categories, cat_index):
 def add_z_scores(obj, mean, std, categories, cat_index, mask):
     # helper
     """Assign z-scores per object using vectorized NumPy."""
-    for stype in STATS_TYPES:
+    for stype in mean:
         # setdefault() inserts {} into dict if stype missing
         # get() returns {} but does NOT store it in the dict
         #       -> you’d just be modifying a temporary dict that disappears right after unless the key already existed
         stats_z = obj.stats_z.setdefault(stype, {}) 
         stats_z.clear()
 
-        values = np.array([obj.stats[stype].get(cat, 0) for cat in categories], dtype=float)
+        values = np.array([obj.stats.get(stype, {}).get(cat, 0) for cat in categories], dtype=float)
         means = np.array([mean[stype][cat] for cat in categories], dtype=float)
         stds = np.array([std[stype][cat] for cat in categories], dtype=float)
 
@@ -106,23 +131,88 @@ def add_z_scores(obj, mean, std, categories, cat_index, mask):
         stats_z["score"] = float(np.sum(z_scores))
 
 
-def compute_players_z_scores(player_map, top_players_map, categories, cat_index, mask):
-    """Master function for stats aggregation and z-score computation."""
+def compute_players_z_scores(player_map, top_players_map, categories, cat_index, mask, pool=None):
+    """
+    Master function for stats aggregation and z-score computation.
+    pool: optional online.RunningStats kept in sync with top_players_map, used instead of rescanning it.
+    """
     
     # Mean and std separately for top players for later z score calculations
-    players_mean, players_std = get_mean_std(top_players_map, categories, cat_index)
+    if pool is not None:
+        players_mean, players_std = pool.mean_std(top_players_map)
+    else:
+        players_mean, players_std = get_mean_std(top_players_map, categories, cat_index)
+
+    # Apply z-scores to all players at once: tensor[player, stype, category]
+    stypes = get_stats_types(player_map)
+    _, tensor = arrays.stats_tensor(player_map, categories, stypes)
+    means = np.array([[players_mean[stype][cat] for cat in categories] for stype in stypes], dtype=float)
+    stds = np.array([[players_std[stype][cat] for cat in categories] for stype in stypes], dtype=float)
+    z_scores = (tensor - means) / stds
+    z_scores[:, :, mask] = -z_scores[:, :, mask]
+    scores = z_scores.sum(axis=2).tolist()
+    z_scores = z_scores.tolist()
+
+    for row, player in enumerate(player_map.values()):
+        for s, stype in enumerate(stypes):
+            stats_z = dict(zip(categories, z_scores[row][s]))
+            stats_z["score"] = scores[row][s]
+            player.stats_z[stype] = stats_z
+
+
+def changed_stats(old_map, new_map):
+    # helper
+    """Ids in both maps whose stats differ, e.g. between two fetches of a league."""
+    return [player_id for player_id, player in new_map.items()
+            if player_id in old_map and any(old_map[player_id].stats.get(stype) != stats for stype, stats in player.stats.items())]
+
+
+def sync_pool(pool, top_players_map, changed=()):
+    """
+    Bring a RunningStats pool in line with top_players_map: players who left are removed,
+    newcomers added and the ids in changed (stats refreshed) updated, all incrementally.
+    Extra stat types the map no longer has are dropped.
+    """
+    stypes = get_stats_types(top_players_map)
+    for stype in [stype for stype in pool.mean if stype not in stypes]:
+        pool.untrack(stype)
+    for player_id in [pid for pid in pool.members if pid not in top_players_map]:
+        pool.remove(player_id)
+    for player_id, player in top_players_map.items():
+        if player_id not in pool.members:
+            pool.add(player_id, player)
+        elif player_id in changed:
+            pool.update(player_id, player)
+
+
+def compute_teams_stats(team_map, player_map, counting_stats, percentage_stats, roster_size):
+    """
+    Aggregate raw stats for all teams at once:
+    roster weights (teams x players, IR excluded) @ player stats (players x stypes x stats).
+    """
+    stat_keys = ["MIN"] + counting_stats
+    stypes = get_stats_types(player_map)
+    player_ids, tensor = arrays.cached_stats_tensor(player_map, stat_keys)
+    weights = arrays.roster_matrix(team_map, arrays.player_index(player_ids), roster_size)
+
+    totals = (weights @ tensor.reshape(len(player_ids), -1)).reshape(len(team_map), len(stypes), len(stat_keys))
+
+    # FG% & FT% from summed makes and attempts (0 when no attempts)
+    made = totals[:, :, [stat_keys.index(f"{cat}M") for cat in percentage_stats]]
+    attempted = totals[:, :, [stat_keys.index(f"{cat}A") for cat in percentage_stats]]
+    pct = np.divide(made, attempted, out=np.zeros_like(made), where=attempted != 0)
 
-    # Apply z-scores to players
-    for player in player_map.values():
-        add_z_scores(player, players_mean, players_std, categories, cat_index, mask)
+    keys = stat_keys + [f"{cat}%" for cat in percentage_stats]
+    values = np.concatenate([totals, pct], axis=2).tolist()
+    for row, team in enumerate(team_map.values()):
+        team.stats = {stype: dict(zip(keys, values[row][s])) for s, stype in enumerate(stypes)}
 
 
 def compute_teams_z_scores(team_map, player_map, categories, cat_index, mask, 
                            counting_stats, percentage_stats, roster_size):
     """Master function for stats aggregation and z-score computation."""
     # 1. Compute team stats first (needed before normalization)
-    for team in team_map.values():
-        team.compute_team_stats(player_map, counting_stats, percentage_stats, roster_size)
+    compute_teams_stats(team_map, player_map, counting_stats, percentage_stats, roster_size)
 
     # 2. Mean and std separately for teams and players
     teams_mean, teams_std = get_mean_std(team_map, categories, cat_index)
@@ -136,6 +226,137 @@ def compute_teams_z_scores(team_map, player_map, categories, cat_index, mask,
         team.get_record(team_map, categories)
 
 
+def category_values(totals, stat_keys, categories):
+    # helper
+    """Map summed stats [..., stat] to category values [..., category], FG%/FT% from makes and attempts."""
+    columns = []
+    for cat in categories:
+        if cat.endswith("%"):
+            made = totals[..., stat_keys.index(f"{cat[:-1]}M")]
+            attempted = totals[..., stat_keys.index(f"{cat[:-1]}A")]
+            columns.append(np.divide(made, attempted, out=np.zeros_like(made), where=attempted != 0))
+        else:
+            columns.append(totals[..., stat_keys.index(cat)])
+    return np.stack(columns, axis=-1)
+
+
+def marginal_value_matrix(team_map, player_map, categories, mask, counting_stats, roster_size,
+                          stype="total", swap=False):
+    """
+    Value of every player to every team, all scenarios at once.
+    Adds player p to team t (optionally swapped for t's lowest z-score player) holding other teams fixed,
+    recomputes league means/stds and returns teams x players matrices:
+    {"team_ids", "player_ids", "win_pct" (H2H each), "win_pct_delta", "z_delta"}.
+    Players already on team t are NaN in row t.
+    """
+    stat_keys = ["MIN"] + counting_stats
+    player_ids, tensor = arrays.cached_stats_tensor(player_map, stat_keys)
+    index = arrays.player_index(player_ids)
+    weights = arrays.roster_matrix(team_map, index, roster_size)
+    stats = tensor[:, get_stats_types(player_map).index(stype), :]     # players x stats
+
+    totals = weights @ stats                                        # teams x stats
+    delta = np.broadcast_to(stats, (len(team_map),) + stats.shape).copy()   # teams x players x stats
+    if swap:
+        scores = np.array([player_map[pid].stats_z.get(stype, {}).get("score", 0) for pid in player_ids])
+        weakest = np.argmin(np.where(weights > 0, scores, np.inf), axis=1)
+        delta -= stats[weakest][:, None, :]
+    else:
+        # one more player may push the roster over roster_size, which benches IR players
+        grown = arrays.roster_matrix(team_map, index, roster_size - 1)
+        delta += ((grown - weights) @ stats)[:, None, :]
+
+    sign = np.where(mask, -1.0, 1.0)
+    base = category_values(totals, stat_keys, categories)            # teams x cats
+    new = category_values(totals[:, None, :] + delta, stat_keys, categories)   # teams x players x cats
+    n_teams = len(team_map)
+
+    # league mean/std with team t replaced, from running sums
+    mean0 = base.mean(axis=0)
+    sq0 = (base ** 2).mean(axis=0)
+    mean = mean0 + (new - base[:, None, :]) / n_teams
+    sq = sq0 + (new ** 2 - base[:, None, :] ** 2) / n_teams
+    std = np.sqrt(np.maximum(sq - mean ** 2, 0))
+    std = np.where(std == 0, 1, std)
+    std0 = np.where(base.std(axis=0) == 0, 1, base.std(axis=0))
+
+    z_new = (sign * (new - mean) / std).sum(axis=-1)
+    z_base = (sign * (base - mean0) / std0).sum(axis=-1)
+
+    # H2H each: per-category comparisons against the unchanged opponents (z order == raw order)
+    diff = sign * (new[:, :, None, :] - base[None, None, :, :])        # teams x players x opponents x cats
+    opponents = ~np.eye(n_teams, dtype=bool)[:, None, :, None]
+    points = ((diff > 0) + 0.5 * (diff == 0)) * opponents
+    games = max(1, n_teams - 1) * len(categories)
+    win_pct = points.sum(axis=(2, 3)) / games
+
+    base_diff = sign * (base[:, None, :] - base[None, :, :])
+    base_points = ((base_diff > 0) + 0.5 * (base_diff == 0)) * ~np.eye(n_teams, dtype=bool)[:, :, None]
+    base_win_pct = base_points.sum(axis=(1, 2)) / games
+
+    on_team = np.array([[player_map[pid].on_team_id == team_id for pid in player_ids] for team_id in team_map])
+    on_team |= weights > 0
+    win_pct[on_team] = np.nan
+    z_new[on_team] = np.nan
+
+    return {
+        "team_ids": list(team_map.keys()),
+        "player_ids": player_ids,
+        "win_pct": win_pct,
+        "win_pct_delta": win_pct - base_win_pct[:, None],
+        "z_delta": z_new - z_base[:, None],
+    }
+
+
+def flip_thresholds(team_map, my_team_id, categories, mask):
+    """
+    Raw amount needed to flip every lost category against every opponent, for all stat types at once.
+    Counting stats: the gap itself (TO: how much to cut). FG%/FT%: made shots needed at 100% shooting,
+    x = (p_opp * A - M) / (1 - p_opp), with A, M my attempts and makes.
+    Returns {"opponents", "categories", "stats_types", "lost" [stype, opp, cat] bool,
+             "raw" (gap in raw units, NaN when not lost), "made" (for % categories, NaN otherwise),
+             "z" (gap in units of the league std of that category)}.
+    """
+    opponents = [team_id for team_id in team_map if team_id != my_team_id]
+    pct = np.array([cat.endswith("%") for cat in categories])
+    sign = np.where(mask, -1.0, 1.0)
+    stypes = get_stats_types(team_map)
+
+    values = np.array([
+        [[team.stats[stype].get(cat, 0) for cat in categories] for stype in stypes]
+        for team in team_map.values()
+    ], dtype=float)                                                       # teams x stypes x cats
+    shots = np.array([
+        [[team_map[my_team_id].stats[stype].get(f"{cat[:-1]}{suffix}", 0) if cat.endswith("%") else 0
+          for cat in categories] for stype in stypes]
+        for suffix in ("M", "A")
+    ], dtype=float)                                                       # (M, A) x stypes x cats
+
+    row = list(team_map.keys()).index(my_team_id)
+    rows = [list(team_map.keys()).index(team_id) for team_id in opponents]
+    mine = values[row]                                                    # stypes x cats
+    opp = values[rows].transpose(1, 0, 2)                                 # stypes x opps x cats
+
+    gap = sign * (opp - mine[:, None, :])
+    lost = gap > 0
+    std = values.std(axis=0)
+    std = np.where(std == 0, 1, std)
+
+    made, attempted = shots[0][:, None, :], shots[1][:, None, :]
+    with np.errstate(divide="ignore", invalid="ignore"):
+        made_needed = np.where(opp < 1, (opp * attempted - made) / (1 - opp), np.inf)
+
+    return {
+        "opponents": opponents,
+        "categories": list(categories),
+        "stats_types": stypes,
+        "lost": lost,
+        "raw": np.where(lost, gap, np.nan),
+        "made": np.where(lost & pct, np.ceil(made_needed * 10) / 10, np.nan),
+        "z": np.where(lost, gap / std[:, None, :], np.nan),
+    }
+
+
 def update_roster(actions, team_map, player_map):
     """
     Make a new copy of team_map and update rosters based on actions.
@@ -164,16 +385,17 @@ def update_roster(actions, team_map, player_map):
 
 def compute_transaction(players, player_map, counting_stats, percentage_stats):
     # helper
-    info = {stype : {'total': {cat : 0 for cat in counting_stats} } for stype in STATS_TYPES}
+    stypes = get_stats_types(player_map)
+    info = {stype : {'total': {cat : 0 for cat in counting_stats} } for stype in stypes}
     info['size'] = len(players)
     for player_id in players:
         player = player_map.get(player_id)
-        for stype in STATS_TYPES:
-            info.get(stype)[player_id] = player.stats.get(stype)
+        for stype in stypes:
+            info.get(stype)[player_id] = player.stats.get(stype, {})
             for cat in counting_stats:
-                info.get(stype)['total'][cat] += player.stats.get(stype).get(cat, 0)
+                info.get(stype)['total'][cat] += player.stats.get(stype, {}).get(cat, 0)
 
-    for stype in STATS_TYPES:
+    for stype in stypes:
         for stats in percentage_stats:
             made = info.get(stype).get('total').get(f"{stats}M")
             attempt = info.get(stype).get('total').get(f"{stats}A")
@@ -183,7 +405,16 @@ def compute_transaction(players, player_map, counting_stats, percentage_stats):
 
 
 def analyze_transaction(result, actions, player_map, team_map, counting_stats, percentage_stats,
-                        categories, cat_index, mask, roster_size):
+                        categories, cat_index, mask, roster_size, cache=None, version=None):
+    """
+    cache: optional scenario.ScenarioCache, scenarios already analyzed for this
+    snapshot version are restored onto team_map instead of recomputed.
+    """
+    if cache is not None:
+        key = scenario.make_key(actions, result, version)
+        entry = cache.get(key)
+        if entry is not None:
+            return scenario.restore(team_map, entry)
 
     plus = compute_transaction(result.get('plus'), player_map, counting_stats, percentage_stats)
     minus = compute_transaction(result.get('minus'), player_map, counting_stats, percentage_stats)
@@ -193,6 +424,9 @@ def analyze_transaction(result, actions, player_map, team_map, counting_stats, p
     update_roster(actions, team_map, player_map)
     compute_teams_z_scores(team_map, player_map, categories, cat_index, mask, counting_stats, percentage_stats, roster_size)
 
+    if cache is not None:
+        cache.put(key, scenario.capture(team_map, plus, minus))
+
     return plus, minus
 
 
@@ -234,8 +468,46 @@ def get_box_score(team_id, current_matchup_period, team_map, all_categories):
     return box_score
 
 
-def count_games(players, player_map, scoring_period, today):
+def build_availability(league, player_map):
+    """
+    Once per refresh: {"index", "first_day", "chance", "games"} where chance[player, day] comes from injury
+    status and return dates and games = schedule games matrix * chance, so projections only slice it.
+    """
+    first_day, last_day = league.firstScoringPeriod, league.finalScoringPeriod
+    chance = arrays.availability_matrix(player_map, first_day, last_day, league.scoringPeriodId)
+    return {
+        "index": arrays.player_index(list(player_map.keys())),
+        "first_day": first_day,
+        "chance": chance,
+        "games": arrays.games_matrix(player_map, first_day, last_day) * chance,
+    }
+
+
+def availability_rows(availability, player_ids, days, key="games"):
+    """availability[key][players, days] for the given ids and scoring periods, 1 for players it doesn't know."""
+    matrix = availability[key]
+    cols = [day - availability["first_day"] for day in days]
+    rows = np.ones((len(player_ids), len(cols)))
+    known = [i for i, pid in enumerate(player_ids) if pid in availability["index"]]
+    rows[known] = matrix[np.ix_([availability["index"][player_ids[i]] for i in known], cols)]
+    return rows
+
+
+def count_games(players, player_map, scoring_period, today, availability=None):
     # helper
+    """
+    {player_id: {day: schedule entry}} of remaining games.
+    availability: build_availability() result, games of players who are out are left out.
+    """
+    if availability is not None:
+        days = [day for day in scoring_period if day >= today]
+        playable = availability_rows(availability, list(players), days) > 0
+        games = {}
+        for i, player_id in enumerate(players):
+            schedule = player_map[player_id].schedule
+            games[player_id] = {day: schedule[f'{day}'] for day, ok in zip(days, playable[i]) if ok and f'{day}' in schedule}
+        return games
+
     games = {player_id : {} for player_id in players}
     for player_id in players:
         player = player_map.get(player_id)
@@ -246,18 +518,30 @@ def count_games(players, player_map, scoring_period, today):
     return games
 
 
-def sum_projections(games, box_score, counting_stats, percentage_stats, player_map):
+def sum_projections(games, box_score, counting_stats, percentage_stats, player_map, availability=None):
     # helper
-    projections = {stype : box_score.copy() for stype in STATS_TYPES}
-
-    for player_id, days in games.items():
-        for day in days:
-            player = player_map[player_id]
-            for stype in STATS_TYPES:
-                for cat in counting_stats:
-                    projections[stype][cat] += player.stats[stype].get(cat, 0)
+    """availability: build_availability() result, each game then counts by the player's chance to play."""
+    stypes = get_stats_types(player_map)
+    projections = {stype : box_score.copy() for stype in stypes}
+
+    player_ids = [player_id for player_id, days in games.items() if days]
+    weights = np.array([len(games[player_id]) for player_id in player_ids], dtype=float)
+    if availability is not None and player_ids:
+        # one slice for all players over the union of their days, masked to each player's own games
+        days = sorted({day for player_id in player_ids for day in games[player_id]})
+        column = {day: col for col, day in enumerate(days)}
+        played = np.zeros((len(player_ids), len(days)))
+        for row, player_id in enumerate(player_ids):
+            played[row, [column[day] for day in games[player_id]]] = 1
+        weights = (availability_rows(availability, player_ids, days, "chance") * played).sum(axis=1)
+
+    _, tensor = arrays.stats_tensor({player_id: player_map[player_id] for player_id in player_ids}, counting_stats, stypes)
+    totals = weights @ tensor.reshape(len(player_ids), len(stypes) * len(counting_stats))      # [stype * stat]
+    for s, stype in enumerate(stypes):
+        for c, cat in enumerate(counting_stats):
+            projections[stype][cat] += totals[s * len(counting_stats) + c]
     
-    for stype in STATS_TYPES:
+    for stype in stypes:
         for stats in percentage_stats:
             made = projections.get(stype).get(f'{stats}M')
             attempt = projections.get(stype).get(f'{stats}A')
@@ -267,14 +551,15 @@ def sum_projections(games, box_score, counting_stats, percentage_stats, player_m
     return projections
 
 
-def analyze_matchup(team_games, opponent_games, team_box_score, opponent_box_score, all_categories, counting_stats, percentage_stats, player_map):
+def analyze_matchup(team_games, opponent_games, team_box_score, opponent_box_score, all_categories, counting_stats, percentage_stats, player_map,
+                    availability=None):
 
-    team_projections = sum_projections(team_games, team_box_score, counting_stats, percentage_stats, player_map)
-    opponent_projections = sum_projections(opponent_games, opponent_box_score, counting_stats, percentage_stats, player_map)
+    team_projections = sum_projections(team_games, team_box_score, counting_stats, percentage_stats, player_map, availability)
+    opponent_projections = sum_projections(opponent_games, opponent_box_score, counting_stats, percentage_stats, player_map, availability)
 
-    result = {stype: {cat: 0 for cat in all_categories} for stype in STATS_TYPES}
+    result = {stype: {cat: 0 for cat in all_categories} for stype in team_projections}
 
-    for stype in STATS_TYPES:
+    for stype in team_projections:
         for cat in all_categories:
             result[stype][cat] = team_projections[stype][cat] - opponent_projections[stype][cat]
             if cat in counting_stats:
@@ -292,7 +577,7 @@ def analyze_matchup(team_games, opponent_games, team_box_score, opponent_box_sco
 def ranking_with_punting(player_map, categories, punting_cats):
     result = {}
     
-    for stype in STATS_TYPES:
+    for stype in get_stats_types(player_map):
         players_data = []
         
         for player_id, player in player_map.items():
@@ -0,0 +1,55 @@
+from collections import OrderedDict
+import numpy as np
+import pandas as pd
+
+CACHE_SIZE = 16
+BINS = np.array([-1.5, -1.0, -0.5, -0.15, 0.15, 0.5, 1.0, 1.5])     # z-score bucket edges
+COLORS = np.array([
+    "background-color: rgba(218, 54, 51, 0.55)",
+    "background-color: rgba(218, 54, 51, 0.38)",
+    "background-color: rgba(218, 54, 51, 0.22)",
+    "background-color: rgba(218, 54, 51, 0.10)",
+    "",                                             # around average, no color
+    "background-color: rgba(46, 160, 67, 0.10)",
+    "background-color: rgba(46, 160, 67, 0.22)",
+    "background-color: rgba(46, 160, 67, 0.38)",
+    "background-color: rgba(46, 160, 67, 0.55)",
+])
+
+
+def css_frame(df, z, columns):
+    """
+    CSS for the whole table in one pass: z[row, i] (higher is better) colors df[columns[i]].
+    Other columns stay unstyled.
+    """
+    css = np.full(df.shape, "", dtype=object)
+    positions = [df.columns.get_loc(col) for col in columns]
+    css[:, positions] = COLORS[np.digitize(np.asarray(z, dtype=float).reshape(len(df), len(columns)), BINS)]
+    return pd.DataFrame(css, index=df.index, columns=df.columns)
+
+
+def style(df, z, columns):
+    """
+    Returns a Styler of df colored green (above average) to red (below) by z.
+    The CSS is computed once here and handed to the public Styler.apply, so a cached styler
+    only replays it when Streamlit renders the table again.
+    """
+    css = css_frame(df, z, columns)
+    styler = df.style.apply(lambda _: css, axis=None)
+    styler.format(str, na_rep="")      # values are already rounded, keep them as shown unstyled
+    return styler
+
+
+def cached(cache, key, build, size=CACHE_SIZE):
+    """LRU lookup in an OrderedDict cache, build() on a miss. key should hold view, filters and snapshot version."""
+    if key in cache:
+        cache.move_to_end(key)
+        return cache[key]
+    value = cache[key] = build()
+    if len(cache) > size:
+        cache.popitem(last=False)
+    return value
+
+
+def new_cache():
+    return OrderedDict()
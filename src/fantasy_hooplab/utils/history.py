@@ -0,0 +1,110 @@
+import os
+import threading
+import numpy as np
+
+PLAYER_METRICS = ["score", "percent_owned"]
+TEAM_METRICS = ["score", "h2h_most", "h2h_each"]
+
+
+def snapshot_arrays(player_map, team_map, categories, stype="total"):
+    """Compact columnar arrays of today's player and team metrics."""
+    players = list(player_map.values())
+    teams = list(team_map.values())
+    return {
+        "player_id": np.array([p.player_id for p in players], dtype=np.int64),
+        "player_z": np.array([[p.stats_z.get(stype, {}).get(cat, 0) for cat in categories] for p in players],
+                             dtype=np.float32).reshape(len(players), len(categories)),
+        "player_score": np.array([p.stats_z.get(stype, {}).get("score", 0) for p in players], dtype=np.float32),
+        "player_percent_owned": np.array([p.percent_owned or 0 for p in players], dtype=np.float32),
+        "team_id": np.array([t.team_id for t in teams], dtype=np.int64),
+        "team_score": np.array([t.stats_z.get(stype, {}).get("score", 0) for t in teams], dtype=np.float32),
+        "team_h2h_most": np.array([t.h2h_most.get(stype, {}).get("win%", 0) for t in teams], dtype=np.float32),
+        "team_h2h_each": np.array([t.h2h_each.get(stype, {}).get("win%", 0) for t in teams], dtype=np.float32),
+        "categories": np.array(categories),
+    }
+
+
+def append_snapshot(root, date, player_map, team_map, categories, stype="total"):
+    """
+    Append one daily snapshot as a compressed partition root/YYYY-MM-DD.npz.
+    The store is append-only: an existing day is never rewritten, returns False in that case.
+    """
+    os.makedirs(root, exist_ok=True)
+    path = os.path.join(root, f"{date.isoformat()}.npz")
+    if os.path.exists(path):
+        return False
+
+    tmp = os.path.join(root, f".{date.isoformat()}.{os.getpid()}.{threading.get_ident()}.npz")
+    np.savez_compressed(tmp, **snapshot_arrays(player_map, team_map, categories, stype))
+    os.replace(tmp, path)
+    return True
+
+
+def list_dates(root):
+    if not os.path.isdir(root):
+        return []
+    return sorted(file[:-4] for file in os.listdir(root) if file.endswith(".npz") and not file.startswith("."))
+
+
+def load_history(root, start=None, end=None):
+    """
+    Read snapshots between start and end (ISO dates, inclusive) into aligned time series:
+    player metrics as [day, player] matrices over the union of player ids (NaN when absent),
+    team metrics as [day, team]. Only the partitions in range are opened.
+    """
+    dates = [d for d in list_dates(root) if (start is None or d >= str(start)) and (end is None or d <= str(end))]
+    parts = []
+    for date in dates:
+        with np.load(os.path.join(root, f"{date}.npz")) as part:
+            parts.append({key: part[key] for key in part.files})
+
+    player_ids = np.unique(np.concatenate([p["player_id"] for p in parts])) if parts else np.array([], dtype=np.int64)
+    team_ids = np.unique(np.concatenate([p["team_id"] for p in parts])) if parts else np.array([], dtype=np.int64)
+    categories = list(parts[-1]["categories"]) if parts else []
+
+    history = {
+        "dates": np.array(dates, dtype="datetime64[D]"),
+        "player_id": player_ids,
+        "team_id": team_ids,
+        "categories": categories,
+        "player_z": np.full((len(dates), len(player_ids), len(categories)), np.nan, dtype=np.float32),
+    }
+    for metric in PLAYER_METRICS:
+        history[f"player_{metric}"] = np.full((len(dates), len(player_ids)), np.nan, dtype=np.float32)
+    for metric in TEAM_METRICS:
+        history[f"team_{metric}"] = np.full((len(dates), len(team_ids)), np.nan, dtype=np.float32)
+
+    for day, part in enumerate(parts):
+        rows = np.searchsorted(player_ids, part["player_id"])
+        history["player_z"][day, rows] = part["player_z"]
+        for metric in PLAYER_METRICS:
+            history[f"player_{metric}"][day, rows] = part[f"player_{metric}"]
+
+        rows = np.searchsorted(team_ids, part["team_id"])
+        for metric in TEAM_METRICS:
+            history[f"team_{metric}"][day, rows] = part[f"team_{metric}"]
+
+    return history
+
+
+def risers_fallers(history, metric="player_score", days=7, top=10):
+    """
+    Change of a player metric over the last `days` calendar days: from the newest snapshot dated on or before
+    that many days ago (the oldest one if the history is shorter) to the newest snapshot. Days without a fetch
+    have no snapshot, so this selects by date, not by snapshot count.
+    Returns (risers, fallers) as lists of (player_id, change), players missing at either end are skipped.
+    """
+    series = history[metric]
+    if len(series) < 2:
+        return [], []
+
+    dates = history["dates"]
+    base = max(0, int(np.searchsorted(dates, dates[-1] - np.timedelta64(days, "D"), side="right")) - 1)
+    change = series[-1] - series[base]
+    valid = np.flatnonzero(~np.isnan(change))
+    order = valid[np.argsort(change[valid])]
+
+    ids = history["player_id"]
+    risers = [(int(ids[i]), float(change[i])) for i in order[::-1][:top]]
+    fallers = [(int(ids[i]), float(change[i])) for i in order[:top]]
+    return risers, fallers
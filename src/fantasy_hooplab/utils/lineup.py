@@ -0,0 +1,103 @@
+import numpy as np
+
+BENCH_SLOTS = ["BE", "IR"]
+START_BONUS = 1e6   # filling a slot always beats a better player left on the bench
+
+
+def expand_slots(lineup_slots):
+    """{'PG': 1, 'UT': 3, ...} -> ['PG', 'UT', 'UT', 'UT', ...], bench and IR excluded."""
+    return [slot for slot, count in lineup_slots.items() if slot not in BENCH_SLOTS for _ in range(count)]
+
+
+def hungarian(cost):
+    """
+    Minimum-cost assignment for a rows <= cols cost matrix (shortest augmenting path with potentials).
+    Returns col_of_row, the column assigned to every row.
+    """
+    n, m = cost.shape
+    u = np.zeros(n + 1)
+    v = np.zeros(m + 1)
+    row_of_col = np.zeros(m + 1, dtype=int)     # 1-based row matched to each column, 0 = free
+    way = np.zeros(m + 1, dtype=int)
+
+    for row in range(1, n + 1):
+        row_of_col[0] = row
+        col = 0
+        minv = np.full(m + 1, np.inf)
+        used = np.zeros(m + 1, dtype=bool)
+        while row_of_col[col] != 0:
+            used[col] = True
+            i = row_of_col[col]
+            # reduced costs of the free columns from the row just reached
+            reduced = cost[i - 1] - u[i] - v[1:]
+            free = ~used[1:]
+            better = free & (reduced < minv[1:])
+            minv[1:][better] = reduced[better]
+            way[1:][better] = col
+
+            candidates = np.where(free, minv[1:], np.inf)
+            nxt = int(np.argmin(candidates)) + 1
+            delta = candidates[nxt - 1]
+
+            u[row_of_col[used]] += delta
+            v[used] -= delta
+            minv[1:][free] -= delta
+            col = nxt
+        while col:
+            prev = way[col]
+            row_of_col[col] = row_of_col[prev]
+            col = prev
+
+    col_of_row = np.zeros(n, dtype=int)
+    for col in range(1, m + 1):
+        if row_of_col[col]:
+            col_of_row[row_of_col[col] - 1] = col - 1
+    return col_of_row
+
+
+def best_lineup(player_ids, player_map, slots, values):
+    """
+    Pick the starters among player_ids for one day as a max-weight bipartite matching players -> slots.
+    values = {player_id: value}, only eligible pairs can be matched. Returns the started player ids.
+    """
+    if not player_ids or not slots:
+        return []
+
+    profit = np.zeros((len(player_ids), len(slots)))
+    for row, player_id in enumerate(player_ids):
+        eligible = player_map[player_id].eligible_slots
+        value = START_BONUS + values.get(player_id, 0)
+        for col, slot in enumerate(slots):
+            if slot in eligible:
+                profit[row, col] = value
+
+    transpose = len(player_ids) > len(slots)
+    matrix = -(profit.T if transpose else profit)
+    assigned = hungarian(matrix)
+
+    started = []
+    for row, col in enumerate(assigned):
+        player_row, slot_col = (col, row) if transpose else (row, col)
+        if profit[player_row, slot_col] > 0:
+            started.append(player_ids[player_row])
+    return started
+
+
+def optimize_week(games, player_map, lineup_slots, stype="total"):
+    """
+    games = {player_id: [days]} of selected games, returns the same shape keeping only started games.
+    Each day is solved independently, players are valued by their z-score for stype.
+    """
+    slots = expand_slots(lineup_slots)
+    values = {pid: player_map[pid].stats_z.get(stype, {}).get("score", 0) for pid in games}
+
+    by_day = {}
+    for player_id, days in games.items():
+        for day in days:
+            by_day.setdefault(day, []).append(player_id)
+
+    started = {player_id: [] for player_id in games}
+    for day in sorted(by_day):
+        for player_id in best_lineup(by_day[day], player_map, slots, values):
+            started[player_id].append(day)
+    return started
@@ -0,0 +1,121 @@
+import numpy as np
+from utils.player import get_stats_types
+
+
+class RunningStats:
+    """
+    Welford aggregates (count, mean, M2) per stat type and category over a reference pool.
+    Members are added, removed or updated one at a time in O(categories) per stat type,
+    mean_std() then returns what get_mean_std() would over the current pool without rescanning it.
+    """
+    def __init__(self, categories):
+        self.categories = list(categories)
+        self.count = 0
+        self.mean = {}          # stype -> np.array[C]
+        self.m2 = {}            # stype -> np.array[C]
+        self.members = {}       # key -> {stype: np.array[C]}, the values each member contributed
+
+
+    @classmethod
+    def from_pool(cls, obj_map, categories):
+        """Start from an existing pool, initialized in one vectorized pass."""
+        pool = cls(categories)
+        for key, obj in obj_map.items():
+            pool.members[key] = pool.values(obj)
+        pool.count = len(pool.members)
+        for stype in get_stats_types(obj_map):
+            pool.track(stype)
+        return pool
+
+
+    def values(self, obj):
+        # helper
+        return {stype: np.array([obj.stats.get(stype, {}).get(cat, 0) for cat in self.categories], dtype=float)
+                for stype in (list(self.mean) or list(obj.stats))}
+
+
+    def track(self, stype, obj_map=None):
+        """
+        (Re)build one stat type from the members' values, e.g. after add_stats_type.
+        obj_map: re-read the members' values for stype from it first (needed for a new stat type).
+        """
+        if obj_map is not None or any(stype not in vectors for vectors in self.members.values()):
+            for key, vectors in self.members.items():
+                obj = (obj_map or {}).get(key)
+                stats = obj.stats.get(stype, {}) if obj else {}
+                vectors[stype] = np.array([stats.get(cat, 0) for cat in self.categories], dtype=float)
+
+        values = np.array([vectors[stype] for vectors in self.members.values()], dtype=float)
+        values = values.reshape(len(self.members), len(self.categories))
+        self.mean[stype] = values.mean(axis=0) if len(values) else np.zeros(len(self.categories))
+        self.m2[stype] = ((values - self.mean[stype]) ** 2).sum(axis=0)
+
+
+    def untrack(self, stype):
+        """Drop one stat type, e.g. an extra type the refreshed players don't have."""
+        self.mean.pop(stype, None)
+        self.m2.pop(stype, None)
+        for vectors in self.members.values():
+            vectors.pop(stype, None)
+
+
+    def add(self, key, obj):
+        """A member enters the pool."""
+        if key in self.members:
+            return self.update(key, obj)
+        vectors = self.values(obj)
+        self.members[key] = vectors
+        self.count += 1
+        for stype in self.mean:
+            x = vectors[stype]
+            delta = x - self.mean[stype]
+            self.mean[stype] = self.mean[stype] + delta / self.count
+            self.m2[stype] = self.m2[stype] + delta * (x - self.mean[stype])
+
+
+    def remove(self, key):
+        """A member leaves the pool."""
+        vectors = self.members.pop(key, None)
+        if vectors is None:
+            return
+        self.count -= 1
+        for stype in self.mean:
+            x = vectors[stype]
+            if self.count == 0:
+                self.mean[stype] = np.zeros(len(self.categories))
+                self.m2[stype] = np.zeros(len(self.categories))
+                continue
+            old_mean = self.mean[stype]
+            self.mean[stype] = (old_mean * (self.count + 1) - x) / self.count
+            self.m2[stype] = np.maximum(self.m2[stype] - (x - old_mean) * (x - self.mean[stype]), 0)
+
+
+    def update(self, key, obj):
+        """A member's stats changed, replace its contribution in place."""
+        if key not in self.members:
+            return self.add(key, obj)
+        old = self.members[key]
+        new = self.values(obj)
+        self.members[key] = new
+        for stype in self.mean:
+            x = new[stype]
+            old_mean = self.mean[stype]
+            self.mean[stype] = old_mean + (x - old[stype]) / self.count
+            self.m2[stype] = np.maximum(self.m2[stype] + (x - old[stype]) * (x - self.mean[stype] + old[stype] - old_mean), 0)
+
+
+    def mean_std(self, obj_map=None):
+        """
+        Same output as fantasy.get_mean_std: {stype: {cat: value}} means and population stds (0 -> 1).
+        Stat types registered since the last call are built from obj_map.
+        """
+        mean_dict = {}
+        std_dict = {}
+        for stype in (get_stats_types(obj_map) if obj_map else list(self.mean)):
+            if stype not in self.mean:
+                self.track(stype, obj_map)
+            stds = np.sqrt(self.m2[stype] / self.count) if self.count else np.zeros(len(self.categories))
+            stds = np.where(stds == 0, 1, stds)
+            mean_dict[stype] = dict(zip(self.categories, self.mean[stype]))
+            std_dict[stype] = dict(zip(self.categories, stds))
+        return mean_dict, std_dict
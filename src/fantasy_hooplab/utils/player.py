@@ -1,5 +1,4 @@
 from datetime import datetime
-from espn_api.basketball.constant import PRO_TEAM_MAP
 
 STATS_TYPES = ["projected", "total", "last_30", "last_15", "last_7"]
 RATING_CATS = ["PTS", "FT%", "AST", "STL", "3PM", 'BLK', "REB", 'FG%']
@@ -15,6 +14,16 @@ CRITERIAS = {
 }
 
 
+def get_stats_types(obj_map):
+    """
+    The ESPN splits plus the extra stat types (custom split, blend, ...) registered on this map's
+    players or teams with fantasy.add_stats_type. Extra types live on the objects, never in STATS_TYPES.
+    """
+    for obj in obj_map.values():
+        return STATS_TYPES + [stype for stype in obj.stats if stype not in STATS_TYPES]
+    return list(STATS_TYPES)
+
+
 class Player:
     def __init__(self, player):
 
@@ -77,6 +86,7 @@ class Player:
         self.percent_owned = ownership.get("percentOwned")
 
         if len(self.schedule) == 0:
+            from espn_api.basketball.constant import PRO_TEAM_MAP
             pro_team_id = info.get("proTeamId")
             pro_team = pro_team_schedule.get(pro_team_id, {})
             for key in pro_team:
@@ -0,0 +1,167 @@
+import json
+import time
+import hashlib
+import logging
+import threading
+
+logger = logging.getLogger(__name__)
+
+IDLE_TIMEOUT = 600      # seconds without a reader after which a poller stops itself
+MAX_BACKOFF = 900       # longest wait between polls while they keep failing
+
+_pollers = {}           # (endpoint, matchup_period, cookie hash) -> ScoreboardPoller shared by all sessions of this process
+_pollers_lock = threading.Lock()
+
+
+def parse_box_scores(data, matchup_period):
+    """Returns {team_id: {category: score}} for the matchups of one matchup period."""
+    from espn_api.basketball.constant import STATS_MAP
+
+    box_scores = {}
+    for matchup in data.get("schedule", []):
+        if matchup.get("matchupPeriodId") != matchup_period:
+            continue
+        for side in ("home", "away"):
+            team = matchup.get(side)
+            if not team:
+                continue
+            by_stat = (team.get("cumulativeScore") or {}).get("scoreByStat") or {}
+            box_scores[team["teamId"]] = {STATS_MAP.get(stat, stat): value.get("score", 0) for stat, value in by_stat.items()}
+    return box_scores
+
+
+class ScoreboardPoller(threading.Thread):
+    """
+    Daemon thread refreshing the current matchup period's category totals every `interval` seconds.
+    Sends If-None-Match when the server gave an ETag and skips payloads whose hash did not change.
+    Readers call box_scores() which only copies under the lock, never waits on the network.
+    With idle_timeout set the thread stops once nobody called touch() or box_scores() for that long,
+    so pollers of closed sessions don't keep hitting ESPN.
+    Failed polls double the wait (up to MAX_BACKOFF), only the first failure of a streak logs a traceback.
+    """
+    def __init__(self, endpoint, matchup_period, interval=60, cookies=None, timeout=10, idle_timeout=None):
+        super().__init__(daemon=True)
+        self.endpoint = endpoint
+        self.matchup_period = matchup_period
+        self.interval = interval
+        self.cookies = cookies
+        self.timeout = timeout
+        self.idle_timeout = idle_timeout
+        self.last_used = time.monotonic()
+
+        self.lock = threading.Lock()
+        self.stopped = threading.Event()
+        self.scores = {}
+        self.version = 0            # bumped on every changed payload
+        self.etag = None
+        self.digest = None
+        self.polls = 0
+        self.skipped = 0
+        self.failures = 0           # consecutive failed polls
+
+
+    @classmethod
+    def from_league(cls, league, interval=60, idle_timeout=None):
+        request = league.espn_request
+        return cls(request.LEAGUE_ENDPOINT, league.currentMatchupPeriod, interval, request.cookies, idle_timeout=idle_timeout)
+
+
+    def poll_once(self):
+        """Fetch once, returns True if new box scores were published."""
+        import requests
+
+        params = {"view": "mMatchupScore"}
+        filters = {"schedule": {"filterMatchupPeriodIds": {"value": [self.matchup_period]}}}
+        headers = {"x-fantasy-filter": json.dumps(filters)}
+        if self.etag:
+            headers["If-None-Match"] = self.etag
+
+        r = requests.get(self.endpoint, params=params, headers=headers, cookies=self.cookies, timeout=self.timeout)
+        self.polls += 1
+        if r.status_code == 304:
+            self.skipped += 1
+            return False
+        r.raise_for_status()
+
+        self.etag = r.headers.get("ETag", self.etag)
+        digest = hashlib.sha1(r.content).hexdigest()
+        if digest == self.digest:
+            self.skipped += 1
+            return False
+
+        scores = parse_box_scores(r.json(), self.matchup_period)
+        with self.lock:
+            self.scores = scores
+            self.version += 1
+        self.digest = digest
+        return True
+
+
+    def run(self):
+        while not self.stopped.is_set():
+            if self.idle_timeout and time.monotonic() - self.last_used > self.idle_timeout:
+                break
+            try:
+                self.poll_once()
+                if self.failures:
+                    logger.info("scoreboard poll recovered after %d failures", self.failures)
+                self.failures = 0
+            except Exception as e:
+                self.failures += 1
+                if self.failures == 1:
+                    logger.exception("scoreboard poll failed")
+                else:
+                    logger.debug("scoreboard poll failed again (%d in a row): %s", self.failures, e)
+            self.stopped.wait(self.wait_time())
+        self.stopped.set()
+
+
+    def wait_time(self):
+        """Seconds until the next poll: interval, doubled per consecutive failure up to MAX_BACKOFF."""
+        if not self.failures:
+            return self.interval
+        return max(self.interval, min(self.interval * 2 ** self.failures, MAX_BACKOFF))
+
+
+    def stop(self):
+        self.stopped.set()
+
+
+    def touch(self):
+        """A reader is still around, keeps an idle_timeout poller running."""
+        self.last_used = time.monotonic()
+
+
+    def box_scores(self):
+        """Latest {team_id: {category: score}} snapshot and its version."""
+        self.touch()
+        with self.lock:
+            return dict(self.scores), self.version
+
+
+def cookie_key(cookies):
+    # helper
+    """Hash of the espn_s2/SWID cookies, the registry key must not hold the credentials themselves."""
+    return hashlib.sha1(json.dumps(cookies or {}, sort_keys=True, default=str).encode()).hexdigest()
+
+
+def shared_poller(league, interval=60, idle_timeout=IDLE_TIMEOUT):
+    """
+    The one poller of this process for the league's current matchup period, started on first use.
+    Every session calls this on each run instead of owning a thread: that keeps the poller alive,
+    and once no session has run for idle_timeout seconds (tabs closed) it stops and a later call starts a new one.
+    Sessions only share a poller when they use the same cookies, so a private league's scores never reach
+    a session that connected with other (or no) credentials.
+    """
+    request = league.espn_request
+    key = (request.LEAGUE_ENDPOINT, league.currentMatchupPeriod, cookie_key(request.cookies))
+    with _pollers_lock:
+        for stale in [k for k, poller in _pollers.items() if poller.stopped.is_set()]:
+            del _pollers[stale]
+        poller = _pollers.get(key)
+        if poller is None:
+            poller = ScoreboardPoller.from_league(league, interval, idle_timeout)
+            poller.start()
+            _pollers[key] = poller
+    poller.touch()
+    return poller
@@ -1,9 +1,10 @@
 import streamlit as st
+import numpy as np
 import pandas as pd
-import plotly.graph_objects as go
 from utils.player import RATING_CATS
 from utils.team import CATEGORIES
-from utils import fantasy
+from utils import fantasy, scenario, history, lineup, streaming, store, charts, heatmap, draft, seasons
+from utils.similarity import SimilarityIndex
 
 
 def round_value(cat, val, is_z=False):
@@ -62,89 +63,7 @@ def make_h2h_each_df(team_map):
     return df    
 
 
-# --- Helper: 
-def get_position_color(position):
-    """Returns line_color and fillcolor based on position"""
-    colors = {
-        'PG': {
-            'line': '#EF5350',  # Red
-            'fill': 'rgba(239, 83, 80, 0.3)'
-        },
-        'SG': {
-            'line': '#FFA726',  # Orange
-            'fill': 'rgba(255, 167, 38, 0.3)'
-        },
-        'SF': {
-            'line': '#66BB6A',  # Green
-            'fill': 'rgba(102, 187, 106, 0.3)'
-        },
-        'PF': {
-            'line': '#1f77b4',  # Blue (the one you liked)
-            'fill': 'rgba(31, 119, 180, 0.3)'
-        },
-        'C': {
-            'line': '#AB47BC',  # Purple
-            'fill': 'rgba(171, 71, 188, 0.3)'
-        }
-    }
-    return colors.get(position, colors['PF'])  # Default to blue if position not found
-
-
-# --- Helper: 
-def create_radar(player_name, stats, position):
-    # Define categories in clockwise order starting from 12 o'clock
-    categories = RATING_CATS
-    
-    # Get values in the same order
-    values = [stats.get(cat, 0) for cat in categories]
-    
-    # Close the loop by adding the first value at the end
-    values_closed = values + [values[0]]
-    categories_closed = categories + [categories[0]]
-
-    # Get colors based on position
-    colors = get_position_color(position)
-    
-    fig = go.Figure(data=go.Scatterpolar(
-        r=values_closed,
-        theta=categories_closed,
-        fill='toself',
-        line_color=colors['line'],
-        fillcolor=colors['fill'],
-        line_width=2
-    ))
-    
-    fig.update_layout(
-        polar=dict(
-            radialaxis=dict(
-                visible=True,
-                range=[0, 5],
-                tickmode='array',
-                tickvals=[1, 2, 3, 4, 5],
-                showticklabels=False,
-                gridcolor='#444444',  # Darker grid lines
-                tickfont=dict(color='#CCCCCC')  # Light text for ticks
-            ),
-            angularaxis=dict(
-                direction='clockwise',
-                period=8,
-                gridcolor='#444444',  # Darker grid lines
-                tickfont=dict(color='#CCCCCC')  # Light text for labels
-            ),
-            bgcolor='#1E1E1E'  # Dark background for the polar area
-        ),
-        showlegend=False,
-        height=400,
-        margin=dict(l=80, r=80, t=80, b=80),
-        title=dict(text=f"{player_name} ({position})", x=0.5, xanchor='center', font=dict(color='#CCCCCC')),
-        paper_bgcolor='#0E1117',  # Dark background for entire chart (matches Streamlit dark theme)
-        plot_bgcolor='#0E1117'  # Dark background for plot area
-    )
-    
-    return fig
-
-
-def show_radar_charts(players, ratings):
+def show_radar_charts(players, ratings, stype="total"):
     
     # Then add a search/filter for radar charts
     st.markdown("### 📊 View Player Radar Chart")
@@ -160,11 +79,13 @@ def show_radar_charts(players, ratings):
     selected_player = next((p for p in players.values() if p.name == selected_player_name), None)
 
     if selected_player:
-        rating = selected_player.ratings['total']
+        rating = selected_player.ratings[stype]
         col1, col2 = st.columns(2)
         
         with col1:
-            st.plotly_chart(create_radar(selected_player.name, rating, selected_player.position), width='stretch')
+            key = ("player", selected_player.player_id, stype, chart_version())
+            fig = charts.cached_figure(key, lambda: charts.create_radar(selected_player.name, rating, selected_player.position, RATING_CATS))
+            st.plotly_chart(fig, width='stretch')
         
         with col2:
             st.subheader("Stats Breakdown")
@@ -180,6 +101,32 @@ def show_radar_charts(players, ratings):
                     st.metric(cat, ratings.get(rating.get(cat, 0)))
 
 
+# helper
+def chart_version():
+    """
+    Version part of the charts.cached_figure keys. The figure cache is shared by all sessions while the
+    custom and blended stat types are built per session, so their settings go in next to the snapshot version.
+    """
+    return (st.session_state.get("snapshot_version"), st.session_state.get("custom_split"),
+            tuple(sorted(st.session_state.get("blend_weights", {}).items())), st.session_state.get("blend_shrink"))
+
+
+def show_comparison_charts(players, team_map, stype="total"):
+    """Team profiles and a multi-player comparison, each one cached figure."""
+    version = chart_version()
+    col1, col2 = st.columns(2)
+    with col1:
+        st.markdown("### 🏢 Team Radar")
+        st.plotly_chart(charts.teams_radar(team_map, RATING_CATS, stype, version), width='stretch')
+    with col2:
+        st.markdown("### 🆚 Compare Players")
+        selected = st.multiselect("Players:", list(players.keys()), default=list(players.keys())[:3], max_selections=6,
+                                  format_func=lambda pid: players[pid].name, key="compare_players")
+        if selected:
+            st.plotly_chart(charts.players_radar([players[pid] for pid in selected], RATING_CATS, stype, version),
+                            width='stretch')
+
+
 def show_players(player_map, team_map):
     st.markdown("### 🧍 Player Stats (total)")
     col1, col2, col3, col4 = st.columns(4)
@@ -213,9 +160,27 @@ def show_players(player_map, team_map):
         )
 
 
+    key = ("players", player_view, ownership_filter, tuple(punt_cats), tuple(position_filter), st.session_state.get("snapshot_version"))
+    styler = heatmap.cached(get_style_cache(), key, lambda: build_players_table(player_map, team_map, player_view, ownership_filter,
+                                                                                punt_cats, position_filter))
+    st.dataframe(styler, width='stretch', height=len(styler.data) * 35 + 38, hide_index=True)
+    st.write("")
+    show_similar_players(player_map, team_map, "players")
+
+
+# --- Helper: session cache of styled tables
+def get_style_cache():
+    if "style_cache" not in st.session_state:
+        st.session_state.style_cache = heatmap.new_cache()
+    return st.session_state.style_cache
+
+
+# --- Helper: Players table colored by z-scores
+def build_players_table(player_map, team_map, player_view, ownership_filter, punt_cats, position_filter):
     rankings = fantasy.ranking_with_punting(player_map, CATEGORIES, punt_cats)
 
     player_rows = []
+    z_rows = []
 
     for player in rankings['total']:
         p = player_map.get(player['player_id'])
@@ -251,9 +216,159 @@ def show_players(player_map, team_map):
             base[cat] = round_value(cat, val, player_view == "Z-Scores")
         base["ROS%"] = round(p.percent_owned, 1)
         player_rows.append(base)
+        z_rows.append([p.stats_z["total"].get(cat, 0) for cat in cats])
+
+    player_df = pd.DataFrame(player_rows, columns=["Rank", "Name", "Ownership", "Pro Team", "Pos", "Score", "Punted Score"]
+                             + CATEGORIES + ["ROS%"])
+    return heatmap.style(player_df, z_rows, CATEGORIES)
+
+
+def get_similarity_index(player_map, stype="total"):
+    """Session cached SimilarityIndex, rebuilt when the league snapshot changes."""
+    key = (st.session_state.get("snapshot_version"), stype)
+    if st.session_state.get("similarity_key") != key:
+        st.session_state.similarity_index = SimilarityIndex(player_map, CATEGORIES, stype)
+        st.session_state.similarity_key = key
+    return st.session_state.similarity_index
+
+
+def show_similar_players(player_map, team_map, key_prefix):
+    st.markdown("### 🔎 Similar Players")
+    index = get_similarity_index(player_map)
 
-    player_df = pd.DataFrame(player_rows)
-    st.dataframe(player_df, width='stretch', height=len(player_df) * 35 + 38, hide_index=True)
+    by_score = sorted(player_map.values(), key=lambda p: p.stats_z["total"].get("score", 0), reverse=True)
+    ownerships = {"All": None, "Free Agents": 0}
+    ownerships.update({t.name: t.team_id for t in team_map.values()})
+
+    col1, col2, col3, col4 = st.columns(4)
+    with col1:
+        target = st.selectbox("Players like:", [p.player_id for p in by_score],
+                              format_func=lambda pid: player_map[pid].name, key=f"{key_prefix}_similar_target")
+    with col2:
+        ownership = st.selectbox("Ownership:", list(ownerships.keys()), key=f"{key_prefix}_similar_owner")
+    with col3:
+        positions = st.multiselect("Positions:", ['PG', 'SG', 'SF', 'PF', 'C'], default=[], key=f"{key_prefix}_similar_pos")
+    with col4:
+        punt_cats = st.multiselect("Ignore categories:", CATEGORIES, default=[], key=f"{key_prefix}_similar_punt")
+
+    rows = []
+    for pid, distance in index.query(target, 10, positions, ownerships[ownership], punt_cats):
+        p = player_map[pid]
+        row = {
+            "Name": p.name,
+            "Ownership": team_map[p.on_team_id].name if p.on_team_id in team_map else "FA",
+            "Pos": p.position,
+            "Distance": round(distance, 2),
+            "Score": round(p.stats_z["total"].get("score", 0), 2),
+        }
+        for cat in CATEGORIES:
+            row[cat] = round(p.stats_z["total"].get(cat, 0), 2)
+        rows.append(row)
+    st.dataframe(pd.DataFrame(rows), width='stretch', hide_index=True)
+
+
+SQL_EXAMPLE = """SELECT p.name, p.position, p.pro_team, s.value AS stl, COUNT(g.scoring_period) AS games
+FROM players p
+JOIN stats s ON s.player_id = p.player_id AND s.stype = 'last_15' AND s.stat = 'STL'
+JOIN schedule g ON g.player_id = p.player_id AND g.scoring_period BETWEEN :today AND :week_end
+WHERE p.on_team_id = 0 AND s.value >= 1.5
+GROUP BY p.player_id HAVING games >= 4
+ORDER BY stl DESC"""
+
+
+# --- Helper: session store, rebuilt when the league snapshot changes
+def get_store(team_map, player_map):
+    key = st.session_state.get("snapshot_version")
+    if st.session_state.get("store_key") != key:
+        st.session_state.store = store.populate(store.connect(), team_map, player_map)
+        st.session_state.store_key = key
+    return st.session_state.store
+
+
+def show_sql_query(player_map, team_map, league):
+    with st.expander("🗄️ SQL Query"):
+        st.caption("Tables: players, stats (player_id, stype, stat, value), z_scores (player_id, stype, cat, value), "
+                   "teams, rosters, schedule (player_id, scoring_period, date, opponent). "
+                   "Parameters: :today, :week_start, :week_end (current matchup week).")
+        sql = st.text_area("Query:", SQL_EXAMPLE, height=180, key="sql_query")
+        if st.button("Run Query"):
+            week = fantasy.build_matchup_scoring_period(league).get(str(league.currentMatchupPeriod), [league.scoringPeriodId])
+            params = {"today": league.scoringPeriodId, "week_start": week[0], "week_end": week[-1]}
+            try:
+                columns, rows = store.query(get_store(team_map, player_map), sql, params)
+                st.dataframe(pd.DataFrame(rows, columns=columns), width='stretch', hide_index=True)
+            except Exception as e:
+                st.error(f"Query failed: {e}")
+
+
+def show_trends(series, player_map):
+    st.markdown("### 📈 Trends")
+    if len(series["dates"]) < 2:
+        st.write("Trends appear after fetching the league on at least two different days.")
+        return
+
+    col1, col2 = st.columns(2)
+    with col1:
+        metric = st.radio("Metric:", ["Score", "ROS%"], key="trend_metric", horizontal=True)
+    with col2:
+        days = st.selectbox("Over last:", [7, 14, 30], index=0, key="trend_days", format_func=lambda d: f"{d} days")
+    metric = "player_score" if metric == "Score" else "player_percent_owned"
+
+    risers, fallers = history.risers_fallers(series, metric, days)
+    name = lambda pid: player_map[pid].name if pid in player_map else pid
+    col1, col2 = st.columns(2)
+    with col1:
+        st.markdown("#### ⬆️ Risers")
+        st.dataframe(pd.DataFrame([{"Name": name(pid), "Change": round(c, 2)} for pid, c in risers]), hide_index=True)
+    with col2:
+        st.markdown("#### ⬇️ Fallers")
+        st.dataframe(pd.DataFrame([{"Name": name(pid), "Change": round(c, 2)} for pid, c in fallers]), hide_index=True)
+
+    ids = list(series["player_id"])
+    options = [int(pid) for pid in ids if pid in player_map]
+    selected = st.multiselect("Players:", options, format_func=name, key="trend_players",
+                              default=[pid for pid, _ in risers[:3] if pid in player_map])
+    if selected:
+        df = pd.DataFrame(series[metric][:, [ids.index(pid) for pid in selected]],
+                          index=pd.to_datetime(series["dates"]), columns=[name(pid) for pid in selected])
+        st.line_chart(df)
+
+
+def show_seasons(league_id, year, categories, mask, stat_keys, roster_size, team_count):
+    with st.expander("Multi-Season"):
+        past = st.multiselect("Past seasons:", list(range(year - 1, year - 6, -1)), default=[year - 1], key="season_years")
+        if st.button("Load Seasons"):
+            current = {"player_map": st.session_state.player_map, "top_players_map": st.session_state.top_players_map}
+            with st.spinner("Loading seasons..."):
+                states = seasons.load_seasons(league_id, past + [year], roster_size, team_count, states={year: current})
+            st.session_state.season_index = seasons.SeasonIndex.from_states(states, stat_keys)
+        index = st.session_state.get("season_index")
+        if not index or len(index.years) < 2:
+            st.caption("Joins the players of several seasons by player id for year-over-year comparisons.")
+            return
+
+        col1, col2 = st.columns(2)
+        with col1:
+            stype = st.selectbox("Stats Type:", index.stypes, key="season_stype",
+                                 index=index.stypes.index("total"))
+        with col2:
+            year_from = st.selectbox("Compare with:", index.years[:-1], index=len(index.years) - 2, key="season_from")
+        year_to = index.years[-1]
+
+        trend = index.trend(categories, mask, year_from, year_to, stype)
+        rows = []
+        for entry in index.ranking(categories, mask, stype=stype)[:100]:
+            row = index.row[entry["player_id"]]
+            rows.append({
+                "Rank": entry["rank"],
+                "Name": entry["name"],
+                "Seasons": entry["years"],
+                "Multi-year Score": round(entry["value"], 2),
+                f"Δ Score {year_from}→{year_to}": round(float(np.nansum(trend[row])), 2) if not np.isnan(trend[row]).all() else None,
+                **{f"Δ {cat}": round_value(cat, float(index.delta(cat, year_from, year_to, stype)[row])) for cat in categories},
+            })
+        st.dataframe(pd.DataFrame(rows), width='stretch', hide_index=True)
+        st.caption("Multi-year score: average z-score total over a player's seasons, each season against its own player pool.")
 
 
 def show_teams(team_map, counting_stats, roster_size, trade):
@@ -264,6 +379,7 @@ def show_teams(team_map, counting_stats, roster_size, trade):
         team_view = st.radio("View:", ["Total", "Average", "Z-Scores"], key=f"team_view{trade}", horizontal=True)
 
     team_rows = []
+    z_rows = []
     for t in team_map.values():
         base = {
             "Team": t.name,
@@ -277,9 +393,10 @@ def show_teams(team_map, counting_stats, roster_size, trade):
                 val = val / roster_size
             base[cat] = round_value(cat, val, team_view == "Z-Scores")
         team_rows.append(base)
+        z_rows.append([t.stats_z["total"].get(cat, 0) for cat in CATEGORIES])
 
     team_df = pd.DataFrame(team_rows)
-    st.dataframe(team_df, width='stretch', hide_index=True)
+    st.dataframe(heatmap.style(team_df, z_rows, CATEGORIES), width='stretch', hide_index=True)
 
 
 def show_standings(team_map, my_team_id):
@@ -294,6 +411,34 @@ def show_standings(team_map, my_team_id):
         st.dataframe(df_each, width='content', hide_index=True)
 
 
+def show_flip_thresholds(team_map, my_team_id, categories, mask):
+    col1, col2 = st.columns(2)
+    with col1:
+        st.markdown("### 🎯 What Do I Need")
+    with col2:
+        stypes = fantasy.get_stats_types(team_map)
+        stype = st.selectbox("Stats Type:", stypes, index=stypes.index("total"), key="flip_stype")
+
+    flips = fantasy.flip_thresholds(team_map, my_team_id, categories, mask)
+    s = flips["stats_types"].index(stype)
+
+    rows = []
+    for o, opp_id in enumerate(flips["opponents"]):
+        row = {"Opponent": team_map[opp_id].name}
+        for c, cat in enumerate(categories):
+            if not flips["lost"][s, o, c]:
+                row[cat] = "✓"
+            elif cat.endswith("%"):
+                row[cat] = f"+{flips['made'][s, o, c]:.1f} {cat[:-1]}M"
+            elif mask[c]:
+                row[cat] = f"-{flips['raw'][s, o, c]:.1f}"
+            else:
+                row[cat] = f"+{flips['raw'][s, o, c]:.1f}"
+        rows.append(row)
+    st.dataframe(pd.DataFrame(rows), width='stretch', hide_index=True)
+    st.caption("Per-game amount to flip each lost category. FG%/FT%: extra makes at 100% shooting.")
+
+
 def show_roster(team_map, player_map, my_team_id, ratings):
     col1, col2 = st.columns(2)
     with col1:
@@ -312,6 +457,7 @@ def show_roster(team_map, player_map, my_team_id, ratings):
     stype = "total"
 
     roster_rows = []
+    z_rows = []
     players = {}
     for pid in team.roster:
         player = player_map.get(pid)
@@ -332,11 +478,12 @@ def show_roster(team_map, player_map, my_team_id, ratings):
             base[cat] = round_value(cat, val, is_z)
 
         roster_rows.append(base)
+        z_rows.append([player.stats_z[stype].get(cat, 0) for cat in CATEGORIES])
 
         players[pid] = player
 
     roster_df = pd.DataFrame(roster_rows)
-    st.dataframe(roster_df, width='stretch', height=len(roster_df) * 35 + 38)
+    st.dataframe(heatmap.style(roster_df, z_rows, CATEGORIES), width='stretch', height=len(roster_df) * 35 + 38)
     st.write("")
     show_radar_charts(players, ratings)
 
@@ -420,8 +567,51 @@ def transaction_to_df(player_map, info, mode):
     return pd.DataFrame(rows)
 
 
+def get_marginal_values(team_map, player_map, categories, mask, counting_stats, roster_size):
+    """
+    Session cached fantasy.marginal_value_matrix. Call before a trade is analyzed,
+    while rosters are the original ones (the Teams tab resets them earlier in the run).
+    """
+    swap = st.session_state.get("partners_swap", True)
+    key = (st.session_state.get("snapshot_version"), swap)
+    if st.session_state.get("marginal_key") != key:
+        st.session_state.marginal = fantasy.marginal_value_matrix(team_map, player_map, categories, mask,
+                                                                   counting_stats, roster_size, swap=swap)
+        st.session_state.marginal_key = key
+    return st.session_state.marginal
+
+
+def show_trade_partners(marginal, team_map, player_map):
+    st.markdown("### 🤝 Trade Partners")
+    col1, col2 = st.columns([3, 1])
+    with col2:
+        st.checkbox("Swap for team's weakest player", value=True, key="partners_swap")
+
+    by_score = sorted(player_map.values(), key=lambda p: p.stats_z["total"].get("score", 0), reverse=True)
+    with col1:
+        target = st.selectbox("Who gains most from:", [p.player_id for p in by_score],
+                              format_func=lambda pid: player_map[pid].name, key="partners_target")
+
+    j = marginal["player_ids"].index(target)
+    rows = []
+    for i, team_id in enumerate(marginal["team_ids"]):
+        if np.isnan(marginal["win_pct"][i, j]):
+            continue
+        rows.append({
+            "Team": team_map[team_id].name,
+            "win% (each)": round(marginal["win_pct"][i, j], 3),
+            "Δ win%": round(marginal["win_pct_delta"][i, j], 3),
+            "Δ Score": round(marginal["z_delta"][i, j], 2),
+        })
+    df = pd.DataFrame(rows)
+    if not df.empty:
+        df = df.sort_values("Δ win%", ascending=False)
+    st.dataframe(df, width='content', hide_index=True)
+
+
 def show_trade(my_team_id, team_map, player_map, free_agents_map, counting_stats, percentage_stats, categories, cat_index, mask, roster_size):
     st.subheader("💼 Trade Analyzer")
+    marginal = get_marginal_values(team_map, player_map, categories, mask, counting_stats, roster_size)
     col1, col2, col3 = st.columns(3)
     # --- Team selectors ---
 
@@ -522,11 +712,16 @@ def show_trade(my_team_id, team_map, player_map, free_agents_map, counting_stats
         # st.markdown("### 📦 Proposed Trade Dictionary")
         # st.json(trade_dict)
 
-        # Use your compute logic
+        if "scenario_cache" not in st.session_state:
+            st.session_state.scenario_cache = scenario.ScenarioCache()
+
+        # Use your compute logic (cached per trade and league snapshot)
         plus, minus = fantasy.analyze_transaction(
             result, trade_dict, player_map, team_map,
             counting_stats, percentage_stats,
-            categories, cat_index, mask, roster_size
+            categories, cat_index, mask, roster_size,
+            cache=st.session_state.scenario_cache,
+            version=st.session_state.get("snapshot_version")
         )
 
         # --- Display in a single row (side-by-side layout) ---
@@ -542,6 +737,10 @@ def show_trade(my_team_id, team_map, player_map, free_agents_map, counting_stats
                 key="trade_view_radio"
             )
 
+        cache_stats = st.session_state.scenario_cache.stats()
+        st.caption(f"Scenario cache: {cache_stats['entries']} trades, {cache_stats['hits']} hits, "
+                   f"{cache_stats['misses']} misses, {cache_stats['evictions']} evictions")
+
         view_mode = st.session_state.trade_view
         plus_df = transaction_to_df(player_map, plus, view_mode)
         minus_df = transaction_to_df(player_map, minus, view_mode)
@@ -572,6 +771,11 @@ def show_trade(my_team_id, team_map, player_map, free_agents_map, counting_stats
         st.text("")
         show_teams(team_map, counting_stats, roster_size, '_t')
 
+    st.text("")
+    show_trade_partners(marginal, team_map, player_map)
+    st.text("")
+    show_similar_players(player_map, team_map, "trade")
+
 
 # --- Helper: Render Checkbox Grid for Game Selection ---
 def render_checkbox_grid(title, games_dict, scoring_period, day_map, player_map):
@@ -631,7 +835,8 @@ def update_free_agents_selection():
         # Note: No need for st.rerun() here, as the button click naturally triggers a rerun
 
 
-def show_matchup(team_map, player_map, free_agents_map, my_team_id, league, counting_stats, percentage_stats, all_categories):
+def show_matchup(team_map, player_map, free_agents_map, my_team_id, league, counting_stats, percentage_stats, all_categories,
+                 negative_stats, lineup_slots=None):
     
     matchup_map = fantasy.build_matchup_scoring_period(league)
 
@@ -686,6 +891,15 @@ def show_matchup(team_map, player_map, free_agents_map, my_team_id, league, coun
         team_box_score = fantasy.get_box_score(team1_id, current_matchup_period, team_map, all_categories)
         opponent_box_score = fantasy.get_box_score(team2_id, current_matchup_period, team_map, all_categories)
 
+        # live totals from the background poller replace the ones cached at fetch time
+        poller = st.session_state.get("poller")
+        if poller and poller.matchup_period == current_matchup_period:
+            live, version = poller.box_scores()
+            if team1_id in live and team2_id in live:
+                team_box_score = {cat: live[team1_id].get(cat, 0) for cat in all_categories}
+                opponent_box_score = {cat: live[team2_id].get(cat, 0) for cat in all_categories}
+                st.caption(f"Live scoreboard (update #{version})")
+
         col1, col2 = st.columns(2)
         with col1:
             df = pd.DataFrame(team_box_score, index=['team'])
@@ -696,8 +910,9 @@ def show_matchup(team_map, player_map, free_agents_map, my_team_id, league, coun
 
     scoring_period = matchup_map.get(str(current_matchup_period))
     today = league.scoringPeriodId
-    team_games = fantasy.count_games(team_map.get(team1_id).roster, player_map, scoring_period, today)
-    opponent_games = fantasy.count_games(team_map.get(team2_id).roster, player_map, scoring_period, today)
+    availability = st.session_state.get("availability")
+    team_games = fantasy.count_games(team_map.get(team1_id).roster, player_map, scoring_period, today, availability)
+    opponent_games = fantasy.count_games(team_map.get(team2_id).roster, player_map, scoring_period, today, availability)
     
     day_map = dict(zip(scoring_period, ["MON", "TUE", "WED", "THU", "FRI", "SAT", "SUN"]))
 
@@ -741,7 +956,7 @@ def show_matchup(team_map, player_map, free_agents_map, my_team_id, league, coun
 
 
     if refresh_btn:
-        st.session_state.fa_games = fantasy.count_games(free_agents_input, player_map, scoring_period, today)
+        st.session_state.fa_games = fantasy.count_games(free_agents_input, player_map, scoring_period, today, availability)
         st.session_state.fa_selected_left = {pid: [] for pid in st.session_state.fa_games}
         st.session_state.fa_selected_right = {pid: [] for pid in st.session_state.fa_games}
     
@@ -761,7 +976,15 @@ def show_matchup(team_map, player_map, free_agents_map, my_team_id, league, coun
     if "matchup_proj" not in st.session_state:
         st.session_state.matchup_proj = {}
     
-    run_btn = st.button("Run Projections", type="primary")
+    col1, col2, col3 = st.columns([1, 1, 3])
+    with col1:
+        run_btn = st.button("Run Projections", type="primary")
+    with col2:
+        stypes = fantasy.get_stats_types(player_map)
+        stype = st.selectbox("Projection Stats Type:", stypes, index=stypes.index("total"), key="matchup_stype")
+    with col3:
+        optimize = st.checkbox("Only count games of optimal daily lineups", value=bool(lineup_slots),
+                               disabled=not lineup_slots, key="optimize_lineups")
     st.write("")
 
     if run_btn:
@@ -775,26 +998,31 @@ def show_matchup(team_map, player_map, free_agents_map, my_team_id, league, coun
         team_games = {pid: days for pid, days in team1_selected.items() if len(days) > 0}
         opponent_games = {pid: days for pid, days in team2_selected.items() if len(days) > 0}
 
+        if optimize:     # starters picked by the same stat type the projection is shown in
+            team_games = lineup.optimize_week(team_games, player_map, lineup_slots, stype)
+            opponent_games = lineup.optimize_week(opponent_games, player_map, lineup_slots, stype)
+
         result, team_projections, opponent_projections = fantasy.analyze_matchup(team_games, opponent_games, team_box_score, opponent_box_score, 
-                                                                                 all_categories, counting_stats, percentage_stats, player_map)
+                                                                                 all_categories, counting_stats, percentage_stats, player_map,
+                                                                                 availability)
 
-        st.session_state.matchup_proj = (result, team_projections, opponent_projections)
+        st.session_state.matchup_proj = (result, team_projections, opponent_projections, stype)
 
     if st.session_state.matchup_proj:
         
-        result, team_projections, opponent_projections = st.session_state.matchup_proj
+        result, team_projections, opponent_projections, proj_stype = st.session_state.matchup_proj
         col1, col2 = st.columns(2)
         with col1:
 
-            st.subheader("📊 Matchup Projection Results")
-            df = pd.DataFrame(team_projections["total"], index=["team"])
+            st.subheader(f"📊 Matchup Projection Results ({proj_stype})")
+            df = pd.DataFrame(team_projections[proj_stype], index=["team"])
             st.dataframe(df, width='content')
 
-            df = pd.DataFrame(opponent_projections["total"], index=["opp"])
+            df = pd.DataFrame(opponent_projections[proj_stype], index=["opp"])
             st.dataframe(df, width='content')
 
 
-            df = pd.DataFrame(result["total"], index=["diff"])
+            df = pd.DataFrame(result[proj_stype], index=["diff"])
             st.dataframe(df, width='content')
 
 
@@ -803,9 +1031,9 @@ def show_matchup(team_map, player_map, free_agents_map, my_team_id, league, coun
             cats_won = []
             for cat in CATEGORIES:
                 if cat == "TO":
-                    if result['total'][cat] <= 0:
+                    if result[proj_stype][cat] <= 0:
                         cats_won.append(cat)
-                elif result['total'][cat] >= 0:
+                elif result[proj_stype][cat] >= 0:
                     cats_won.append(cat)
             
             target_cats = st.multiselect("Select Categories to Boost:", CATEGORIES, default=cats_won, key="target_cats")
@@ -835,4 +1063,127 @@ def show_matchup(team_map, player_map, free_agents_map, my_team_id, league, coun
                     append_top_fa_btn = st.button(
                         "Add top Free Agents to above",
                         on_click=update_free_agents_selection
-                    )
\ No newline at end of file
+                    )
+
+        # --- 6. Streaming Planner ---
+        st.markdown("### 🔁 Streaming Planner")
+        roster = team_map[team1_id].roster
+        by_score = sorted(roster, key=lambda pid: player_map[pid].stats_z["total"].get("score", 0))
+        col1, col2, col3 = st.columns([1, 3, 1])
+        with col1:
+            add_limit = st.number_input("Adds left:", min_value=0, max_value=7, value=3, key="stream_adds")
+        with col2:
+            droppable = st.multiselect("Droppable players:", roster, default=by_score[:3],
+                                       format_func=lambda pid: player_map[pid].name, key="stream_drops")
+        with col3:
+            st.write("")
+            plan_btn = st.button("Plan Streams")
+
+        if plan_btn:
+            remaining_days = [day for day in scoring_period if day >= today]
+            candidates = list(roster) + [pid for pid in free_agents_map if pid not in roster]
+            chance = None
+            if availability is not None:
+                chance = dict(zip(candidates, fantasy.availability_rows(availability, candidates, remaining_days, "chance")))
+            st.session_state.stream_plan = streaming.plan_streams(
+                roster, droppable, list(free_agents_map.keys()), player_map, st.session_state.top_players_map,
+                remaining_days, target_cats, negative_stats, add_limit, stype=proj_stype, availability=chance,
+                lineup_slots=lineup_slots
+            )
+
+        if st.session_state.get("stream_plan"):
+            plan = st.session_state.stream_plan
+            rows = [{"Day": day_map.get(day, day), "Drop": player_map[drop].name, "Add": player_map[add].name}
+                    for day, drop, add in plan["moves"]]
+            if rows:
+                st.dataframe(pd.DataFrame(rows), width='content', hide_index=True)
+            else:
+                st.write("No stream beats holding the current roster.")
+            st.caption(f"Expected value in target categories: {plan['value']:.1f} (hold: {plan['baseline']:.1f})")
+
+
+def show_draft_simulator(player_map, categories, mask, counting_stats, team_count, roster_size, snapshot_source=None):
+    """snapshot_source: (root, version) of a snapshot of this exact state, the draft workers then map it."""
+    st.markdown("### 🎲 Mock Draft Simulator")
+    col1, col2, col3 = st.columns(3)
+    with col1:
+        stypes = fantasy.get_stats_types(player_map)
+        stype = st.selectbox("Stats Type:", stypes, index=stypes.index("total"), key="mock_stype")
+    with col2:
+        drafts = st.number_input("Drafts", min_value=100, max_value=100000, value=10000, step=1000, key="mock_drafts")
+    with col3:
+        noise = st.slider("ADP noise", 0.0, 0.5, draft.ADP_NOISE, 0.05, key="mock_noise")
+
+    if st.button("Run Mock Drafts"):
+        with st.spinner("Drafting..."):
+            st.session_state.mock_rows = draft.simulate(player_map, categories, mask, counting_stats, team_count, roster_size,
+                                                        drafts=drafts, stype=stype, noise=noise, snapshot_source=snapshot_source)
+    rows = st.session_state.get("mock_rows")
+    if not rows:
+        st.caption("Opponents pick by ADP with noise, you pick by punt-aware z-value.")
+        return
+
+    df = pd.DataFrame(rows)
+    metric = st.radio("Show:", ["matchup_win_pct", "cat_win_pct", "strength"], key="mock_metric", horizontal=True,
+                      format_func={"matchup_win_pct": "H2H win%", "cat_win_pct": "Category win%", "strength": "Roster z-score"}.get)
+    table = df.pivot(index="slot", columns="strategy", values=metric).round(3)
+    st.dataframe(table, width='stretch')
+    st.caption(f"{df['drafts'].iloc[0]} drafts per slot and strategy. H2H win%: share of opponents beaten on most categories.")
+
+
+def get_draft_board(player_map, categories, team_count, roster_size, stype, punting):
+    """Session DraftBoard, rebuilt on a new snapshot, stat type or punt set with the picks so far replayed."""
+    key = (st.session_state.get("snapshot_version"), stype, tuple(punting))
+    board = st.session_state.get("draft_board")
+    if st.session_state.get("draft_board_key") != key:
+        picks = board.picks if board else []
+        board = draft.DraftBoard.from_player_map(player_map, categories, team_count, roster_size, stype, punting)
+        for player_id, mine in picks:
+            if player_id in board.row:
+                board.pick(player_id, mine)
+        st.session_state.draft_board = board
+        st.session_state.draft_board_key = key
+        st.session_state.draft_adp_order = sorted(player_map, key=lambda pid: player_map[pid].avg_draft_pos or float("inf"))
+    return board
+
+
+def show_draft_assistant(player_map, categories, team_count, roster_size):
+    st.markdown("### 📋 Live Draft Assistant")
+    col1, col2 = st.columns(2)
+    with col1:
+        stypes = fantasy.get_stats_types(player_map)
+        stype = st.selectbox("Stats Type:", stypes, index=stypes.index("projected"), key="live_stype")
+    with col2:
+        punting = st.multiselect("Punt:", categories, key="live_punt")
+    board = get_draft_board(player_map, categories, team_count, roster_size, stype, punting)
+
+    available = [pid for pid in st.session_state.draft_adp_order if board.available[board.row[pid]]]
+    col1, col2, col3, col4 = st.columns([3, 1, 1, 1])
+    with col1:
+        player_id = st.selectbox("Drafted player (by ADP):", available, format_func=lambda pid: player_map[pid].name,
+                                 key="live_pick")
+    with col2:
+        mine_btn = st.button("My Pick")
+    with col3:
+        other_btn = st.button("Other Pick")
+    with col4:
+        undo_btn = st.button("Undo Pick")
+    if (mine_btn or other_btn) and player_id is not None:
+        board.pick(player_id, mine=mine_btn)
+        st.rerun()
+    if undo_btn and board.undo() is not None:
+        st.rerun()
+
+    weights = board.weights()
+    st.caption(f"Pick {len(board.picks) + 1} · my roster: " + (", ".join(player_map[pid].name for pid in board.my_picks) or "empty"))
+    st.dataframe(pd.DataFrame([dict(zip(categories, weights.round(2)))], index=["Need weight"]), width='stretch')
+
+    rows = []
+    for pid, value in board.best_available(20, weights):
+        player = player_map[pid]
+        row = {"Name": player.name, "Pos": player.position, "Pro Team": player.pro_team,
+               "Value": round(value, 2), "ADP": round(player.avg_draft_pos or 0, 1)}
+        row.update({cat: round(player.stats_z.get(stype, {}).get(cat, 0), 2) for cat in categories})
+        rows.append(row)
+    st.dataframe(pd.DataFrame(rows), width='stretch', hide_index=True)
+    st.caption("Best available by z-score weighted toward my weakest categories.")
@@ -0,0 +1,88 @@
+import json
+import pickle
+import hashlib
+from collections import OrderedDict
+
+TEAM_FIELDS = ["roster", "stats", "stats_z", "h2h_most", "h2h_each"]
+
+
+def make_key(actions, result, version):
+    """Canonical hash of a trade scenario: {player_id: dest}, plus/minus lists and league snapshot version."""
+    payload = {
+        "actions": sorted([int(pid), int(dest)] for pid, dest in actions.items()),
+        "plus": sorted(int(pid) for pid in result.get("plus", [])),
+        "minus": sorted(int(pid) for pid in result.get("minus", [])),
+        "version": str(version),
+    }
+    return hashlib.sha1(json.dumps(payload).encode()).hexdigest()
+
+
+def capture(team_map, plus, minus):
+    """Serialize the league state a scenario produced (team aggregates, z-scores, H2H, trade summaries)."""
+    teams = {
+        team_id: {field: getattr(team, field) for field in TEAM_FIELDS}
+        for team_id, team in team_map.items()
+    }
+    return pickle.dumps((teams, plus, minus), protocol=pickle.HIGHEST_PROTOCOL)
+
+
+def restore(team_map, entry):
+    """Write a captured scenario back onto team_map, returns (plus, minus). Every restore gets fresh objects."""
+    teams, plus, minus = pickle.loads(entry)
+    for team_id, fields in teams.items():
+        team = team_map.get(team_id)
+        if team:
+            for field, value in fields.items():
+                setattr(team, field, value)
+    return plus, minus
+
+
+class ScenarioCache:
+    """LRU cache of analyzed trade scenarios, bounded by entry count and serialized size."""
+    def __init__(self, max_entries=64, max_bytes=64 * 1024 * 1024):
+        self.entries = OrderedDict()
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self.size = 0
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+
+    def get(self, key):
+        entry = self.entries.get(key)
+        if entry is None:
+            self.misses += 1
+            return None
+        self.entries.move_to_end(key)
+        self.hits += 1
+        return entry
+
+
+    def put(self, key, entry):
+        if len(entry) > self.max_bytes:
+            return
+        if key in self.entries:
+            self.size -= len(self.entries.pop(key))
+        self.entries[key] = entry
+        self.size += len(entry)
+
+        while len(self.entries) > self.max_entries or self.size > self.max_bytes:
+            _, evicted = self.entries.popitem(last=False)
+            self.size -= len(evicted)
+            self.evictions += 1
+
+
+    def clear(self):
+        self.entries.clear()
+        self.size = 0
+
+
+    def stats(self):
+        return {
+            "entries": len(self.entries),
+            "bytes": self.size,
+            "hits": self.hits,
+            "misses": self.misses,
+            "evictions": self.evictions,
+        }
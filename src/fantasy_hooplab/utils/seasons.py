@@ -0,0 +1,113 @@
+from concurrent.futures import ThreadPoolExecutor
+import numpy as np
+from utils import appstate, arrays
+from utils.player import STATS_TYPES
+
+MAX_WORKERS = 4
+
+
+def load_seasons(league_id, years, roster_size, team_count, states=None, refresh=False, max_workers=MAX_WORKERS):
+    """
+    App states for several seasons of one league as {year: state}, fetched concurrently (network bound).
+    states: already loaded {year: state} to reuse. Saved states are used unless refresh is set,
+    fresh fetches are saved for next time.
+    """
+    states = dict(states or {})
+
+    def load(year):
+        saved = None if refresh else appstate.load_state(league_id, year)
+        if saved:
+            return saved[0]
+        state = appstate.load_league(league_id, year, roster_size, team_count)
+        appstate.save_state(league_id, year, state)
+        return state
+
+    missing = [year for year in years if year not in states]
+    with ThreadPoolExecutor(max_workers=max(1, min(max_workers, len(missing)))) as executor:
+        for year, state in zip(missing, executor.map(load, missing)):
+            states[year] = state
+    return {year: states[year] for year in sorted(states) if year in years}
+
+
+class SeasonIndex:
+    """
+    Players of several seasons joined by player_id: values[year, player, stype, stat] (NaN where a player
+    has no season) with one row per player across all years, so cross-season questions are array operations.
+    """
+    def __init__(self, player_maps, stat_keys, top_players=None):
+        """player_maps = {year: player_map}, top_players = {year: ids of the z-score reference pool}."""
+        self.years = sorted(player_maps)
+        self.stat_keys = list(stat_keys)
+        self.stypes = list(STATS_TYPES)
+
+        names = {}
+        for year in self.years:
+            names.update({pid: player.name for pid, player in player_maps[year].items()})
+        self.player_ids = sorted(names)
+        self.names = [names[pid] for pid in self.player_ids]
+        self.row = arrays.player_index(self.player_ids)
+
+        shape = (len(self.years), len(self.player_ids), len(self.stypes), len(self.stat_keys))
+        self.values = np.full(shape, np.nan)
+        self.present = np.zeros(shape[:2], dtype=bool)
+        self.reference = np.zeros(shape[:2], dtype=bool)
+        for y, year in enumerate(self.years):
+            player_ids, tensor = arrays.stats_tensor(player_maps[year], self.stat_keys, self.stypes)
+            rows = [self.row[pid] for pid in player_ids]
+            self.values[y, rows] = tensor
+            self.present[y, rows] = True
+            pool = (top_players or {}).get(year)
+            self.reference[y, [self.row[pid] for pid in pool if pid in self.row] if pool else rows] = True
+
+
+    @classmethod
+    def from_states(cls, states, stat_keys):
+        return cls({year: state["player_map"] for year, state in states.items()}, stat_keys,
+                   {year: list(state["top_players_map"]) for year, state in states.items()})
+
+
+    def stat(self, key, stype="total"):
+        """[year, player] values of one stat."""
+        return self.values[:, :, self.stypes.index(stype), self.stat_keys.index(key)]
+
+
+    def delta(self, key, year_from, year_to, stype="total"):
+        """[player] change of one stat between two seasons, NaN unless the player has both."""
+        values = self.stat(key, stype)
+        return values[self.years.index(year_to)] - values[self.years.index(year_from)]
+
+
+    def z_scores(self, categories, mask, stype="total"):
+        """[year, player, category] z-scores against each season's own reference pool (sign flipped where mask)."""
+        values = self.values[:, :, self.stypes.index(stype), [self.stat_keys.index(cat) for cat in categories]]
+        reference = np.where(self.reference[:, :, None], values, np.nan)
+        mean = np.nanmean(reference, axis=1, keepdims=True)
+        std = np.nanstd(reference, axis=1, keepdims=True)
+        z = (values - mean) / np.where((std == 0) | np.isnan(std), 1, std)
+        return np.where(mask, -z, z)
+
+
+    def trend(self, categories, mask, year_from, year_to, stype="total"):
+        """[player, category] z-score change between two seasons, so players are compared against their leagues."""
+        z = self.z_scores(categories, mask, stype)
+        return z[self.years.index(year_to)] - z[self.years.index(year_from)]
+
+
+    def ranking(self, categories, mask, weights=None, stype="total", min_years=1):
+        """
+        Multi-year ranking by weighted z-score totals, weights = {year: weight} (default: all equal).
+        Missing seasons are left out of a player's average. Returns [{rank, player_id, name, value, years}].
+        """
+        z = self.z_scores(categories, mask, stype).sum(axis=2)                      # years x players
+        w = np.array([(weights or {}).get(year, 1.0) for year in self.years], dtype=float)[:, None] * self.present
+        total = w.sum(axis=0)
+        value = np.divide(np.nansum(z * w, axis=0), total, out=np.full(len(self.player_ids), np.nan), where=total > 0)
+        years = self.present.sum(axis=0)
+        value[years < min_years] = np.nan
+
+        order = [row for row in np.argsort(-np.nan_to_num(value, nan=-np.inf)) if not np.isnan(value[row])]
+        return [
+            {"rank": rank, "player_id": self.player_ids[row], "name": self.names[row], "value": float(value[row]),
+             "years": int(years[row])}
+            for rank, row in enumerate(order, start=1)
+        ]
@@ -0,0 +1,51 @@
+import numpy as np
+from utils import arrays
+
+
+class SimilarityIndex:
+    """
+    Nearest neighbours in z-score profile.
+    Holds the players x categories z matrix once, queries are a single vectorized distance pass.
+    """
+    def __init__(self, player_map, categories, stype="total"):
+        self.categories = list(categories)
+        self.player_ids = list(player_map.keys())
+        self.index = arrays.player_index(self.player_ids)
+        self.matrix = np.array([
+            [p.stats_z.get(stype, {}).get(cat, 0) for cat in self.categories] for p in player_map.values()
+        ], dtype=float).reshape(len(self.player_ids), len(self.categories))
+        # eligible[player, slot]: multi-position players match every slot they can fill, not just their primary position
+        self.slots = sorted({slot for p in player_map.values() for slot in p.eligible_slots})
+        slot_index = {slot: col for col, slot in enumerate(self.slots)}
+        self.eligible = np.zeros((len(self.player_ids), len(self.slots)), dtype=bool)
+        for row, p in enumerate(player_map.values()):
+            self.eligible[row, [slot_index[slot] for slot in p.eligible_slots]] = True
+        self.on_team = np.array([p.on_team_id or 0 for p in player_map.values()])
+
+
+    def query(self, player_id, k=10, positions=None, ownership=None, punt_cats=()):
+        """
+        Returns [(player_id, distance)] of the k players closest to player_id.
+        positions: allowed positions (eligibility, any match), ownership: None (all), 0 (free agents) or a team_id,
+        punt_cats: categories ignored in the distance.
+        """
+        row = self.index.get(player_id)
+        if row is None:
+            return []
+
+        weights = np.array([0.0 if cat in punt_cats else 1.0 for cat in self.categories])
+        diff = self.matrix - self.matrix[row]
+        distance = np.sqrt((diff * diff) @ weights)
+
+        valid = np.ones(len(self.player_ids), dtype=bool)
+        valid[row] = False
+        if positions:
+            valid &= self.eligible[:, [col for col, slot in enumerate(self.slots) if slot in positions]].any(axis=1)
+        if ownership is not None:
+            valid &= self.on_team == ownership
+
+        candidates = np.flatnonzero(valid)
+        if len(candidates) > k:
+            candidates = candidates[np.argpartition(distance[candidates], k)[:k]]
+        candidates = candidates[np.argsort(distance[candidates])]
+        return [(self.player_ids[i], float(distance[i])) for i in candidates]
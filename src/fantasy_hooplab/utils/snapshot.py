@@ -0,0 +1,114 @@
+import os
+import json
+import time
+import threading
+import numpy as np
+from utils import arrays
+
+CURRENT = "CURRENT"
+META = "meta.json"
+KEEP = 2        # versions kept on disk, the older ones are pruned on save
+
+
+def build_snapshot(league, team_map, player_map, stat_keys, categories, roster_size):
+    """Returns (arrays_dict, meta) describing the numeric league state."""
+    player_ids, stats = arrays.stats_tensor(player_map, stat_keys)
+    index = arrays.player_index(player_ids)
+    first_day, last_day = league.firstScoringPeriod, league.finalScoringPeriod
+
+    data = {
+        "stats": stats,
+        "stats_z": arrays.z_tensor(player_map, categories),
+        "games": arrays.games_matrix(player_map, first_day, last_day),
+        "roster": arrays.roster_matrix(team_map, index, roster_size),
+        "player_id": np.array(player_ids, dtype=np.int64),
+        "on_team_id": np.array([p.on_team_id or 0 for p in player_map.values()], dtype=np.int64),
+        "percent_owned": np.array([p.percent_owned or 0 for p in player_map.values()], dtype=float),
+        "avg_draft_pos": np.array([p.avg_draft_pos or 0 for p in player_map.values()], dtype=float),
+        "team_id": np.array(list(team_map.keys()), dtype=np.int64),
+    }
+    meta = {
+        "league_id": league.league_id,
+        "year": league.year,
+        "stats_types": arrays.get_stats_types(player_map),
+        "stat_keys": list(stat_keys),
+        "categories": list(categories) + ["score"],
+        "first_day": first_day,
+        "last_day": last_day,
+        "players": [[p.name, p.position, p.pro_team] for p in player_map.values()],
+        "teams": [[t.name, t.team_abbrev] for t in team_map.values()],
+    }
+    return data, meta
+
+
+def save_snapshot(root, data, meta, keep=KEEP):
+    """
+    Write arrays as .npy files into a new version directory under root and point CURRENT at it,
+    then prune all but the newest `keep` versions.
+    Readers holding an older version keep their mapping, the switch is a single atomic rename.
+    """
+    version = f"{time.time_ns()}"
+    path = os.path.join(root, version)
+    os.makedirs(path)
+
+    for name, array in data.items():
+        np.save(os.path.join(path, f"{name}.npy"), np.ascontiguousarray(array))
+    with open(os.path.join(path, META), "w") as f:
+        json.dump(dict(meta, version=version), f)
+
+    tmp = os.path.join(root, f"{CURRENT}.{os.getpid()}.{threading.get_ident()}")
+    with open(tmp, "w") as f:
+        f.write(version)
+    os.replace(tmp, os.path.join(root, CURRENT))
+    prune_snapshots(root, keep)
+    return version
+
+
+def load_snapshot(root, version=None):
+    """
+    Open the current (or given) snapshot version zero-copy.
+    Returns (arrays_dict, meta), arrays are read-only memory maps shared between processes.
+    """
+    if version is None:
+        with open(os.path.join(root, CURRENT)) as f:
+            version = f.read().strip()
+    path = os.path.join(root, version)
+
+    with open(os.path.join(path, META)) as f:
+        meta = json.load(f)
+
+    data = {}
+    for file in os.listdir(path):
+        if file.endswith(".npy"):
+            data[file[:-4]] = np.load(os.path.join(path, file), mmap_mode="r")
+    return data, meta
+
+
+def prune_snapshots(root, keep=2):
+    """Remove all but the newest `keep` versions, never the CURRENT one."""
+    with open(os.path.join(root, CURRENT)) as f:
+        current = f.read().strip()
+    versions = sorted((v for v in os.listdir(root) if v.isdigit()), key=int)
+    for version in versions[:-keep]:
+        if version == current:
+            continue
+        path = os.path.join(root, version)
+        try:
+            for file in os.listdir(path):
+                os.remove(os.path.join(path, file))
+            os.rmdir(path)
+        except FileNotFoundError:
+            pass    # another process pruned it first
+
+
+def rank_players(data, meta, punting=(), stype="total"):
+    """
+    Player rows by z-score sum without the punting categories, best first, straight from the mapped arrays
+    (same order as fantasy.ranking_with_punting). Returns (rows, values, z) with z[player, category + score].
+    """
+    categories = meta["categories"]
+    keep = [i for i, cat in enumerate(categories[:-1]) if cat not in punting]
+    z = data["stats_z"][:, meta["stats_types"].index(stype), :]
+    values = z[:, keep].sum(axis=1)
+    rows = np.argsort(-values, kind="stable")
+    return rows, values, z
@@ -0,0 +1,122 @@
+import numpy as np
+from utils import arrays
+from utils.player import get_stats_types
+
+BATCH_SIZE = 50
+BLEND_WEIGHTS = {"projected": 0.3, "total": 0.3, "last_30": 0.2, "last_15": 0.15, "last_7": 0.05}
+SHRINK_GAMES = 10       # games at which an observed split gets half its weight
+PRIOR_SPLITS = ["projected"]
+
+
+def fetch_game_logs(league, player_ids, batch_size=BATCH_SIZE):
+    """
+    Pull per-scoring-period box score lines from the player card view.
+    Returns {player_id: {day: {stat: value}}}.
+    """
+    from espn_api.basketball.constant import STATS_MAP
+
+    logs = {}
+    for start in range(0, len(player_ids), batch_size):
+        batch = player_ids[start:start + batch_size]
+        data = league.espn_request.get_player_card(batch, league.scoringPeriodId)
+
+        for player_json in data.get("players", []):
+            days = logs.setdefault(player_json.get("id"), {})
+            for split in player_json.get("player", {}).get("stats", []):
+                # actual stats (source 0) of a single scoring period (season splits have period 0)
+                if split.get("seasonId") != league.year or split.get("statSourceId") != 0:
+                    continue
+                day = split.get("scoringPeriodId", 0)
+                if day > 0 and split.get("stats"):
+                    days[day] = {STATS_MAP.get(key, key): value for key, value in split["stats"].items()}
+    return logs
+
+
+def build_cube(game_logs, player_ids, first_day, last_day, stat_keys):
+    """
+    Returns cum[player, day, stat]: prefix sums of daily box scores over first_day..last_day.
+    cum[:, 0] is all zeros and the extra last stat column counts games played,
+    so any window is cum[:, end + 1] - cum[:, start] (days relative to first_day).
+    """
+    cube = np.zeros((len(player_ids), last_day - first_day + 2, len(stat_keys) + 1))
+
+    for row, player_id in enumerate(player_ids):
+        for day, line in game_logs.get(player_id, {}).items():
+            if first_day <= day <= last_day:
+                cube[row, day - first_day + 1, :-1] = [line.get(key, 0) for key in stat_keys]
+                cube[row, day - first_day + 1, -1] = 1 if line.get("MIN", 1) > 0 else 0
+
+    np.cumsum(cube, axis=1, out=cube)
+    return cube
+
+
+def window_totals(cum, first_day, start, end):
+    """Summed stats (and games played, last column) over scoring periods start..end for every player."""
+    last_day = first_day + cum.shape[1] - 2
+    start = max(start, first_day)
+    end = min(end, last_day)
+    if end < start:
+        return np.zeros((cum.shape[0], cum.shape[2]))
+    return cum[:, end - first_day + 1] - cum[:, start - first_day]
+
+
+def window_stats(cum, player_ids, first_day, start, end, stat_keys, percentage_stats):
+    """
+    Per-game averages over start..end as {player_id: {stat: avg}}, ready for fantasy.add_stats_type.
+    FG%/FT% come from the window's summed makes and attempts, players without games are left out.
+    """
+    totals = window_totals(cum, first_day, start, end)
+    games = totals[:, -1:]
+    avg = np.divide(totals[:, :-1], games, out=np.zeros_like(totals[:, :-1]), where=games > 0)
+
+    made = totals[:, [stat_keys.index(f"{cat}M") for cat in percentage_stats]]
+    attempted = totals[:, [stat_keys.index(f"{cat}A") for cat in percentage_stats]]
+    pct = np.divide(made, attempted, out=np.zeros_like(made), where=attempted > 0)
+
+    keys = list(stat_keys) + [f"{cat}%" for cat in percentage_stats] + ["GP"]
+    values = np.concatenate([avg, pct, games], axis=1).tolist()
+    played = games[:, 0] > 0
+
+    return {player_id: dict(zip(keys, values[row])) for row, player_id in enumerate(player_ids) if played[row]}
+
+
+def scoring_periods_by_date(player_map):
+    """Returns {date: scoring_period} from the players' pro schedules."""
+    periods = {}
+    for player in player_map.values():
+        for day, game in player.schedule.items():
+            periods.setdefault(game["date"].date(), int(day))
+    return periods
+
+
+def blend_stats(player_map, weights, stat_keys, percentage_stats, shrink_games=SHRINK_GAMES, prior=PRIOR_SPLITS):
+    """
+    Weighted blend of the splits in weights ({stype: weight}) for all players in one pass,
+    as {player_id: {stat: avg}} ready for fantasy.add_stats_type.
+    shrink_games > 0 scales each observed split's weight by GP / (GP + shrink_games), so short samples
+    lean toward the prior splits (projected) and the longer windows. Splits without stats get no weight.
+    FG%/FT% come from the blended makes and attempts.
+    """
+    stypes = [stype for stype in weights if stype in get_stats_types(player_map)]
+    keys = list(stat_keys) + ["GP"]
+    player_ids, tensor = arrays.stats_tensor(player_map, keys, stypes)        # players x splits x keys
+    gp = tensor[:, :, -1]
+
+    w = np.array([weights[stype] for stype in stypes], dtype=float)[None, :] * np.ones_like(gp)
+    present = np.abs(tensor[:, :, :-1]).sum(axis=2) > 0
+    observed = np.array([stype not in prior for stype in stypes])
+    if shrink_games > 0:
+        w[:, observed] *= gp[:, observed] / (gp[:, observed] + shrink_games)
+    w *= present
+
+    total = w.sum(axis=1, keepdims=True)
+    w = np.divide(w, total, out=np.zeros_like(w), where=total > 0)
+    avg = np.einsum("ps,psk->pk", w, tensor[:, :, :-1])
+
+    made = avg[:, [stat_keys.index(f"{cat}M") for cat in percentage_stats]]
+    attempted = avg[:, [stat_keys.index(f"{cat}A") for cat in percentage_stats]]
+    pct = np.divide(made, attempted, out=np.zeros_like(made), where=attempted > 0)
+
+    keys = list(stat_keys) + [f"{cat}%" for cat in percentage_stats]
+    values = np.concatenate([avg, pct], axis=1).tolist()
+    return {player_id: dict(zip(keys, values[row])) for row, player_id in enumerate(player_ids) if total[row, 0] > 0}
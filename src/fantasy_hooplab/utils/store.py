@@ -0,0 +1,81 @@
+import sqlite3
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS players (
+    player_id INTEGER PRIMARY KEY,
+    name TEXT, position TEXT, pro_team TEXT, on_team_id INTEGER, status TEXT,
+    injury_status TEXT, percent_owned REAL, avg_draft_pos REAL
+);
+CREATE TABLE IF NOT EXISTS stats (player_id INTEGER, stype TEXT, stat TEXT, value REAL, PRIMARY KEY (player_id, stype, stat));
+CREATE TABLE IF NOT EXISTS z_scores (player_id INTEGER, stype TEXT, cat TEXT, value REAL, PRIMARY KEY (player_id, stype, cat));
+CREATE TABLE IF NOT EXISTS teams (team_id INTEGER PRIMARY KEY, name TEXT, abbrev TEXT);
+CREATE TABLE IF NOT EXISTS rosters (team_id INTEGER, player_id INTEGER, ir INTEGER, PRIMARY KEY (team_id, player_id));
+CREATE TABLE IF NOT EXISTS schedule (player_id INTEGER, scoring_period INTEGER, date TEXT, opponent TEXT, PRIMARY KEY (player_id, scoring_period));
+"""
+INDEXES = """
+CREATE INDEX IF NOT EXISTS players_position ON players (position);
+CREATE INDEX IF NOT EXISTS players_owner ON players (on_team_id);
+CREATE INDEX IF NOT EXISTS players_pro_team ON players (pro_team);
+CREATE INDEX IF NOT EXISTS stats_lookup ON stats (stype, stat, value);
+CREATE INDEX IF NOT EXISTS z_lookup ON z_scores (stype, cat, value);
+CREATE INDEX IF NOT EXISTS schedule_period ON schedule (scoring_period);
+"""
+TABLES = ["players", "stats", "z_scores", "teams", "rosters", "schedule"]
+INDEX_NAMES = ["players_position", "players_owner", "players_pro_team", "stats_lookup", "z_lookup", "schedule_period"]
+
+
+def connect(path=":memory:"):
+    """Open (and create) a league store. Usable from Streamlit reruns on other threads."""
+    conn = sqlite3.connect(path, check_same_thread=False)
+    conn.executescript(SCHEMA + INDEXES)
+    return conn
+
+
+def populate(conn, team_map, player_map):
+    """
+    Replace the store contents with the given maps in one transaction (bulk executemany per table).
+    Secondary indexes are dropped during the load and rebuilt once at the end.
+    """
+    players = [
+        (p.player_id, p.name, p.position, p.pro_team, p.on_team_id or 0, p.status, p.injury_status,
+         p.percent_owned, p.avg_draft_pos)
+        for p in player_map.values()
+    ]
+    stats = [
+        (p.player_id, stype, stat, value)
+        for p in player_map.values() for stype, line in p.stats.items() for stat, value in line.items()
+    ]
+    z_scores = [
+        (p.player_id, stype, cat, value)
+        for p in player_map.values() for stype, line in p.stats_z.items() for cat, value in line.items()
+    ]
+    schedule = [
+        (p.player_id, int(day), game["date"].isoformat(), game["team"])
+        for p in player_map.values() for day, game in p.schedule.items()
+    ]
+    teams = [(t.team_id, t.name, t.team_abbrev) for t in team_map.values()]
+    rosters = [
+        (t.team_id, player_id, int(player_id in t.injury_reserved))
+        for t in team_map.values() for player_id in t.roster
+    ]
+
+    with conn:
+        for index in INDEX_NAMES:
+            conn.execute(f"DROP INDEX IF EXISTS {index}")
+        for table in TABLES:
+            conn.execute(f"DELETE FROM {table}")
+        conn.executemany("INSERT INTO players VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)", players)
+        conn.executemany("INSERT INTO stats VALUES (?, ?, ?, ?)", stats)
+        conn.executemany("INSERT INTO z_scores VALUES (?, ?, ?, ?)", z_scores)
+        conn.executemany("INSERT INTO schedule VALUES (?, ?, ?, ?)", schedule)
+        conn.executemany("INSERT INTO teams VALUES (?, ?, ?)", teams)
+        conn.executemany("INSERT INTO rosters VALUES (?, ?, ?)", rosters)
+    conn.executescript(INDEXES)
+    return conn
+
+
+def query(conn, sql, params=()):
+    """Run a query, returns (column names, rows)."""
+    cursor = conn.execute(sql, params)
+    columns = [c[0] for c in cursor.description or []]
+    return columns, cursor.fetchall()
@@ -0,0 +1,153 @@
+import numpy as np
+from utils import lineup
+
+BEAM_WIDTH = 64
+CANDIDATES = 25     # free agents considered per state and day
+BRANCH = 12         # drop/add moves expanded per state and day
+
+
+def game_values(player_ids, player_map, reference_map, target_cats, negative_stats, stype="total"):
+    """
+    Expected per-game contribution of each player to the target categories, in comparable units.
+    Counting stats are scaled by the reference pool's per-game mean (an average game = 1 per category),
+    percentages use volume impact (makes - pool% * attempts) scaled by its std in the pool.
+    """
+    def matrix(obj_map, keys):
+        return np.array([[p.stats.get(stype, {}).get(key, 0) for key in keys] for p in obj_map], dtype=float).reshape(len(obj_map), len(keys))
+
+    counting = [cat for cat in target_cats if not cat.endswith("%")]
+    percentage = [cat[:-1] for cat in target_cats if cat.endswith("%")]
+    shots = [f"{cat}{suffix}" for cat in percentage for suffix in ("M", "A")]
+
+    players = [player_map[pid] for pid in player_ids]
+    reference = list(reference_map.values())
+    values = np.zeros(len(players))
+
+    if counting:
+        scale = matrix(reference, counting).mean(axis=0)
+        scale = np.where(scale == 0, 1, scale)
+        sign = np.array([-1 if cat in negative_stats else 1 for cat in counting])
+        values += (matrix(players, counting) / scale * sign).sum(axis=1)
+
+    if percentage:
+        ref = matrix(reference, shots)
+        mine = matrix(players, shots)
+        for i in range(len(percentage)):
+            made, attempted = ref[:, 2 * i], ref[:, 2 * i + 1]
+            pct = made.sum() / attempted.sum() if attempted.sum() else 0
+            impact = made - pct * attempted
+            std = impact.std() or 1
+            values += (mine[:, 2 * i] - pct * mine[:, 2 * i + 1]) / std
+
+    return values
+
+
+def plan_streams(roster, droppable, free_agents, player_map, reference_map, days, target_cats, negative_stats,
+                 add_limit, stype="total", availability=None, lineup_slots=None):
+    """
+    Beam search over the remaining days of a matchup for the drop/add sequence maximizing expected
+    target-category value. A move on day d adds a free agent (playing from d on) for a droppable player.
+
+    roster: rostered player ids, droppable: the subset that may be dropped (streamers added are always droppable)
+    days: remaining scoring periods, availability: optional {player_id: [0..1 per day]} multiplier
+    lineup_slots: optional {slot: count}, each day only the games of the starters lineup.best_lineup picks
+    (same eligibility matching as lineup.optimize_week) count, for the plan, the baseline and the returned games
+    Returns {"moves": [(day, drop_id, add_id)], "value", "baseline", "games": {player_id: [days]}}.
+    """
+    free_agents = [pid for pid in free_agents if pid not in roster]
+    player_ids = list(roster) + free_agents
+    fa_rows = np.arange(len(roster), len(player_ids))
+
+    games = np.array([[1 if str(day) in player_map[pid].schedule else 0 for day in days] for pid in player_ids],
+                     dtype=float).reshape(len(player_ids), len(days))
+    if availability is not None:
+        games *= np.array([availability.get(pid, np.ones(len(days))) for pid in player_ids]).reshape(games.shape)
+
+    value = games * game_values(player_ids, player_map, reference_map, target_cats, negative_stats, stype)[:, None]
+    remaining = np.cumsum(value[:, ::-1], axis=1)[:, ::-1]     # remaining[p, d] = value from day d on
+    remaining = np.concatenate([remaining, np.zeros((len(player_ids), 1))], axis=1)
+
+    slots = lineup.expand_slots(lineup_slots) if lineup_slots else None
+    started = {}        # (day, rows with a game) -> started rows, many beam states share a day's lineup
+
+    def starters(row_list, d):
+        # helper
+        """Rows that play on day d: all with a game, or the best eligible lineup when the slots are known."""
+        playing = tuple(sorted(row for row in row_list if games[row, d] > 0))
+        if slots is None:
+            return playing
+        key = (d, playing)
+        if key not in started:
+            ids = [player_ids[row] for row in playing]
+            picked = set(lineup.best_lineup(ids, player_map, slots, {pid: value[row, d] for pid, row in zip(ids, playing)}))
+            started[key] = tuple(row for row, pid in zip(playing, ids) if pid in picked)
+        return started[key]
+
+    def day_value(row_list, d):
+        # helper
+        return float(value[list(starters(row_list, d)), d].sum())
+
+    droppable_rows = {row for row, pid in enumerate(roster) if pid in droppable}
+    baseline = sum(day_value(list(range(len(roster))), d) for d in range(len(days)))
+
+    # state: (value so far, roster rows, droppable rows, adds used, moves)
+    beam = [(0.0, frozenset(range(len(roster))), frozenset(droppable_rows), 0, ())]
+
+    for d in range(len(days)):
+        expanded = []
+        for score, rows, drops, adds, moves in beam:
+            expanded.append((score, rows, drops, adds, moves))
+            if adds >= add_limit or not drops:
+                continue
+
+            available = fa_rows[[row not in rows for row in fa_rows]]
+            if len(available) == 0:
+                continue
+            top = available[np.argsort(-remaining[available, d])[:CANDIDATES]]
+            drop_rows = np.array(sorted(drops))
+
+            gain = remaining[top, d][:, None] - remaining[drop_rows, d][None, :]
+            best = np.argsort(-gain, axis=None)[:BRANCH]
+            for flat in best:
+                i, j = np.unravel_index(flat, gain.shape)
+                if gain[i, j] <= 0:
+                    break
+                add_row, drop_row = int(top[i]), int(drop_rows[j])
+                expanded.append((score, rows - {drop_row} | {add_row}, drops - {drop_row} | {add_row}, adds + 1,
+                                 moves + ((d, drop_row, add_row),)))
+
+        # play day d, rank by value so far plus what the current roster would still produce
+        played = []
+        for score, rows, drops, adds, moves in expanded:
+            row_list = list(rows)
+            played.append((score + day_value(row_list, d), rows, drops, adds, moves,
+                           remaining[row_list, d + 1].sum()))
+        played.sort(key=lambda state: state[0] + state[5], reverse=True)
+
+        beam, seen = [], set()
+        for state in played:
+            if state[1] in seen:
+                continue
+            seen.add(state[1])
+            beam.append(state[:5])
+            if len(beam) == BEAM_WIDTH:
+                break
+
+    score, rows, drops, adds, moves = max(beam, key=lambda state: state[0])
+
+    # days each player plays under the plan: on the roster, has a game and (with slots) starts
+    on_roster = {row: [0, len(days)] for row in range(len(roster))}
+    for d, drop_row, add_row in moves:
+        on_roster[drop_row][1] = d
+        on_roster[add_row] = [d, len(days)]
+    played_games = {player_ids[row]: [] for row in on_roster}
+    for d in range(len(days)):
+        for row in starters([row for row, (start, end) in on_roster.items() if start <= d < end], d):
+            played_games[player_ids[row]].append(days[d])
+
+    return {
+        "moves": [(days[d], player_ids[drop_row], player_ids[add_row]) for d, drop_row, add_row in moves],
+        "value": float(score),
+        "baseline": baseline,
+        "games": {pid: played for pid, played in played_games.items() if played},
+    }
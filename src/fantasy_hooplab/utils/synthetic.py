@@ -0,0 +1,213 @@
+"""
+Offline stand-in for espn_api.basketball.League, for load tests and demos.
+Same attributes and espn_request calls the app uses, with seeded random players,
+pro schedules and matchups. Instances pickle, so they go through st.cache_data and appstate.
+"""
+from datetime import datetime, timedelta
+import numpy as np
+
+ESPN_SPLITS = ["projected", "total", "last_30", "last_15", "last_7"]
+POSITIONS = ["PG", "SG", "SF", "PF", "C"]
+ELIGIBLE = {
+    "PG": ["PG", "G", "UT", "BE", "IR"],
+    "SG": ["SG", "G", "G/F", "UT", "BE", "IR"],
+    "SF": ["SF", "F", "G/F", "UT", "BE", "IR"],
+    "PF": ["PF", "F", "F/C", "UT", "BE", "IR"],
+    "C": ["C", "F/C", "UT", "BE", "IR"],
+}
+LINEUP_SLOT_COUNTS = {"0": 1, "1": 1, "2": 1, "3": 1, "4": 1, "5": 1, "6": 1, "11": 3, "12": 3, "13": 1}
+MATCHUP_CATS = ["PTS", "3PM", "REB", "AST", "STL", "BLK", "TO", "FG%", "FT%", "FGM", "FGA", "FTM", "FTA"]
+BOX_STATS = ["MIN", "PTS", "3PM", "REB", "AST", "STL", "BLK", "TO", "FGM", "FGA", "FTM", "FTA"]
+SEASON_START = datetime(2025, 10, 21, 19, 30)
+
+
+def random_line(rng, quality):
+    # helper
+    fga = max(0.5, 6 * quality * rng.normal(1, 0.1))
+    fta = max(0.2, 2 * quality * rng.normal(1, 0.1))
+    fgm = fga * rng.uniform(0.40, 0.58)
+    ftm = fta * rng.uniform(0.65, 0.92)
+    tpm = max(0, rng.normal(1.2, 0.8)) * quality
+    return {
+        "MIN": 15 + 10 * quality,
+        "FGM": fgm, "FGA": fga, "FTM": ftm, "FTA": fta,
+        "FG%": fgm / fga, "FT%": ftm / fta,
+        "3PM": tpm,
+        "PTS": 2 * fgm + ftm + tpm,
+        "REB": max(0, rng.normal(4, 2)) * quality,
+        "AST": max(0, rng.normal(2.5, 1.5)) * quality,
+        "STL": max(0, rng.normal(0.8, 0.3)) * quality,
+        "BLK": max(0, rng.normal(0.5, 0.4)) * quality,
+        "TO": max(0, rng.normal(1.5, 0.5)) * quality,
+        "GP": float(rng.integers(3, 30)),
+    }
+
+
+class Player:
+    """The espn_api.basketball.Player attributes read by utils.player.Player."""
+    def __init__(self, player_id, rng, year, schedule, pro_team, pro_team_id, lineup_slot="BE"):
+        self.playerId = player_id
+        self.name = f"Player {player_id}"
+        self.year = year
+        self.proTeam = pro_team
+        self.pro_team_id = pro_team_id
+        self.position = POSITIONS[player_id % len(POSITIONS)]
+        self.eligibleSlots = ELIGIBLE[self.position]
+        self.lineupSlot = lineup_slot
+        self.schedule = schedule
+        self.posRank = 0
+        self.injuryStatus = "OUT" if rng.random() < 0.05 else "ACTIVE"
+        self.expected_return_date = None
+        self.news = {}
+
+        self.quality = rng.gamma(2.0, 0.5)
+        self.stats = {f"{year}_{stype}": {"avg": random_line(rng, self.quality)} for stype in ESPN_SPLITS}
+        self.adp = float(rng.uniform(1, 250))
+        self.percent_owned = float(rng.uniform(0, 100))
+
+
+class Matchup:
+    def __init__(self, home_team, away_team, home_cats, away_cats):
+        self.home_team = home_team
+        self.away_team = away_team
+        self.home_team_cats = home_cats
+        self.away_team_cats = away_cats
+
+
+class Team:
+    def __init__(self, team_id, roster):
+        self.team_id = team_id
+        self.team_abbrev = f"T{team_id}"
+        self.team_name = f"Team {team_id}"
+        self.logo_url = ""
+        self.roster = roster
+        self.schedule = []
+
+
+class Settings:
+    def __init__(self, weeks):
+        self.matchup_periods = {str(week): [week] for week in range(1, weeks + 1)}
+
+
+class Request:
+    """Answers the espn_request calls made by fantasy, splits and the poller from the synthetic league."""
+    def __init__(self, league):
+        self.league = league
+        self.LEAGUE_ENDPOINT = "http://127.0.0.1:9/offline"     # nothing listens there, polls fail fast
+        self.cookies = None
+
+
+    def league_get(self, params=None, headers=None, extend=""):
+        view = (params or {}).get("view")
+        if view == "mSettings":
+            return {"settings": {"rosterSettings": {"lineupSlotCounts": LINEUP_SLOT_COUNTS}}}
+        players = sorted(self.league.all_players, key=lambda p: -p.percent_owned)
+        return {"players": [
+            {
+                "id": p.playerId,
+                "onTeamId": self.league.owner.get(p.playerId, 0),
+                "status": "ONTEAM" if p.playerId in self.league.owner else "FREEAGENT",
+                "player": {
+                    "firstName": "Player", "lastName": str(p.playerId), "proTeamId": p.pro_team_id,
+                    "ownership": {"averageDraftPosition": p.adp, "percentOwned": p.percent_owned},
+                },
+            }
+            for p in players
+        ]}
+
+
+    def get_player_card(self, player_ids, max_scoring_period, additional_filters=None):
+        """Per scoring period box scores (statSourceId 0) for days the player's pro team played."""
+        from espn_api.basketball.constant import STATS_MAP
+        stat_ids = {name: stat_id for stat_id, name in STATS_MAP.items()}
+
+        by_id = {p.playerId: p for p in self.league.all_players}
+        players = []
+        for player_id in player_ids:
+            p = by_id.get(player_id)
+            if p is None:
+                continue
+            rng = np.random.default_rng(player_id)
+            splits = []
+            for day in sorted(int(day) for day in p.schedule):
+                if day >= max_scoring_period:
+                    break
+                line = random_line(rng, p.quality)
+                splits.append({"seasonId": self.league.year, "statSourceId": 0, "scoringPeriodId": day,
+                               "stats": {stat_ids[stat]: line[stat] for stat in BOX_STATS}})
+            players.append({"id": player_id, "player": {"stats": splits}})
+        return {"players": players}
+
+
+class League:
+    """Seeded synthetic league with the espn_api.basketball.League surface used by the app."""
+    def __init__(self, league_id=0, year=2026, team_count=10, roster_size=13, free_agents=500, seed=0):
+        from espn_api.basketball.constant import PRO_TEAM_MAP
+
+        rng = np.random.default_rng(seed)
+        self.league_id = league_id
+        self.year = year
+        self.firstScoringPeriod = 1
+        self.finalScoringPeriod = 160
+        self.scoringPeriodId = 50
+        self.currentMatchupPeriod = 8
+        self.settings = Settings(22)
+
+        self.pro_schedule = {}
+        for pro_team_id in range(1, 31):
+            games = {}
+            for day in range(self.firstScoringPeriod, self.finalScoringPeriod + 1):
+                if rng.random() < 0.5:
+                    games[str(day)] = [{
+                        "awayProTeamId": pro_team_id,
+                        "homeProTeamId": (pro_team_id % 30) + 1,
+                        "date": (SEASON_START + timedelta(days=day - 1)).timestamp() * 1000,
+                    }]
+            self.pro_schedule[pro_team_id] = games
+
+        def schedule_for(pro_team_id):
+            return {
+                key: {"team": PRO_TEAM_MAP[(pro_team_id % 30) + 1], "date": datetime.fromtimestamp(game[0]["date"] / 1000)}
+                for key, game in self.pro_schedule[pro_team_id].items()
+            }
+
+        def new_player(player_id, lineup_slot="BE"):
+            pro_team_id = int(rng.integers(1, 31))
+            return Player(player_id, rng, year, schedule_for(pro_team_id), PRO_TEAM_MAP[pro_team_id], pro_team_id, lineup_slot)
+
+        self.all_players = []
+        self.owner = {}
+        self.teams = []
+        player_id = 1000
+        for team_id in range(1, team_count + 1):
+            roster = []
+            for slot in range(roster_size):
+                p = new_player(player_id, "IR" if slot == roster_size - 1 and team_id % 3 == 0 else "BE")
+                roster.append(p)
+                self.all_players.append(p)
+                self.owner[player_id] = team_id
+                player_id += 1
+            self.teams.append(Team(team_id, roster))
+
+        self._free_agents = []
+        for _ in range(free_agents):
+            p = new_player(player_id)
+            self._free_agents.append(p)
+            self.all_players.append(p)
+            player_id += 1
+
+        for week in range(1, len(self.settings.matchup_periods) + 1):
+            order = rng.permutation(len(self.teams))
+            for home, away in zip(order[::2], order[1::2]):
+                home, away = self.teams[home], self.teams[away]
+                home_cats = {cat: {"score": float(rng.uniform(0, 100)), "result": None} for cat in MATCHUP_CATS}
+                away_cats = {cat: {"score": float(rng.uniform(0, 100)), "result": None} for cat in MATCHUP_CATS}
+                matchup = Matchup(home, away, home_cats, away_cats)
+                home.schedule.append(matchup)
+                away.schedule.append(matchup)
+
+        self.espn_request = Request(self)
+
+
+    def free_agents(self, size=50):
+        return self._free_agents[:size]
@@ -1,6 +1,6 @@
 import numpy as np
+from utils.player import get_stats_types
 
-STATS_TYPES = ["projected", "total", "last_30", "last_15", "last_7"]
 CATEGORIES = ["FG%", "FT%", "3PM", "REB", "AST", "STL", "BLK", "TO", "PTS"]
 CAT_INDEX = np.arange(len(CATEGORIES))
 
@@ -27,40 +27,12 @@ class Team():
         self.roster = self.original_roster.copy()
 
 
-    def compute_team_stats(self, player_map, counting_stats, percentage_stats, roster_size):
-        """
-        Compute aggregate raw stats for the team.
-        """
-        self.stats.clear()
-        self.stats = {stype: {cat: 0 for cat in ["MIN"] + counting_stats} for stype in STATS_TYPES}
-
-        for player_id in self.roster:
-
-            if player_id in self.injury_reserved and len(self.roster) > roster_size:
-                continue    # skip IR
-
-            player = player_map.get(player_id)
-
-            for stype in STATS_TYPES:
-                stats = player.stats.get(stype, {})
-                self.stats[stype]["MIN"] += stats.get("MIN", 0)
-                for cat in counting_stats:
-                    self.stats[stype][cat] += stats.get(cat, 0)
-
-        for stype in STATS_TYPES:
-            for cat in percentage_stats:
-                made = self.stats[stype].get(f"{cat}M", 0)
-                attempted = self.stats[stype].get(f"{cat}A", 0)
-                # Safely compute FG% & FT% (0 == False else True) 
-                self.stats[stype][f"{cat}%"] = (made / attempted) if attempted else 0
-
-
     def h2h(self, opp, opp_id, categories, total_most, total_each):
         """
         Compute head-to-head stats versus one opponent.
         Uses overwriting into preallocated dicts.
         """
-        for stype in STATS_TYPES:
+        for stype in total_most:
             # Vector of differences for all categories
             diffs = np.array([
                 self.stats_z[stype][cat] - opp.stats_z[stype][cat]
@@ -105,6 +77,7 @@ class Team():
         
         num_opponents = max(1, len(team_map) - 1)
         num_categories = len(categories)
+        stypes = get_stats_types(team_map)
 
         # ---- Preallocate h2h_most ----
         self.h2h_most.clear()
@@ -113,18 +86,18 @@ class Team():
                 opp_id: {"result": 0}  # ready to overwrite diffs in h2h()
                 for opp_id in team_map if opp_id != self.team_id
             }
-            for stype in STATS_TYPES
+            for stype in stypes
         }
 
         # ---- Preallocate h2h_each ----
         self.h2h_each.clear()
         self.h2h_each = {
             stype: {cat: [0, 0, 0] for cat in categories} 
-            for stype in STATS_TYPES
+            for stype in stypes
         }
 
-        total_most = {stype: [0, 0, 0] for stype in STATS_TYPES}
-        total_each = {stype: [0, 0, 0] for stype in STATS_TYPES}
+        total_most = {stype: [0, 0, 0] for stype in stypes}
+        total_each = {stype: [0, 0, 0] for stype in stypes}
 
         # ---- Evaluate each opponent ----
         for opp_id, opp in team_map.items():
@@ -132,7 +105,7 @@ class Team():
                 self.h2h(opp, opp_id, categories, total_most, total_each)
 
         # ---- Final W-L-T & win% summaries ----
-        for stype in STATS_TYPES:
+        for stype in stypes:
             w, l, t = total_most[stype]
             self.h2h_most[stype]["result"] = f"{w}-{l}-{t}"
             self.h2h_most[stype]["win%"] = (w + 0.5 * t) / num_opponents
@@ -0,0 +1,5 @@
+import os
+import sys
+
+# the app imports its modules as `utils.<name>` from src/fantasy_hooplab
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "src", "fantasy_hooplab"))
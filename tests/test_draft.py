@@ -0,0 +1,45 @@
+import numpy as np
+import pytest
+from utils.draft import DraftBoard
+
+CATEGORIES = ["FG%", "FT%", "3PM", "REB", "AST", "STL", "BLK", "TO", "PTS"]
+
+
+def brute_force(board, k, weights):
+    rows = np.flatnonzero(board.available)
+    values = board.z[rows] @ weights
+    top = np.argsort(-values)[:k]
+    return [(board.player_ids[rows[i]], values[i]) for i in top]
+
+
+@pytest.mark.parametrize("seed", range(5))
+def test_best_available_matches_sorting_the_board(seed):
+    rng = np.random.default_rng(seed)
+    player_ids = list(range(1000, 1300))
+    board = DraftBoard(player_ids, rng.normal(size=(len(player_ids), len(CATEGORIES))), CATEGORIES, 10, 13,
+                       punting=["TO"] if seed % 2 else ())
+
+    for pick in range(120):
+        available = [pid for pid, ok in zip(player_ids, board.available) if ok]
+        board.pick(int(rng.choice(available)), mine=pick % 10 == seed)
+        if pick % 7 == 0:
+            board.undo()
+        if pick % 15 == 0:
+            for weights in (board.weights(), rng.uniform(0, 2, len(CATEGORIES))):
+                k = int(rng.integers(1, 30))
+                got = board.best_available(k, weights)
+                want = brute_force(board, k, weights)
+                assert [pid for pid, _ in got] == [pid for pid, _ in want]
+                np.testing.assert_allclose([value for _, value in got], [value for _, value in want])
+
+
+def test_best_available_near_the_end_of_the_board():
+    rng = np.random.default_rng(7)
+    player_ids = list(range(40))
+    board = DraftBoard(player_ids, rng.normal(size=(40, len(CATEGORIES))), CATEGORIES, 2, 3)
+    for pid in rng.permutation(player_ids)[:35]:
+        board.pick(int(pid))
+    weights = np.ones(len(CATEGORIES))
+    got = board.best_available(10, weights)
+    assert len(got) == 5
+    assert [pid for pid, _ in got] == [pid for pid, _ in brute_force(board, 10, weights)]
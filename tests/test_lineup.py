@@ -0,0 +1,40 @@
+import itertools
+from types import SimpleNamespace
+import numpy as np
+import pytest
+from utils import lineup
+
+
+def brute_force(cost):
+    """Cheapest cost of assigning every row to a distinct column."""
+    rows, cols = cost.shape
+    return min(cost[np.arange(rows), list(perm)].sum() for perm in itertools.permutations(range(cols), rows))
+
+
+@pytest.mark.parametrize("seed", range(20))
+def test_hungarian_matches_permutations(seed):
+    rng = np.random.default_rng(seed)
+    cost = rng.uniform(-10, 10, (6, 6)) if seed % 2 else rng.integers(0, 5, (6, 6)).astype(float)   # ties too
+    col_of_row = lineup.hungarian(cost)
+    assert sorted(col_of_row) == list(range(6))
+    assert cost[np.arange(6), col_of_row].sum() == pytest.approx(brute_force(cost))
+
+
+def test_hungarian_more_columns_than_rows():
+    rng = np.random.default_rng(0)
+    cost = rng.uniform(0, 1, (4, 6))
+    col_of_row = lineup.hungarian(cost)
+    assert len(set(col_of_row)) == 4
+    assert cost[np.arange(4), col_of_row].sum() == pytest.approx(brute_force(cost))
+
+
+def test_best_lineup_fills_slots_by_eligibility():
+    player_map = {
+        1: SimpleNamespace(eligible_slots=["C", "UT"]),
+        2: SimpleNamespace(eligible_slots=["C", "UT"]),
+        3: SimpleNamespace(eligible_slots=["PG", "UT"]),
+        4: SimpleNamespace(eligible_slots=["PG", "UT"]),
+    }
+    values = {1: 5.0, 2: 1.0, 3: 3.0, 4: 2.0}
+    started = lineup.best_lineup(list(player_map), player_map, ["C", "PG", "UT"], values)
+    assert sorted(started) == [1, 3, 4]     # player 4 takes UT over the weaker C
@@ -0,0 +1,57 @@
+from types import SimpleNamespace
+import numpy as np
+from utils.online import RunningStats
+from utils.player import STATS_TYPES
+
+CATEGORIES = ["PTS", "REB", "AST", "FG%"]
+
+
+def make_player(rng):
+    return SimpleNamespace(stats={stype: dict(zip(CATEGORIES, rng.normal(10, 4, len(CATEGORIES)))) for stype in STATS_TYPES})
+
+
+def expected(pool_map):
+    values = {stype: np.array([[p.stats[stype][cat] for cat in CATEGORIES] for p in pool_map.values()]) for stype in STATS_TYPES}
+    return {stype: v.mean(axis=0) for stype, v in values.items()}, {stype: v.std(axis=0) for stype, v in values.items()}
+
+
+def test_running_stats_match_full_recompute_after_updates():
+    rng = np.random.default_rng(0)
+    pool_map = {pid: make_player(rng) for pid in range(50)}
+    pool = RunningStats.from_pool(pool_map, CATEGORIES)
+
+    next_id = len(pool_map)
+    for step in range(300):
+        action = rng.integers(3)
+        if action == 0 or len(pool_map) < 5:
+            pool_map[next_id] = make_player(rng)
+            pool.add(next_id, pool_map[next_id])
+            next_id += 1
+        elif action == 1:
+            pid = int(rng.choice(list(pool_map)))
+            del pool_map[pid]
+            pool.remove(pid)
+        else:
+            pid = int(rng.choice(list(pool_map)))
+            pool_map[pid] = make_player(rng)
+            pool.update(pid, pool_map[pid])
+
+        if step % 25 == 0:
+            means, stds = pool.mean_std()
+            want_means, want_stds = expected(pool_map)
+            for stype in STATS_TYPES:
+                np.testing.assert_allclose([means[stype][cat] for cat in CATEGORIES], want_means[stype], rtol=1e-9)
+                np.testing.assert_allclose([stds[stype][cat] for cat in CATEGORIES], want_stds[stype], rtol=1e-7)
+
+    assert pool.count == len(pool_map)
+
+
+def test_running_stats_remove_everyone():
+    rng = np.random.default_rng(1)
+    pool_map = {pid: make_player(rng) for pid in range(3)}
+    pool = RunningStats.from_pool(pool_map, CATEGORIES)
+    for pid in list(pool_map):
+        pool.remove(pid)
+    means, stds = pool.mean_std()
+    assert all(value == 0 for value in means["total"].values())
+    assert all(value == 1 for value in stds["total"].values())      # 0 std is reported as 1